@@ -0,0 +1,5 @@
+from pagina.asgi import create_asgi_app
+
+# Servidor ASGI (lecturas async + Flask para el resto), p. ej.:
+#   hypercorn asgi:app --workers 4 --bind 0.0.0.0:8000
+app = create_asgi_app()
@@ -0,0 +1,5 @@
+-- Rangos de fecha de las estadísticas (ver pagina/stats.py): aviso_adopcion_archivo ya tiene su
+-- índice por fecha_ingreso (tabla-archivo.sql); éste es el de la tabla vigente.
+
+ALTER TABLE `tarea2`.`aviso_adopcion`
+  ADD INDEX `idx_aviso_fecha_ingreso` (`fecha_ingreso` ASC);
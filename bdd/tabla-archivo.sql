@@ -0,0 +1,66 @@
+-- Archivo de avisos con fecha_entrega vencida (ver pagina/archive.py).
+-- Mismas columnas e ids que las tablas "calientes", sin FKs hacia ellas.
+
+ALTER TABLE `tarea2`.`aviso_adopcion`
+  ADD INDEX `idx_aviso_fecha_entrega` (`fecha_entrega` ASC);
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`aviso_adopcion_archivo` (
+  `id` INT NOT NULL,
+  `fecha_ingreso` DATETIME NOT NULL,
+  `comuna_id` INT NOT NULL,
+  `sector` VARCHAR(100) NULL,
+  `nombre` VARCHAR(200) NOT NULL,
+  `email` VARCHAR(100) NOT NULL,
+  `celular` VARCHAR(15) NULL,
+  `tipo` ENUM('gato', 'perro') NOT NULL,
+  `cantidad` INT NOT NULL,
+  `edad` INT NOT NULL,
+  `unidad_medida` ENUM('a', 'm') NOT NULL,
+  `fecha_entrega` DATETIME NOT NULL,
+  `descripcion` TEXT(500) NULL,
+  `archivado_en` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `idx_aviso_archivo_fecha_ingreso` (`fecha_ingreso` ASC),
+  INDEX `fk_aviso_archivo_comuna1_idx` (`comuna_id` ASC),
+  CONSTRAINT `fk_aviso_archivo_comuna1`
+    FOREIGN KEY (`comuna_id`)
+    REFERENCES `tarea2`.`comuna` (`id`)
+    ON DELETE NO ACTION
+    ON UPDATE NO ACTION)
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`foto_archivo` (
+  `id` INT NOT NULL,
+  `ruta_archivo` VARCHAR(300) NOT NULL,
+  `nombre_archivo` VARCHAR(300) NOT NULL,
+  `aviso_id` INT NOT NULL,
+  PRIMARY KEY (`id`, `aviso_id`),
+  INDEX `idx_foto_archivo_aviso` (`aviso_id` ASC))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`contactar_por_archivo` (
+  `id` INT NOT NULL,
+  `nombre` ENUM('whatsapp', 'telegram', 'X', 'instagram', 'tiktok', 'otra') NOT NULL,
+  `identificador` VARCHAR(150) NOT NULL,
+  `aviso_id` INT NOT NULL,
+  PRIMARY KEY (`id`, `aviso_id`),
+  INDEX `idx_contactar_por_archivo_aviso` (`aviso_id` ASC))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`comentario_archivo` (
+  `id` INT NOT NULL,
+  `nombre` VARCHAR(80) NOT NULL,
+  `texto` VARCHAR(300) NOT NULL,
+  `fecha` TIMESTAMP NOT NULL,
+  `aviso_id` INT NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `idx_comentario_archivo_aviso` (`aviso_id` ASC))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`nota_archivo` (
+  `id` INT NOT NULL,
+  `aviso_id` INT NOT NULL,
+  `nota` INT NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `idx_nota_archivo_aviso` (`aviso_id` ASC))
+ENGINE = InnoDB;
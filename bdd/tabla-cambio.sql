@@ -0,0 +1,23 @@
+-- Log de cambios para espejos y clientes offline (ver pagina/changes.py, GET /api/avisos/changes).
+-- El id lo asigna cambio_seq (fila única) dentro de la misma transacción de la escritura, como
+-- última sentencia antes del commit: así el orden de los ids sigue el orden de commit.
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`cambio_seq` (
+  `id` INT NOT NULL,
+  `ultimo` INT NOT NULL DEFAULT 0,
+  `purgado_hasta` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id`))
+ENGINE = InnoDB;
+
+INSERT IGNORE INTO `tarea2`.`cambio_seq` (`id`, `ultimo`, `purgado_hasta`) VALUES (1, 0, 0);
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`cambio` (
+  `id` INT NOT NULL,
+  `entidad` VARCHAR(20) NOT NULL,
+  `entidad_id` INT NOT NULL,
+  `aviso_id` INT NOT NULL,
+  `operacion` VARCHAR(10) NOT NULL,
+  `creado` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `ix_cambio_creado` (`creado` ASC))
+ENGINE = InnoDB;
@@ -0,0 +1,23 @@
+-- Registro de invalidaciones de cache entre nodos (BUS_BACKEND = "db", ver pagina/bus.py).
+-- Cada proceso consulta las filas con id mayor al último visto; las antiguas se purgan solas.
+-- El id lo asigna invalidacion_seq (fila única, bloqueada hasta el commit del INSERT): así el orden
+-- de los ids sigue el orden de commit y un lector nunca ve aparecer un id menor al último leído.
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`invalidacion` (
+  `id` INT NOT NULL,
+  `namespaces` VARCHAR(200) NOT NULL,
+  `origen` VARCHAR(120) NOT NULL,
+  `creado` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `idx_invalidacion_creado` (`creado` ASC))
+ENGINE = InnoDB;
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`invalidacion_seq` (
+  `id` INT NOT NULL,
+  `ultimo` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`id`))
+ENGINE = InnoDB;
+
+-- una tabla invalidacion creada antes (con AUTO_INCREMENT) sigue sirviendo: la secuencia parte del máximo
+INSERT IGNORE INTO `tarea2`.`invalidacion_seq` (`id`, `ultimo`)
+  SELECT 1, COALESCE(MAX(`id`), 0) FROM `tarea2`.`invalidacion`;
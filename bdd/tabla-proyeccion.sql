@@ -0,0 +1,17 @@
+-- Proyección de lectura de avisos vigentes (ver pagina/readmodel.py): JSON ya serializado (completo
+-- y vista card) más columnas de orden/filtro. Se mantiene en la misma transacción de cada escritura;
+-- después de crear la tabla, llenarla con `flask --app run reconstruir-proyeccion`.
+-- Sin FK para que el archivado (que la borra en el mismo lote) no dependa del orden de los DELETE.
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`aviso_proyeccion` (
+  `aviso_id` INT NOT NULL,
+  `fecha_ingreso` DATETIME NOT NULL,
+  `comuna_id` INT NOT NULL,
+  `tipo` VARCHAR(5) NOT NULL,
+  `n_comentarios` INT NOT NULL DEFAULT 0,
+  `completo` TEXT NOT NULL,
+  `tarjeta` TEXT NOT NULL,
+  PRIMARY KEY (`aviso_id`),
+  INDEX `ix_aviso_proyeccion_orden` (`fecha_ingreso` ASC, `aviso_id` ASC),
+  INDEX `ix_aviso_proyeccion_comuna_id` (`comuna_id` ASC))
+ENGINE = InnoDB;
@@ -0,0 +1,9 @@
+-- Contador de visitas por aviso (ver pagina/popular.py).
+-- Se actualiza en lotes (upsert) desde memoria; sin FK para que el flush no falle si el aviso se archivó.
+
+CREATE TABLE IF NOT EXISTS `tarea2`.`aviso_vistas` (
+  `aviso_id` INT NOT NULL,
+  `vistas` INT NOT NULL DEFAULT 0,
+  `actualizado` DATETIME NOT NULL,
+  PRIMARY KEY (`aviso_id`))
+ENGINE = InnoDB;
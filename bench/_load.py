@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Percentil simple (nearest-rank) de una lista.
+      - values: List[float] — Muestras (no necesita venir ordenada).
+      - p: float — Percentil en [0, 100].
+    ->
+      - float — Valor del percentil (0.0 si no hay muestras).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100.0 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0):
+    """
+    GET simple con urllib.
+      - url: str — URL absoluta.
+      - headers: dict | None — Headers extra.
+      - timeout: float — Timeout en segundos.
+    ->
+      - (status, headers, body) — Headers como dict en minúsculas.
+    """
+    req = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            return res.status, {k.lower(): v for k, v in res.headers.items()}, res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, {k.lower(): v for k, v in e.headers.items()}, e.read()
+
+
+def run_load(urls: List[str], concurrency: int, duration: float,
+             headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Genera carga cerrada: `concurrency` clientes recorren `urls` en bucle durante `duration` s.
+      - urls: List[str] — URLs a pedir (round-robin por cliente).
+      - concurrency: int — Clientes concurrentes (threads).
+      - duration: float — Duración en segundos.
+      - headers: dict | None — Headers extra por request.
+    ->
+      - dict — {requests, errors, rps, p50_ms, p99_ms, bytes}.
+    """
+    latencies: List[float] = []
+    counters = {"errors": 0, "bytes": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(idx: int) -> None:
+        i = idx
+        local_lat: List[float] = []
+        errors = 0
+        nbytes = 0
+        while time.perf_counter() < deadline:
+            url = urls[i % len(urls)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                status, _, body = fetch(url, headers)
+                if status >= 400:
+                    errors += 1
+                nbytes += len(body)
+            except Exception:
+                errors += 1
+            local_lat.append((time.perf_counter() - t0) * 1000.0)
+        with lock:
+            latencies.extend(local_lat)
+            counters["errors"] += errors
+            counters["bytes"] += nbytes
+
+    threads = [threading.Thread(target=client, args=(n,), daemon=True) for n in range(concurrency)]
+    t_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "requests": len(latencies),
+        "errors": counters["errors"],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "bytes": counters["bytes"],
+    }
+
+
+def wait_ready(url: str, timeout: float = 20.0) -> None:
+    """
+    Espera a que el servidor responda en `url`.
+      - url: str — URL a sondear.
+      - timeout: float — Máximo de espera en segundos.
+    ->
+      - None — Lanza RuntimeError si no responde a tiempo.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            fetch(url, timeout=1.0)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"Servidor no responde en {url}")
+
+
+def spawn(cmd: List[str], ready_url: str, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Lanza un servidor en un subproceso (cwd = raíz del repo) y espera a que responda.
+      - cmd: List[str] — Comando.
+      - ready_url: str — URL para sondear disponibilidad.
+      - env: dict | None — Variables de entorno extra.
+    ->
+      - subprocess.Popen — Proceso lanzado (el llamador debe terminarlo).
+    """
+    proc = subprocess.Popen(
+        cmd, cwd=ROOT, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(ready_url)
+    except Exception:
+        proc.terminate()
+        raise
+    return proc
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    """
+    Imprime una tabla de resultados alineada.
+      - rows: List[dict] — Filas.
+      - columns: List[str] — Columnas a mostrar (en orden).
+    ->
+      - None
+    """
+    def cell(v: Any) -> str:
+        return f"{v:.2f}" if isinstance(v, float) else str(v)
+
+    widths = {c: max(len(c), *(len(cell(r.get(c, ""))) for r in rows)) if rows else len(c) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(cell(r.get(c, "")).ljust(widths[c]) for c in columns))
+    sys.stdout.flush()
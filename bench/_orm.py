@@ -0,0 +1,61 @@
+"""
+Statements del camino ORM que los endpoints dejaron de usar al pasar a la proyección
+(pagina/readmodel.py). Se mantienen sólo como línea base de bench_statements y bench_readmodel.
+"""
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+from sqlalchemy import bindparam, select, Integer, Select
+
+from pagina.models import AvisoAdopcion, Comuna, Region
+from pagina.queries import aviso_load_options, avisos_stmt, count_avisos_stmt
+
+
+def aviso_stmt(aviso_id: int, fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    SELECT (Aviso, Comuna, Región) de un aviso por ID.
+      - aviso_id: int | BindParameter — Identificador del aviso.
+      - fields: frozenset[str] | None — Campos pedidos (None = todos).
+    ->
+      - Select — Statement con fotos y contactos precargados.
+    """
+    return (
+        select(AvisoAdopcion, Comuna, Region)
+        .join(Comuna, Comuna.id == AvisoAdopcion.comuna_id)
+        .join(Region, Region.id == Comuna.region_id)
+        .options(*aviso_load_options(AvisoAdopcion, fields))
+        .where(AvisoAdopcion.id == aviso_id)  # type: ignore[arg-type]
+    )
+
+
+@lru_cache(maxsize=None)
+def hot_count_avisos() -> Select:
+    """
+    COUNT(*) de avisos (sin parámetros).
+      - (None)
+    ->
+      - Select
+    """
+    return count_avisos_stmt()
+
+
+@lru_cache(maxsize=64)
+def hot_avisos_page(fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    Página de avisos. Parámetros: limit, offset.
+      - fields: frozenset[str] | None — Campos pedidos (ver aviso_load_options).
+    ->
+      - Select
+    """
+    return avisos_stmt(fields).limit(bindparam("limit", type_=Integer)).offset(bindparam("offset", type_=Integer))
+
+
+@lru_cache(maxsize=64)
+def hot_aviso(fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    Aviso vigente por ID. Parámetro: aviso_id.
+      - fields: frozenset[str] | None — Campos pedidos.
+    ->
+      - Select
+    """
+    return aviso_stmt(bindparam("aviso_id", type_=Integer), fields)
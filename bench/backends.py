@@ -0,0 +1,55 @@
+"""
+Corre un benchmark contra cada motor de BD (DB_BACKEND=mysql / sqlite, ver pagina/config.py),
+uno tras otro y con los mismos argumentos, para comparar las tablas que imprime.
+
+Si el archivo SQLite no existe se crea con `flask init-db` (regiones/comunas de
+bdd/region-comuna.sql + --avisos sintéticos). Los servidores que levantan bench_asgi y
+bench_prefork heredan DB_BACKEND / SQLITE_PATH.
+
+Uso (desde la raíz del repo):
+    python -m bench.backends bench_statements --ops 2000
+    python -m bench.backends --backends sqlite --avisos 5000 bench_asgi --concurrency 1,8,32 --duration 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from ._load import ROOT
+
+
+def _ensure_sqlite(path: str, avisos: int) -> None:
+    if os.path.exists(path):
+        return
+    env = {**os.environ, "DB_BACKEND": "sqlite", "SQLITE_PATH": path}
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "run", "init-db", "--avisos", str(avisos)],
+        cwd=ROOT, env=env, check=True,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="mysql,sqlite", help="Lista separada por comas")
+    parser.add_argument("--sqlite-path", default=os.path.join(ROOT, "instance", "bench.sqlite3"))
+    parser.add_argument("--avisos", type=int, default=2000, help="Avisos sintéticos al crear el archivo SQLite")
+    parser.add_argument("bench", help="Módulo de bench/ (p. ej. bench_statements)")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Argumentos del benchmark")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        env = {**os.environ, "DB_BACKEND": backend}
+        if backend == "sqlite":
+            path = os.path.abspath(args.sqlite_path)
+            _ensure_sqlite(path, args.avisos)
+            env["SQLITE_PATH"] = path
+        print(f"=== DB_BACKEND={backend} ===", flush=True)
+        rc = subprocess.run([sys.executable, "-m", f"bench.{args.bench}", *args.args], cwd=ROOT, env=env).returncode
+        status = status or rc
+        print(flush=True)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Throughput con conexiones concurrentes: WSGI (servidor de desarrollo Flask, threaded)
+vs ASGI (hypercorn asgi:app) sobre los endpoints de lectura.
+
+Uso (desde la raíz del repo, con la BD disponible):
+    python -m bench.bench_asgi --concurrency 1,8,32,128 --duration 10
+    python -m bench.bench_asgi --wsgi-url http://host:5000 --asgi-url http://host:8000   # servidores ya levantados
+"""
+import argparse
+import sys
+
+from ._load import run_load, spawn, print_table
+
+READ_PATHS = [
+    "/api/avisos?page=1&size=5",
+    "/api/avisos/latest?limit=5",
+    "/api/regiones",
+    "/api/regiones/13/comunas",
+    "/api/stats/daily",
+    "/api/stats/by-type",
+    "/api/avisos/1",
+    "/api/avisos/1/comentarios",
+]
+
+WSGI_PORT = 5055
+ASGI_PORT = 8055
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wsgi-url", help="Base URL de un servidor WSGI ya levantado")
+    parser.add_argument("--asgi-url", help="Base URL de un servidor ASGI ya levantado")
+    parser.add_argument("--concurrency", default="1,8,32,128", help="Lista de niveles de concurrencia")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por medición")
+    args = parser.parse_args(argv)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    procs = []
+    try:
+        wsgi_url = args.wsgi_url
+        if not wsgi_url:
+            wsgi_url = f"http://127.0.0.1:{WSGI_PORT}"
+            procs.append(spawn(
+                [sys.executable, "-c",
+                 f"from run import app; app.run(port={WSGI_PORT}, threaded=True, debug=False)"],
+                f"{wsgi_url}/api/regiones",
+            ))
+        asgi_url = args.asgi_url
+        if not asgi_url:
+            asgi_url = f"http://127.0.0.1:{ASGI_PORT}"
+            procs.append(spawn(
+                [sys.executable, "-m", "hypercorn", "asgi:app", "--bind", f"127.0.0.1:{ASGI_PORT}"],
+                f"{asgi_url}/api/regiones",
+            ))
+
+        rows = []
+        for mode, base in (("wsgi", wsgi_url), ("asgi", asgi_url)):
+            urls = [f"{base}{p}" for p in READ_PATHS]
+            for c in levels:
+                res = run_load(urls, concurrency=c, duration=args.duration)
+                rows.append({"mode": mode, "concurrency": c, **res})
+        print_table(rows, ["mode", "concurrency", "requests", "errors", "rps", "p50_ms", "p99_ms"])
+    finally:
+        for p in procs:
+            p.terminate()
+            p.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Prueba del bus de invalidación (pagina/bus.py) con varios procesos locales, como si fueran
+workers de distintos nodos: un proceso publica N mensajes y cada receptor registra cuándo le
+llegó cada uno. Reporta entregados / perdidos y la latencia de entrega (p50, p99, máx), que es la
+obsolescencia real de los caches de los demás nodos.
+
+El backend "db" usa la BD configurada (requiere bdd/tabla-invalidacion.sql).
+
+Uso (desde la raíz del repo):
+    python -m bench.bench_bus --backend udp --receivers 4 --messages 200
+    python -m bench.bench_bus --backend db --receivers 4 --messages 50 --poll 0.5
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from typing import Dict, List
+
+from pagina import bus
+from pagina.config import Config
+
+from ._load import percentile, print_table
+
+
+def _config(args) -> Dict[str, object]:
+    cfg = {k: getattr(Config, k) for k in dir(Config) if k.startswith("BUS_")}
+    cfg["BUS_POLL_INTERVAL"] = args.poll
+    if args.port:
+        cfg["BUS_UDP_PORT"] = args.port
+    return cfg
+
+
+def _receiver(backend: str, cfg: Dict[str, object], ready, results, duration: float) -> None:
+    arrivals: Dict[int, float] = {}
+
+    def on_publish(namespaces, remote: bool) -> None:
+        now = time.time()
+        for ns in namespaces:
+            if ns.startswith("bench:"):
+                arrivals.setdefault(int(ns[6:]), now)
+
+    b = bus.make_bus(backend, cfg)
+    bus.subscribe(on_publish)
+    b.ensure_started()
+    time.sleep(0.5 + (cfg["BUS_POLL_INTERVAL"] if backend == "db" else 0))  # el receptor "db" toma su último id
+    ready.put(True)
+    time.sleep(duration)
+    results.put(arrivals)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["udp", "db"], default="udp")
+    parser.add_argument("--receivers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005, help="Segundos entre publicaciones")
+    parser.add_argument("--poll", type=float, default=Config.BUS_POLL_INTERVAL, help="BUS_POLL_INTERVAL (db)")
+    parser.add_argument("--port", type=int, default=0, help="Puerto UDP (default BUS_UDP_PORT)")
+    args = parser.parse_args(argv)
+
+    cfg = _config(args)
+    ctx = multiprocessing.get_context("spawn")
+    ready, results = ctx.Queue(), ctx.Queue()
+    duration = args.messages * args.interval + args.poll * 2 + 2.0
+    procs = [
+        ctx.Process(target=_receiver, args=(args.backend, cfg, ready, results, duration))
+        for _ in range(args.receivers)
+    ]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get(timeout=30)
+
+    publisher = bus.make_bus(args.backend, cfg)
+    publisher.ensure_started()
+    sent: List[float] = []
+    for i in range(args.messages):
+        sent.append(time.time())
+        publisher.send(frozenset({f"bench:{i}"}))
+        time.sleep(args.interval)
+
+    rows = []
+    for n in range(len(procs)):
+        arrivals = results.get(timeout=duration + 30)
+        lat = [(arrivals[i] - sent[i]) * 1000.0 for i in arrivals if i < len(sent)]
+        rows.append({
+            "receptor": n,
+            "entregados": len(lat),
+            "perdidos": args.messages - len(lat),
+            "p50_ms": percentile(lat, 50),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": max(lat) if lat else 0.0,
+        })
+    for p in procs:
+        p.join()
+
+    print(f"backend={args.backend} receptores={args.receivers} mensajes={args.messages}")
+    print_table(rows, ["receptor", "entregados", "perdidos", "p50_ms", "p99_ms", "max_ms"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
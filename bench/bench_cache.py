@@ -0,0 +1,102 @@
+"""
+Latencia de un hit en el cache compartido (SQLite WAL, pagina/cache.py) versus un dict en proceso.
+
+No usa la BD: los valores son payloads sintéticos con la forma de las respuestas reales
+(catálogo de regiones, página de 50 avisos). También mide el throughput con varios procesos
+leyendo el mismo archivo a la vez, como lo harían los workers de gunicorn.
+
+Uso (desde la raíz del repo):
+    python -m bench.bench_cache --ops 20000 --procs 1,4,8
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from pagina.cache import SharedCache
+
+from ._load import percentile, print_table
+
+
+def _payloads() -> Dict[str, Any]:
+    regiones = [{"id": i, "nombre": f"Región {i}"} for i in range(1, 17)]
+    aviso = {
+        "id": 1, "region": "Metropolitana", "comuna": "Ñuñoa", "sector": "Plaza Ñuñoa",
+        "contacto_nombre": "Juan Pérez", "contacto_email": "juan@example.cl", "contacto_celular": "+56912345678",
+        "contactar_por": [{"via": "whatsapp", "id": "+56912345678"}], "tipo": "gato", "cantidad": 2,
+        "edad": 3, "edad_unidad": "meses", "fecha_disponible": "2025-10-01 12:00",
+        "descripcion": "x" * 200, "fotos": ["/static/uploads/a.jpg", "/static/uploads/b.jpg"],
+    }
+    page = {"data": [dict(aviso, id=i) for i in range(50)], "page": 1, "size": 50,
+            "total_items": 1000, "total_pages": 20}
+    return {"regiones": {"data": regiones}, "avisos_50": page}
+
+
+def _time_ops(op: Callable[[], Any], ops: int) -> Dict[str, float]:
+    lat: List[float] = []
+    for _ in range(ops):
+        t0 = time.perf_counter()
+        op()
+        lat.append((time.perf_counter() - t0) * 1e6)
+    return {"p50_us": percentile(lat, 50), "p99_us": percentile(lat, 99), "mean_us": sum(lat) / len(lat)}
+
+
+def _reader(path: str, key: str, ops: int, queue) -> None:
+    cache = SharedCache(path, 1000, 3600)
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        cache.get("bench", key)
+    queue.put(ops / (time.perf_counter() - t0))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--procs", default="1,4,8", help="Procesos lectores concurrentes")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench_cache_")
+    path = os.path.join(tmp, "cache.sqlite3")
+    cache = SharedCache(path, 1000, 3600)
+    version = cache.version("bench")
+
+    rows = []
+    for name, value in _payloads().items():
+        size = len(json.dumps(value))
+        local: Dict[str, Any] = {name: value}
+        local_json: Dict[str, str] = {name: json.dumps(value)}
+        cache.set("bench", name, value, version)
+
+        rows.append({"backend": "dict (objeto)", "payload": name, "bytes": size,
+                     **_time_ops(lambda: local.get(name), args.ops)})
+        rows.append({"backend": "dict (json.loads)", "payload": name, "bytes": size,
+                     **_time_ops(lambda: json.loads(local_json[name]), args.ops)})
+        rows.append({"backend": "SharedCache hit", "payload": name, "bytes": size,
+                     **_time_ops(lambda: cache.get("bench", name), args.ops)})
+        rows.append({"backend": "SharedCache set", "payload": name, "bytes": size,
+                     **_time_ops(lambda: cache.set("bench", name, value, version), min(args.ops, 2000))})
+
+    print_table(rows, ["backend", "payload", "bytes", "p50_us", "p99_us", "mean_us"])
+    print()
+
+    ctx = multiprocessing.get_context("spawn")
+    tp_rows = []
+    for procs in [int(p) for p in args.procs.split(",")]:
+        queue = ctx.Queue()
+        workers = [ctx.Process(target=_reader, args=(path, "regiones", args.ops, queue)) for _ in range(procs)]
+        for w in workers:
+            w.start()
+        rates = [queue.get() for _ in workers]
+        for w in workers:
+            w.join()
+        tp_rows.append({"procs": procs, "hits_per_s_total": sum(rates), "hits_per_s_per_proc": sum(rates) / procs})
+    print_table(tp_rows, ["procs", "hits_per_s_total", "hits_per_s_per_proc"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Bytes en el cable por endpoint y codificación (identity / gzip / br / zstd).
+
+Uso (desde la raíz del repo, con la BD disponible):
+    python -m bench.bench_compression                      # app en proceso (test client)
+    python -m bench.bench_compression --base-url http://127.0.0.1:5000
+"""
+import argparse
+import sys
+import time
+
+from ._load import fetch, print_table
+
+PATHS = [
+    "/api/avisos?page=1&size=50",
+    "/api/avisos?page=1&size=5",
+    "/api/avisos/latest?limit=10",
+    "/api/avisos/1",
+    "/api/avisos/1/comentarios",
+    "/api/regiones",
+    "/api/regiones/13/comunas",
+    "/api/stats/daily",
+    "/api/stats/monthly",
+    "/",
+    "/list",
+    "/list/1",
+]
+ENCODINGS = ["identity", "gzip", "br", "zstd"]
+
+
+def _in_process_client():
+    from pagina import create_app
+
+    client = create_app().test_client()
+
+    def get(path, headers):
+        res = client.get(path, headers=headers)
+        return res.status_code, {k.lower(): v for k, v in res.headers.items()}, res.get_data()
+
+    return get
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Servidor ya levantado (por defecto: app en proceso)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones para medir el tiempo")
+    args = parser.parse_args(argv)
+
+    if args.base_url:
+        def get(path, headers):
+            return fetch(f"{args.base_url}{path}", headers)
+    else:
+        get = _in_process_client()
+
+    rows = []
+    for path in PATHS:
+        row = {"endpoint": path}
+        identity = None
+        for enc in ENCODINGS:
+            status, headers, body = get(path, {"Accept-Encoding": enc})
+            applied = headers.get("content-encoding", "identity")
+            if applied != enc:
+                row[enc] = "-"
+                continue
+            if enc == "identity":
+                identity = len(body)
+                row[enc] = identity
+                continue
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                get(path, {"Accept-Encoding": enc})
+            ms = (time.perf_counter() - t0) * 1000.0 / args.repeat
+            pct = f" ({100.0 * (1 - len(body) / identity):.0f}%)" if identity else ""
+            row[enc] = f"{len(body)}{pct}"
+            row[f"{enc}_ms"] = round(ms, 2)
+        rows.append(row)
+
+    print_table(rows, ["endpoint", "identity", "gzip", "br", "zstd", "gzip_ms", "br_ms", "zstd_ms"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Throughput de descargas concurrentes de fotos: handler /static de Flask versus la ruta /fotos
+(photos.py), más revalidaciones condicionales (If-None-Match → 304) y pedidos con Range.
+
+Por defecto levanta `gunicorn -c gunicorn.conf.py wsgi:app`; con --offload se prueba la ruta
+detrás de un proxy ya configurado (nginx con X-Accel-Redirect) usando --base-url.
+
+Uso (desde la raíz del repo):
+    python -m bench.bench_photos --concurrency 1,8,32 --duration 10
+    python -m bench.bench_photos --base-url http://127.0.0.1:8080
+"""
+import argparse
+import os
+import sys
+
+from pagina.config import Config
+
+from ._load import fetch, print_table, run_load, spawn
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Servidor ya levantado (por defecto se lanza gunicorn)")
+    parser.add_argument("--port", type=int, default=8036)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--photos", type=int, default=20, help="Cantidad de fotos distintas a pedir")
+    args = parser.parse_args(argv)
+
+    names = sorted(
+        n for n in os.listdir(Config.UPLOAD_FOLDER)
+        if os.path.splitext(n)[1].lower() in (".jpg", ".jpeg", ".png")
+    )[: args.photos]
+    if not names:
+        print(f"No hay fotos en {Config.UPLOAD_FOLDER}")
+        return 1
+
+    proc = None
+    base = args.base_url
+    if not base:
+        base = f"http://127.0.0.1:{args.port}"
+        proc = spawn(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+            f"{base}/fotos/{names[0]}",
+            {"GUNICORN_BIND": f"127.0.0.1:{args.port}", "GUNICORN_WORKERS": str(args.workers)},
+        )
+
+    try:
+        _, headers, _ = fetch(f"{base}/fotos/{names[0]}")
+        etag = headers.get("etag", "")
+        scenarios = [
+            ("static (Flask)", [f"{base}/static/uploads/{n}" for n in names], None),
+            ("/fotos", [f"{base}/fotos/{n}" for n in names], None),
+            ("/fotos 304", [f"{base}/fotos/{names[0]}"], {"If-None-Match": etag}),
+            ("/fotos Range 64KiB", [f"{base}/fotos/{n}" for n in names], {"Range": "bytes=0-65535"}),
+        ]
+        rows = []
+        for conc in [int(c) for c in args.concurrency.split(",")]:
+            for label, urls, hdrs in scenarios:
+                res = run_load(urls, conc, args.duration, hdrs)
+                res["MiB_s"] = res["bytes"] / 2**20 / args.duration
+                rows.append({"scenario": label, "concurrency": conc, **res})
+        print_table(rows, ["scenario", "concurrency", "requests", "errors", "rps", "p50_ms", "p99_ms", "MiB_s"])
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Arranque en frío y memoria por worker de gunicorn, con y sin preload_app.
+
+Para cada modo levanta `gunicorn -c gunicorn.conf.py wsgi:app`, mide el tiempo hasta que
+responde y lee de /proc el RSS y el PSS (memoria proporcional: las páginas compartidas
+copy-on-write se reparten entre los procesos que las usan) de cada worker. Sólo Linux.
+
+Uso (desde la raíz del repo, con la BD disponible):
+    python -m bench.bench_prefork --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from ._load import fetch, print_table, spawn
+
+
+def _children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children", "r", encoding="ascii") as fh:
+        return [int(p) for p in fh.read().split()]
+
+
+def _smaps_kib(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="ascii") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8031)
+    parser.add_argument("--warmup", type=int, default=50, help="Requests antes de medir memoria")
+    args = parser.parse_args(argv)
+
+    base = f"http://127.0.0.1:{args.port}"
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    token = os.environ.get("METRICS_TOKEN") or "bench-prefork"
+    rows = []
+    for preload in ("1", "0"):
+        env = {
+            "GUNICORN_BIND": f"127.0.0.1:{args.port}",
+            "GUNICORN_WORKERS": str(args.workers),
+            "GUNICORN_PRELOAD": preload,
+            "METRICS_TOKEN": token,
+        }
+        t0 = time.perf_counter()
+        proc = spawn(cmd, f"{base}/api/regiones", env)
+        ready_s = time.perf_counter() - t0
+        try:
+            # esperar a que todos los workers terminen de arrancar (sin preload cargan la app cada uno)
+            time.sleep(2.0)
+            for _ in range(args.warmup):
+                for path in ("/api/regiones", "/api/avisos/latest", "/"):
+                    fetch(f"{base}{path}")
+            _, _, body = fetch(f"{base}/api/metrics", {"X-Admin-Token": token})
+            workers = _children(proc.pid)
+            rss = [_smaps_kib(p, "Rss") / 1024 for p in workers]
+            pss = [_smaps_kib(p, "Pss") / 1024 for p in workers]
+            rows.append({
+                "preload": preload == "1",
+                "ready_s": ready_s,
+                "workers": len(workers),
+                "master_rss_mib": _smaps_kib(proc.pid, "Rss") / 1024,
+                "worker_rss_mib": sum(rss) / len(rss) if rss else 0.0,
+                "worker_pss_mib": sum(pss) / len(pss) if pss else 0.0,
+                "total_pss_mib": sum(pss) + _smaps_kib(proc.pid, "Pss") / 1024,
+            })
+            print(f"preload={preload}: /api/metrics de un worker → {body[:200]!r}...")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print_table(rows, ["preload", "ready_s", "workers", "master_rss_mib",
+                       "worker_rss_mib", "worker_pss_mib", "total_pss_mib"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Costo en el proceso de armar el cuerpo JSON de listar_avisos y detalle_aviso de dos formas:
+  - orm: SELECT con joins a comuna / región + fotos / contactos, hidratación ORM, serialize_row y
+    json (lo que hacían los endpoints antes de la proyección).
+  - proyeccion: SELECT de la columna completo / tarjeta de aviso_proyeccion (pagina/readmodel.py)
+    y concatenación de los JSON guardados.
+
+Usa la BD configurada (requiere bdd/tabla-proyeccion.sql y `flask reconstruir-proyeccion`, o una base
+SQLite creada con `flask init-db --avisos N`, ver bench/backends.py).
+
+Uso (desde la raíz del repo):
+    python -m bench.bench_readmodel --ops 2000 --size 20
+    python -m bench.backends --backends sqlite --avisos 5000 bench_readmodel --ops 2000
+"""
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import select
+
+from pagina.db import get_session
+from pagina.models import AvisoProyeccion
+from pagina.queries import avisos_page_json, aviso_detail_json
+from pagina.serializers import CARD_FIELDS, serialize_row, to_json
+
+from ._load import percentile, print_table
+from ._orm import hot_aviso, hot_avisos_page, hot_count_avisos
+
+
+def _time_ops(op: Callable[[], Any], ops: int) -> Dict[str, float]:
+    lat: List[float] = []
+    for _ in range(ops):
+        t0 = time.perf_counter()
+        op()
+        lat.append((time.perf_counter() - t0) * 1e6)
+    return {"p50_us": percentile(lat, 50), "p99_us": percentile(lat, 99), "mean_us": sum(lat) / len(lat)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=20, help="Avisos por página del listado")
+    args = parser.parse_args(argv)
+
+    rows = []
+    with get_session() as s:
+        aviso_id = s.scalar(select(AvisoProyeccion.aviso_id).limit(1))
+        if aviso_id is None:
+            print("aviso_proyeccion vacía: corra `flask reconstruir-proyeccion` (o `flask init-db --avisos N`).")
+            return 1
+
+        for view, fields in (("full", None), ("card", CARD_FIELDS)):
+            def orm_page(fields=fields):
+                total = s.scalar(hot_count_avisos())
+                data = [serialize_row(r, fields)
+                        for r in s.execute(hot_avisos_page(fields), {"limit": args.size, "offset": 0}).unique()]
+                s.expunge_all()
+                return to_json({"data": data, "page": 1, "size": args.size, "total_items": total})
+
+            def orm_detail(fields=fields):
+                row = s.execute(hot_aviso(fields), {"aviso_id": aviso_id}).unique().first()
+                s.expunge_all()
+                return to_json(serialize_row(row, fields))
+
+            scenarios = {
+                ("listar_avisos", "orm"): orm_page,
+                ("listar_avisos", "proyeccion"): lambda fields=fields: avisos_page_json(s, 1, args.size, fields),
+                ("detalle_aviso", "orm"): orm_detail,
+                ("detalle_aviso", "proyeccion"): lambda fields=fields: aviso_detail_json(s, aviso_id, fields),
+            }
+            for (endpoint, variant), op in scenarios.items():
+                op()
+                rows.append({"endpoint": endpoint, "view": view, "variante": variant, **_time_ops(op, args.ops)})
+
+    print(f"ops={args.ops} size={args.size}")
+    print_table(rows, ["endpoint", "view", "variante", "p50_us", "p99_us", "mean_us"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
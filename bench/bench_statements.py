@@ -0,0 +1,116 @@
+"""
+Overhead de Python por request al construir las consultas de listar_avisos, detalle_aviso y
+listar_comentarios en cada llamada versus reutilizar los statements precompilados de
+pagina/queries.py (hot_*, con parámetros ligados; los de avisos por el camino ORM, en bench/_orm.py).
+
+Se mide en dos niveles:
+  - preparar: construir el SELECT (o tomarlo del lru_cache) + su clave de cache de SQLAlchemy,
+    que es lo que el engine calcula antes de buscar el SQL compilado. No usa la BD.
+  - ejecutar: s.execute(...) completo contra la BD configurada (omitido con --no-db).
+
+Uso (desde la raíz del repo):
+    python -m bench.bench_statements --ops 5000
+    python -m bench.bench_statements --no-db
+"""
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from pagina.db import get_session
+from pagina.queries import (
+    avisos_stmt, count_avisos_stmt, comentarios_stmt, count_comentarios_stmt, aviso_exists_stmt,
+    hot_comentarios, hot_count_comentarios, hot_aviso_exists, warm_up_statements,
+)
+
+from ._load import percentile, print_table
+from ._orm import aviso_stmt, hot_aviso, hot_avisos_page, hot_count_avisos
+
+
+def _time_ops(op: Callable[[], Any], ops: int) -> Dict[str, float]:
+    lat: List[float] = []
+    for _ in range(ops):
+        t0 = time.perf_counter()
+        op()
+        lat.append((time.perf_counter() - t0) * 1e6)
+    return {"p50_us": percentile(lat, 50), "p99_us": percentile(lat, 99), "mean_us": sum(lat) / len(lat)}
+
+
+def _scenarios(aviso_id: int) -> Dict[str, Dict[str, List]]:
+    """
+    Por endpoint, los statements (y parámetros) que ejecuta cada variante.
+      - aviso_id: int — Aviso existente para detalle/comentarios.
+    ->
+      - dict — {endpoint: {"cada request": [(fábrica, params)], "precompilado": [...]}}
+    """
+    return {
+        "listar_avisos": {
+            "cada request": [
+                (lambda: count_avisos_stmt(), None),
+                (lambda: avisos_stmt().limit(5).offset(0), None),
+            ],
+            "precompilado": [
+                (hot_count_avisos, None),
+                (hot_avisos_page, {"limit": 5, "offset": 0}),
+            ],
+        },
+        "detalle_aviso": {
+            "cada request": [(lambda: aviso_stmt(aviso_id), None)],
+            "precompilado": [(hot_aviso, {"aviso_id": aviso_id})],
+        },
+        "listar_comentarios": {
+            "cada request": [
+                (lambda: aviso_exists_stmt(aviso_id), None),
+                (lambda: count_comentarios_stmt(aviso_id), None),
+                (lambda: comentarios_stmt(aviso_id, "desc", 0, 20), None),
+            ],
+            "precompilado": [
+                (hot_aviso_exists, {"aviso_id": aviso_id}),
+                (hot_count_comentarios, {"aviso_id": aviso_id}),
+                (lambda: hot_comentarios("desc"), {"aviso_id": aviso_id, "limit": 20, "offset": 0}),
+            ],
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--aviso-id", type=int, default=1)
+    parser.add_argument("--no-db", action="store_true", help="Sólo medir la preparación (sin ejecutar)")
+    args = parser.parse_args(argv)
+
+    scenarios = _scenarios(args.aviso_id)
+
+    rows = []
+    for endpoint, variants in scenarios.items():
+        for variant, stmts in variants.items():
+            def prepare(stmts=stmts):
+                for factory, _ in stmts:
+                    factory()._generate_cache_key()
+            rows.append({"endpoint": endpoint, "variante": variant, "fase": "preparar",
+                         **_time_ops(prepare, args.ops)})
+
+    if not args.no_db:
+        try:
+            with get_session() as s:
+                warm_up_statements(s)
+                for endpoint, variants in scenarios.items():
+                    for variant, stmts in variants.items():
+                        def execute(stmts=stmts):
+                            for factory, params in stmts:
+                                s.execute(factory(), params).unique().all()
+                            s.expunge_all()
+                        rows.append({"endpoint": endpoint, "variante": variant, "fase": "ejecutar",
+                                     **_time_ops(execute, args.ops)})
+        except SQLAlchemyError as e:
+            print(f"BD no disponible ({e.__class__.__name__}); sólo se reporta la preparación.\n")
+
+    print_table(rows, ["endpoint", "variante", "fase", "p50_us", "p99_us", "mean_us"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
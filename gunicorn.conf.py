@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+from pagina.db import warm_pool
+from pagina.prefork import rss_bytes
+
+# Configuración de gunicorn para wsgi:app (ver README, "Ejecución").
+# Variables de entorno: GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS, GUNICORN_PRELOAD.
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# La app (plantillas, mappers, catálogo) se carga en el master y los workers la heredan por fork.
+# Los pools de conexiones heredados se descartan en el hijo (ver pagina/db.py).
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+# reciclar workers de a poco acota el crecimiento de memoria
+max_requests = 5000
+max_requests_jitter = 500
+graceful_timeout = 30
+accesslog = "-"
+
+
+def when_ready(server):
+    server.log.info("Master listo (pid %s, RSS %.1f MiB)", os.getpid(), rss_bytes() / 2**20)
+
+
+def post_worker_init(worker):
+    # una conexión por thread antes de atender (el SQL compilado ya viene del master, ver preload)
+    try:
+        warm_pool(threads)
+    except Exception:
+        worker.log.warning("No se pudo precalentar el pool de conexiones", exc_info=True)
+    worker.log.info("Worker %s listo (RSS %.1f MiB)", worker.pid, rss_bytes() / 2**20)
@@ -1,6 +1,20 @@
 from flask import Flask
+from .admission import init_admission
+from .archive import init_archive_cli
+from .bus import init_bus
+from .cache import init_cache
+from .compression import init_compression
 from .config import Config
+from .feed import init_latest_feed
+from .initdb import init_db_cli
+from .metrics import init_metrics
 from .pages import pages_bp
+from .photos import photos_bp
+from .popular import init_popular
+from .profiler import init_profiler
+from .proximity import init_proximity
+from .readmodel import init_readmodel_cli
+from .resumable import init_uploads
 from .api import api_bp
 
 
@@ -11,5 +25,33 @@ def create_app():
     # Blueprints
     app.register_blueprint(pages_bp)
     app.register_blueprint(api_bp)
+    app.register_blueprint(photos_bp)
+    init_uploads(app)
+
+    # Admisión / rate limit / métricas
+    init_admission(app)
+    init_metrics(app)
+    init_profiler(app)
+    init_compression(app)
+
+    # Bus de invalidación entre procesos/nodos (las capas de cache se suscriben)
+    init_bus(app)
+
+    # Cache compartido entre workers (antes del feed y del catálogo, que lo usan)
+    init_cache(app)
+
+    # Feed en memoria de últimos avisos (precargado al iniciar)
+    init_latest_feed(app)
+
+    # Vecinas de cada comuna por distancia (listado ?near_comuna_id=)
+    init_proximity(app)
+
+    # Contadores de visitas y ranking de populares (thread de volcado por proceso)
+    init_popular(app)
+
+    # Comandos CLI
+    init_archive_cli(app)
+    init_db_cli(app)
+    init_readmodel_cli(app)
 
     return app
@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Tuple
+
+from flask import Flask, current_app, jsonify, request
+
+from .metrics import metrics
+
+
+class ConcurrencyLimiter:
+    """
+    Límite de concurrencia con cola de espera acotada para una clase de endpoints.
+      - max_concurrent: int — Requests ejecutándose a la vez.
+      - max_queue: int — Requests esperando turno; sobre eso se rechaza de inmediato.
+      - queue_timeout: float — Segundos máximos esperando turno antes de rechazar.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float) -> None:
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> bool:
+        """
+        Intenta obtener un turno (esperando en cola si hay espacio).
+          - (None)
+        ->
+          - bool — True si se admitió (llamar release() al terminar), False si se debe rechazar.
+        """
+        with self._cond:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return True
+            if self.waiting >= self.max_queue:
+                return False
+            self.waiting += 1
+            try:
+                ok = self._cond.wait_for(lambda: self.active < self.max_concurrent, timeout=self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            if not ok:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        """
+        Libera un turno y despierta a un request en espera.
+          - (None)
+        ->
+          - None
+        """
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class TokenBucket:
+    """
+    Rate limiter token-bucket por cliente.
+      - rate: float — Tokens repuestos por segundo.
+      - burst: int — Capacidad del balde (ráfaga máxima).
+    """
+
+    # Buckets llenos e inactivos se descartan para acotar memoria
+    _PRUNE_EVERY = 1024
+
+    def __init__(self, name: str, rate: float, burst: int) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    def consume(self, key: str) -> Tuple[bool, float]:
+        """
+        Consume un token del cliente `key`.
+          - key: str — Identificador del cliente (IP).
+        ->
+          - (allowed, retry_after) — retry_after en segundos hasta el próximo token (0 si allowed).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1.0 - tokens) / self.rate
+            self._ops += 1
+            if self._ops % self._PRUNE_EVERY == 0:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float) -> None:
+        """
+        Elimina buckets que ya se habrían rellenado por completo (debe llamarse con el lock tomado).
+          - now: float — time.monotonic() actual.
+        ->
+          - None
+        """
+        full_after = self.burst / self.rate
+        stale = [k for k, (_, last) in self._buckets.items() if now - last >= full_after]
+        for k in stale:
+            del self._buckets[k]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def client_key() -> str:
+    """
+    Identifica al cliente para el rate limit (IP remota; usar ProxyFix detrás de un proxy).
+      - (None)
+    ->
+      - str
+    """
+    return request.remote_addr or "-"
+
+
+def _reject(status: int, message: str, retry_after: float):
+    """
+    Respuesta de rechazo con header Retry-After.
+      - status: int — 503 (saturado) | 429 (rate limit).
+      - message: str — Mensaje de error.
+      - retry_after: float — Segundos sugeridos (se redondea hacia arriba).
+    ->
+      - ResponseReturnValue
+    """
+    resp = jsonify({"error": message})
+    resp.status_code = status
+    resp.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return resp
+
+
+def call_admitted(limiter: ConcurrencyLimiter, fn: Callable, *args, **kwargs) -> Tuple[bool, Any]:
+    """
+    Ejecuta fn(*args, **kwargs) sólo si hay turno en `limiter` (bloquea mientras espera en cola:
+    desde un event loop, llamar con asyncio.to_thread).
+      - limiter: ConcurrencyLimiter
+      - fn: Callable
+    ->
+      - (True, resultado) | (False, None) si se rechazó.
+    """
+    t0 = time.perf_counter()
+    if not limiter.acquire():
+        metrics.inc(f"admission.{limiter.name}.rejected")
+        return False, None
+    metrics.inc(f"admission.{limiter.name}.admitted")
+    metrics.observe(f"admission.{limiter.name}.wait", (time.perf_counter() - t0) * 1000.0)
+    try:
+        return True, fn(*args, **kwargs)
+    finally:
+        limiter.release()
+
+
+def admission(clase: str) -> Callable:
+    """
+    Decorador: ejecuta el handler sólo si hay turno en el limitador de `clase`; si no, 503.
+      - clase: str — Clave en Config.ADMISSION_LIMITS (p. ej. 'write', 'stats').
+    ->
+      - Callable — Decorador de vistas.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter: ConcurrencyLimiter = current_app.extensions["admission"]["limiters"][clase]
+            admitted, response = call_admitted(limiter, view, *args, **kwargs)
+            if not admitted:
+                return _reject(503, "Servidor saturado, reintente más tarde.",
+                               current_app.config["ADMISSION_RETRY_AFTER"])
+            return response
+        return wrapper
+    return decorator
+
+
+def rate_limited(bucket: str) -> Callable:
+    """
+    Decorador: aplica el token-bucket `bucket` por cliente; si no hay tokens, 429.
+      - bucket: str — Nombre del rate limiter (p. ej. 'post').
+    ->
+      - Callable — Decorador de vistas.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter: TokenBucket = current_app.extensions["admission"]["buckets"][bucket]
+            allowed, retry_after = limiter.consume(client_key())
+            if not allowed:
+                metrics.inc(f"ratelimit.{bucket}.rejected")
+                return _reject(429, "Demasiadas solicitudes, reintente más tarde.", retry_after)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_admission(app: Flask) -> None:
+    """
+    Crea los limitadores desde la config y publica sus gauges en las métricas.
+      - app: Flask — Aplicación (usa ADMISSION_LIMITS y RATE_LIMIT_POST).
+    ->
+      - None
+    """
+    limiters = {
+        clase: ConcurrencyLimiter(clase, *cfg)
+        for clase, cfg in app.config["ADMISSION_LIMITS"].items()
+    }
+    rate, burst = app.config["RATE_LIMIT_POST"]
+    buckets = {"post": TokenBucket("post", rate, burst)}
+    app.extensions["admission"] = {"limiters": limiters, "buckets": buckets}
+
+    for clase, lim in limiters.items():
+        metrics.register_gauge(f"admission.{clase}.active", lambda lim=lim: lim.active)
+        metrics.register_gauge(f"admission.{clase}.waiting", lambda lim=lim: lim.waiting)
+    for name, b in buckets.items():
+        metrics.register_gauge(f"ratelimit.{name}.clients", lambda b=b: len(b))
@@ -0,0 +1,257 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, Select
+
+from .bus import subscribe
+from .catalog import get_regiones
+from .db import get_session
+from .models import AvisoAdopcion, AvisoAdopcionArchivo, Comuna
+from .stats import TIPO_COLORS
+
+# Snapshot columnar (NumPy) de los avisos, vigentes y archivados, para estadísticas que serían
+# scans completos en SQL (heatmap región × mes, edades, tiempo hasta la entrega).
+# Se carga una vez por proceso y luego sólo trae los ids nuevos (archivar no cambia los ids; las
+# filas archivadas ya están en el snapshot). El AUTO_INCREMENT se asigna al insertar, no al hacer
+# commit: un aviso puede hacerse visible después de otro con id mayor, así que cada refresco
+# vuelve a leer los últimos ANALYTICS_REORDER_WINDOW ids y descarta los ya conocidos.
+
+TIPOS = ("gato", "perro")
+
+# Bordes de los histogramas (el último bin es abierto: ≥ último borde)
+AGE_BINS_MONTHS = [0, 3, 6, 12, 24, 60, 120]
+AGE_LABELS = ["< 3 meses", "3-5 meses", "6-11 meses", "1 año", "2-4 años", "5-9 años", "10+ años"]
+DELIVERY_BINS_DAYS = [0, 1, 3, 7, 14, 30, 60, 90, 180]
+DELIVERY_LABELS = ["< 1 día", "1-2 días", "3-6 días", "1-2 semanas", "2-4 semanas",
+                   "1-2 meses", "2-3 meses", "3-6 meses", "6+ meses"]
+
+
+def _rows_stmt(model, min_id: int = 0) -> Select:
+    """
+    SELECT de las columnas del snapshot para una tabla de avisos (vigente o archivo).
+      - model: AvisoAdopcion | AvisoAdopcionArchivo
+      - min_id: int — Sólo ids mayores (carga incremental).
+    ->
+      - Select — Filas (id, fecha_ingreso, fecha_entrega, tipo, comuna_id, region_id, edad, unidad_medida).
+    """
+    return (
+        select(model.id, model.fecha_ingreso, model.fecha_entrega, model.tipo,
+               model.comuna_id, Comuna.region_id, model.edad, model.unidad_medida)
+        .join(Comuna, Comuna.id == model.comuna_id)
+        .where(model.id > min_id)
+        .order_by(model.id)
+    )
+
+
+class AvisosSnapshot:
+    """
+    Columnas de los avisos como arrays NumPy (una posición por aviso, ordenados por id):
+      - ids: int64
+      - ingreso / entrega: datetime64[s]
+      - tipo: int8 (índice en TIPOS)
+      - comuna / region: int32
+      - edad_meses: int32 (edad normalizada a meses según unidad_medida)
+    El dict `cols` se reemplaza entero al refrescar: quien lo lee una vez ve columnas consistentes.
+      - refresh_interval: float — Segundos mínimos entre consultas de ids nuevos.
+      - reorder_window: int — Ids bajo el último conocido que se vuelven a consultar.
+    """
+
+    def __init__(self, refresh_interval: float, reorder_window: int = 0) -> None:
+        self.refresh_interval = refresh_interval
+        self.reorder_window = reorder_window
+        self.cols: Dict[str, np.ndarray] = {
+            "ids": np.empty(0, dtype=np.int64),
+            "ingreso": np.empty(0, dtype="datetime64[s]"),
+            "entrega": np.empty(0, dtype="datetime64[s]"),
+            "tipo": np.empty(0, dtype=np.int8),
+            "comuna": np.empty(0, dtype=np.int32),
+            "region": np.empty(0, dtype=np.int32),
+            "edad_meses": np.empty(0, dtype=np.int32),
+        }
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.cols["ids"])
+
+    def _append(self, rows: List[Any]) -> None:
+        """
+        Agrega filas (ordenadas por id) a las columnas; si alguna tiene id menor al último conocido
+        (commit tardío) se reordena todo por id.
+          - rows: list[Row] — Resultado de _rows_stmt().
+        ->
+          - None
+        """
+        if not rows:
+            return
+        ids, ingreso, entrega, tipo, comuna, region, edad, unidad = zip(*rows)
+        edad_arr = np.asarray(edad, dtype=np.int32)
+        anios = np.asarray(unidad) == "a"
+        new = {
+            "ids": np.asarray(ids, dtype=np.int64),
+            "ingreso": np.asarray(ingreso, dtype="datetime64[s]"),
+            "entrega": np.asarray(entrega, dtype="datetime64[s]"),
+            "tipo": (np.asarray(tipo) == "perro").astype(np.int8),
+            "comuna": np.asarray(comuna, dtype=np.int32),
+            "region": np.asarray(region, dtype=np.int32),
+            "edad_meses": np.where(anios, edad_arr * 12, edad_arr).astype(np.int32),
+        }
+        old = self.cols
+        cols = {k: np.concatenate([old[k], new[k]]) for k in old}
+        if len(old["ids"]) and new["ids"][0] < old["ids"][-1]:
+            order = np.argsort(cols["ids"], kind="stable")
+            cols = {k: v[order] for k, v in cols.items()}
+        self.cols = cols
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Primera vez: carga avisos vigentes + archivados. Después: sólo ids > último id conocido −
+        reorder_window que aún no estén, a lo más una vez cada refresh_interval segundos (por proceso).
+          - force: bool — Ignorar refresh_interval.
+        ->
+          - None
+        """
+        now = time.monotonic()
+        if not force and self._loaded and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if not force and self._loaded and now - self._checked_at < self.refresh_interval:
+                return
+            with get_session() as s:
+                if not self._loaded:
+                    rows = s.execute(_rows_stmt(AvisoAdopcionArchivo)).all()
+                    rows += s.execute(_rows_stmt(AvisoAdopcion)).all()
+                    rows.sort(key=lambda r: r[0])
+                else:
+                    ids = self.cols["ids"]
+                    low = max(int(ids[-1]) - self.reorder_window, 0) if len(ids) else 0
+                    known = set(ids[np.searchsorted(ids, low, side="right"):].tolist())
+                    rows = [r for r in s.execute(_rows_stmt(AvisoAdopcion, low)).all() if r[0] not in known]
+            self._append(rows)
+            self._loaded = True
+            self._checked_at = time.monotonic()
+
+    def mark_stale(self) -> None:
+        """
+        Fuerza buscar avisos nuevos en el próximo refresh() (sin esperar refresh_interval).
+          - (None)
+        ->
+          - None
+        """
+        self._checked_at = 0.0
+
+
+_snapshot: Optional[AvisosSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def _on_publish(namespaces, remote: bool) -> None:
+    if "avisos" in namespaces and _snapshot is not None:
+        _snapshot.mark_stale()
+
+
+subscribe(_on_publish)
+
+
+def get_snapshot() -> AvisosSnapshot:
+    """
+    Snapshot del proceso, actualizado con los avisos nuevos (ANALYTICS_REFRESH_INTERVAL).
+      - (None)
+    ->
+      - AvisosSnapshot
+    """
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                cfg = current_app.config
+                _snapshot = AvisosSnapshot(cfg["ANALYTICS_REFRESH_INTERVAL"], cfg["ANALYTICS_REORDER_WINDOW"])
+    _snapshot.refresh()
+    return _snapshot
+
+
+def _tipo_datasets(counts: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Datasets Chart.js (uno por tipo: 'Gatos', 'Perros') desde una matriz (tipo × bin).
+      - counts: ndarray — Shape (len(TIPOS), n_bins).
+    ->
+      - list[dict]
+    """
+    return [
+        {"label": f"{t.capitalize()}s", "data": counts[i].tolist(), "backgroundColor": TIPO_COLORS[t]}
+        for i, t in enumerate(TIPOS)
+    ]
+
+
+def heatmap_payload(snap: AvisosSnapshot, year: int) -> Dict[str, Any]:
+    """
+    Matriz región × mes de avisos ingresados en un año.
+      - snap: AvisosSnapshot
+      - year: int — Año YYYY.
+    ->
+      - dict — {"labels": ["YYYY-01", ...], "regions": [{"id", "nombre"}], "data": [[12 ints] por región], "max": int}
+    """
+    regiones = get_regiones()
+    region_ids = np.array([r["id"] for r in regiones], dtype=np.int32)
+
+    c = snap.cols
+    months = c["ingreso"].astype("datetime64[M]").astype(np.int64)  # meses desde 1970-01
+    start = (year - 1970) * 12
+    mask = (months >= start) & (months < start + 12)
+
+    # fila de cada aviso según el orden de `regiones` (alfabético); -1 = región desconocida
+    region = c["region"][mask]
+    size = int(max(region_ids.max(initial=0), region.max(initial=0))) + 1
+    lookup = np.full(size, -1, dtype=np.int64)
+    lookup[region_ids] = np.arange(len(region_ids))
+    rows = lookup[region]
+    valid = rows >= 0
+    rows = rows[valid]
+    cols = (months[mask] - start)[valid]
+
+    matrix = np.zeros((len(regiones), 12), dtype=np.int64)
+    np.add.at(matrix, (rows, cols), 1)
+    return {
+        "labels": [f"{year}-{m:02d}" for m in range(1, 13)],
+        "regions": regiones,
+        "data": matrix.tolist(),
+        "max": int(matrix.max()) if matrix.size else 0,
+    }
+
+
+def ages_payload(snap: AvisosSnapshot) -> Dict[str, Any]:
+    """
+    Distribución de edades (normalizadas a meses) por tipo de mascota.
+      - snap: AvisosSnapshot
+    ->
+      - dict — Formato Chart.js: {"labels": AGE_LABELS, "datasets": [Gatos, Perros]}
+    """
+    c = snap.cols
+    bins = np.digitize(c["edad_meses"], AGE_BINS_MONTHS[1:])
+    counts = np.zeros((len(TIPOS), len(AGE_LABELS)), dtype=np.int64)
+    np.add.at(counts, (c["tipo"], bins), 1)
+    return {"labels": AGE_LABELS, "datasets": _tipo_datasets(counts)}
+
+
+def delivery_payload(snap: AvisosSnapshot) -> Dict[str, Any]:
+    """
+    Histograma de días entre fecha_ingreso y fecha_entrega, por tipo de mascota.
+      - snap: AvisosSnapshot
+    ->
+      - dict — Formato Chart.js: {"labels": DELIVERY_LABELS, "datasets": [Gatos, Perros], "median_days": float | None}
+    """
+    c = snap.cols
+    days = (c["entrega"] - c["ingreso"]).astype("timedelta64[s]").astype(np.float64) / 86400.0
+    days = np.maximum(days, 0.0)
+    bins = np.digitize(days, DELIVERY_BINS_DAYS[1:])
+    counts = np.zeros((len(TIPOS), len(DELIVERY_LABELS)), dtype=np.int64)
+    np.add.at(counts, (c["tipo"], bins), 1)
+    return {
+        "labels": DELIVERY_LABELS,
+        "datasets": _tipo_datasets(counts),
+        "median_days": round(float(np.median(days)), 1) if len(days) else None,
+    }
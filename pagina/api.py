@@ -1,79 +1,41 @@
+import os
 from typing import Any, Dict, List, Tuple
-from datetime import datetime, timedelta, date
+from datetime import datetime
 
-from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import select, func
-from sqlalchemy.orm import joinedload
+from flask import Blueprint, Response, request, jsonify, current_app
 
+from .admission import admission, rate_limited
+from .analytics import get_snapshot, heatmap_payload, ages_payload, delivery_payload
+from .bus import publish
+from .changes import ChangeTokenGone, changes_since, parse_changes_args, record_changes
+from .catalog import comuna_exists, get_regiones, get_comunas
 from .db import get_session
-from .models import AvisoAdopcion, Comuna, Region, ContactarPor, Foto, Comentario
+from .feed import get_feed, get_latest
+from .models import AvisoAdopcion, Region, ContactarPor, Foto, Comentario
+from .popular import popular_page, record_view
+from .queries import (
+    hot_aviso_exists,
+    aviso_detail_json, cached_avisos_page_json, cached_comentarios_page, cached_near_avisos_page,
+    parse_fields, parse_list_order, parse_near, parse_pagination, parse_latest_limit, parse_comment_window, parse_date_range, parse_year,
+)
+from .readmodel import bump_comentarios, refresh_projection
+from .resumable import get_upload_store
+from .serializers import UPLOADS_RUTA, build_photo_url, project, serialize_row, serialize_comentario
+from .stats import cached_by_type, cached_daily, cached_dashboard, cached_monthly
 from .upload import save_uploaded_file, unidad_label, validate_aviso
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
-# Formato requerido por el frontend para mostrar/guardar fechas
-FMT = "%Y-%m-%d %H:%M"
 
-
-def _fmt(dt: datetime | None) -> str | None:
-    """
-    Formatea datetime a '%Y-%m-%d %H:%M'.
-      - dt: datetime | None — Fecha/hora a formatear.
-    ->
-      - str | None — Cadena formateada o None si dt es None.
-    """
-    if dt is None:
-        return None
-    return dt.strftime(FMT)
-
-
-def _build_photo_url(ruta_archivo: str, nombre_archivo: str) -> str:
+def _json_body(body: str, status: int = 200) -> Response:
     """
-    Normaliza la ruta+nombre de archivo a una URL servible '/static/...'.
-      - ruta_archivo: str — Carpeta guardada en BD (p. ej. 'static/uploads' o '/static/uploads').
-      - nombre_archivo: str — Nombre del archivo.
+    Respuesta JSON con un cuerpo ya serializado (sin pasar por jsonify).
+      - body: str — JSON.
+      - status: int — Código HTTP.
     ->
-      - str — URL relativa tipo '/static/…' o cadena vacía si faltan datos.
+      - Response
     """
-    ruta = (ruta_archivo or "").strip()
-    nombre = (nombre_archivo or "").strip()
-    if not ruta or not nombre:
-        return ""
-    base = ruta if ruta.startswith("/") else f"/{ruta}"
-    if not base.endswith("/"):
-        base = f"{base}/"
-    return f"{base}{nombre}"
-
-
-def _serialize_row(row: Tuple[AvisoAdopcion, Comuna, Region]) -> Dict[str, Any]:
-    """
-    Serializa un join (Aviso, Comuna, Región) al dict esperado por el front.
-      - row: tuple(AvisoAdopcion, Comuna, Region) — Fila del SELECT con joins.
-    ->
-      - dict[str, Any] — Objeto listo para JSON (keys: id, region, comuna, …).
-    """
-    aviso, comuna, region = row
-    fotos = [_build_photo_url(f.ruta_archivo, f.nombre_archivo) for f in aviso.fotos]
-    contactos = [{"via": c.nombre, "id": c.identificador} for c in aviso.contactos]
-
-    return {
-        "id": aviso.id,
-        "region": region.nombre if region else None,
-        "comuna": comuna.nombre if comuna else None,
-        "sector": aviso.sector,
-        "contacto_nombre": aviso.nombre,
-        "contacto_email": aviso.email,
-        "contacto_celular": aviso.celular,
-        "contactar_por": contactos,
-        "tipo": aviso.tipo,  # 'gato' | 'perro'
-        "cantidad": aviso.cantidad,
-        "edad": aviso.edad,
-        "edad_unidad": aviso.unidad_medida,  # 'a' | 'm'
-        "fecha_disponible": _fmt(aviso.fecha_entrega),
-        "creado_en": _fmt(aviso.fecha_ingreso),
-        "descripcion": aviso.descripcion,
-        "fotos": [p for p in fotos if p],
-    }
+    return current_app.response_class(body, status=status, mimetype="application/json")
 
 
 def _unidad_from_front(unidad_front: str | None) -> str:
@@ -117,51 +79,39 @@ def listar_avisos():
       - Query:
           - page: int >= 1 (default 1)
           - size: int [1..50] (default 5)
+          - order: 'recent' (default) | 'popular' — Populares: ranking en memoria (ver popular.py).
+          - view: 'full' | 'card' (opcional) — Preset de campos.
+          - fields: str (opcional) — Campos separados por coma (p. ej. 'id,tipo,fotos').
+          - near_comuna_id: int, radius_km: float (opcionales) — Sólo avisos de comunas a lo más a
+            radius_km (default NEAR_DEFAULT_RADIUS_KM), de la más cercana a la más lejana y luego
+            por fecha. Cada aviso trae distancia_km y la respuesta la lista 'comunas' consideradas.
     ->
       - ResponseReturnValue — JSON con {data, page, size, total_items, total_pages}.
     """
     try:
-        page = int(request.args.get("page", "1"))
-        size = int(request.args.get("size", "5"))
+        page, size = parse_pagination(request.args)
     except ValueError:
         return jsonify({"error": "Parámetros inválidos"}), 400
+    cfg = current_app.config
+    try:
+        fields = parse_fields(request.args)
+        order = parse_list_order(request.args)
+        near = parse_near(request.args, cfg["NEAR_DEFAULT_RADIUS_KM"], cfg["NEAR_MAX_RADIUS_KM"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if page < 1:
-        page = 1
-    if size < 1 or size > 50:
-        size = 5
-
-    offset = (page - 1) * size
-
-    with get_session() as s:
-        total_items = s.scalar(select(func.count(AvisoAdopcion.id))) or 0
-
-        stmt = (
-            select(AvisoAdopcion, Comuna, Region)
-            .join(Comuna, Comuna.id == AvisoAdopcion.comuna_id)
-            .join(Region, Region.id == Comuna.region_id)
-            .options(
-                joinedload(AvisoAdopcion.fotos),
-                joinedload(AvisoAdopcion.contactos),
-            )
-            .order_by(AvisoAdopcion.fecha_ingreso.desc(), AvisoAdopcion.id.desc())
-            .limit(size)
-            .offset(offset)
-        )
-        rows: List[Tuple[AvisoAdopcion, Comuna, Region]] = s.execute(stmt).unique().all()
-        data = [_serialize_row(r) for r in rows]
+    if near is not None:
+        if order == "popular":
+            return jsonify({"error": "near_comuna_id no se combina con order=popular."}), 400
+        if not comuna_exists(near[0]):
+            return jsonify({"error": "near_comuna_id no es una comuna."}), 400
+        return jsonify(cached_near_avisos_page(*near, page, size, sorted(fields) if fields is not None else None))
 
-    total_pages = (total_items + size - 1) // size if size else 0
+    if order == "popular":
+        return jsonify(popular_page(page, size, fields))
 
-    return jsonify(
-        {
-            "data": data,
-            "page": page,
-            "size": size,
-            "total_items": total_items,
-            "total_pages": total_pages,
-        }
-    )
+    # JSON guardado en aviso_proyeccion, enviado tal cual (ver readmodel.py)
+    return _json_body(cached_avisos_page_json(page, size, sorted(fields) if fields is not None else None))
 
 
 @api_bp.get("/avisos/latest")
@@ -170,34 +120,45 @@ def ultimos_avisos():
     Últimos N avisos por fecha_ingreso desc.
       - Query:
           - limit: int [1..10] (default 5)
+          - view / fields: ver listar_avisos.
     ->
       - ResponseReturnValue — JSON con {"data": [...]}.
     """
     try:
-        limit = int(request.args.get("limit", "5"))
+        limit = parse_latest_limit(request.args)
     except ValueError:
         return jsonify({"error": "Parámetro 'limit' inválido"}), 400
-    if limit < 1:
-        limit = 1
-    if limit > 10:
-        limit = 10
+    try:
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    with get_session() as s:
-        stmt = (
-            select(AvisoAdopcion, Comuna, Region)
-            .join(Comuna, Comuna.id == AvisoAdopcion.comuna_id)
-            .join(Region, Region.id == Comuna.region_id)
-            .options(
-                joinedload(AvisoAdopcion.fotos),
-                joinedload(AvisoAdopcion.contactos),
-            )
-            .order_by(AvisoAdopcion.fecha_ingreso.desc(), AvisoAdopcion.id.desc())
-            .limit(limit)
-        )
-        rows: List[Tuple[AvisoAdopcion, Comuna, Region]] = s.execute(stmt).unique().all()
-        data = [_serialize_row(r) for r in rows]
+    # servido desde el ring buffer en memoria (ver feed.py): sin SQL, sólo se poda el JSON
+    return jsonify({"data": [project(a, fields) for a in get_latest(limit)]})
+
+
+@api_bp.get("/avisos/changes")
+def cambios_avisos():
+    """
+    Feed incremental para espejos y clientes offline (ver changes.py).
+      - Query:
+          - since: token "next" de la respuesta anterior (default 0 = desde el inicio del log)
+          - limit: int [1..CHANGES_MAX_LIMIT] (default CHANGES_DEFAULT_LIMIT)
+    ->
+      - ResponseReturnValue — JSON {"changes": [{seq, entity, id, aviso_id, op, at, data}], "next", "has_more"};
+        410 si el token ya no es válido (purgado): el cliente debe resincronizar desde /api/avisos.
+    """
+    try:
+        since, limit = parse_changes_args(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
 
-    return jsonify({"data": data})
+    with get_session() as s:
+        try:
+            payload = changes_since(s, since, limit)
+        except ChangeTokenGone:
+            return jsonify({"error": "Token 'since' expirado; resincronice desde /api/avisos."}), 410
+    return jsonify(payload)
 
 
 @api_bp.get("/avisos/<int:aviso_id>")
@@ -205,26 +166,24 @@ def detalle_aviso(aviso_id: int):
     """
     Detalle de un aviso por ID.
       - aviso_id: int — Identificador del aviso.
+      - Query: view / fields (ver listar_avisos).
     ->
       - ResponseReturnValue — JSON con el aviso serializado o 404.
     """
-    with get_session() as s:
-        stmt = (
-            select(AvisoAdopcion, Comuna, Region)
-            .join(Comuna, Comuna.id == AvisoAdopcion.comuna_id)
-            .join(Region, Region.id == Comuna.region_id)
-            .options(
-                joinedload(AvisoAdopcion.fotos),
-                joinedload(AvisoAdopcion.contactos),
-            )
-            .where(AvisoAdopcion.id == aviso_id)  # type: ignore[arg-type]
-        )
-        row = s.execute(stmt).first()
+    try:
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        if not row:
-            return jsonify({"error": "Aviso no encontrado"}), 404
+    with get_session() as s:
+        found = aviso_detail_json(s, aviso_id, fields)
 
-        return jsonify(_serialize_row(row))
+    if found is None:
+        return jsonify({"error": "Aviso no encontrado"}), 404
+    body, archivado = found
+    if not archivado:
+        record_view(aviso_id)
+    return _json_body(body)
 
 
 @api_bp.get("/regiones")
@@ -235,10 +194,7 @@ def listar_regiones():
     ->
       - ResponseReturnValue — JSON con {"data": [{"id", "nombre"}, ...]}.
     """
-    with get_session() as s:
-        rows = s.execute(select(Region.id, Region.nombre).order_by(Region.nombre.asc())).all()
-        data = [{"id": r.id, "nombre": r.nombre} for r in rows]
-    return jsonify({"data": data})
+    return jsonify({"data": get_regiones()})
 
 
 @api_bp.get("/regiones/<int:region_id>/comunas")
@@ -249,17 +205,32 @@ def listar_comunas(region_id: int):
     ->
       - ResponseReturnValue — JSON con {"data": [{"id", "nombre"}, ...]}.
     """
-    with get_session() as s:
-        rows = s.execute(
-            select(Comuna.id, Comuna.nombre)
-            .where(Comuna.region_id == region_id)  # type: ignore[arg-type]
-            .order_by(Comuna.nombre.asc())
-        ).all()
-        data = [{"id": c.id, "nombre": c.nombre} for c in rows]
-    return jsonify({"data": data})
+    return jsonify({"data": get_comunas(region_id)})
+
+
+def _undo_photos(uploads, upload_folder: str, saved: List[str], claimed: List[Tuple[str, str]]) -> None:
+    """
+    Deshace las fotos de un aviso que no se guardó: borra las subidas por formulario y devuelve las
+    reanudables a su sesión.
+      - uploads: UploadStore
+      - upload_folder: str — UPLOAD_FOLDER.
+      - saved: list[str] — Archivos escritos por save_uploaded_file.
+      - claimed: list[(upload_id, nombre)] — Subidas finalizadas.
+    ->
+      - None
+    """
+    for nombre in saved:
+        try:
+            os.remove(os.path.join(upload_folder, nombre))
+        except FileNotFoundError:
+            pass
+    for upload_id, nombre in claimed:
+        uploads.restore(upload_id, upload_folder, nombre)
 
 
 @api_bp.post("/avisos")
+@rate_limited("post")
+@admission("write")
 def crear_aviso():
     """
     Crea un aviso y guarda sus fotos.
@@ -271,7 +242,8 @@ def crear_aviso():
     files = request.files
 
     with get_session() as s:
-        data, errs = validate_aviso(form, files, s)
+        uploads = get_upload_store()
+        data, errs = validate_aviso(form, files, s, uploads)
         if errs:
             return jsonify({"errores": errs}), 400
 
@@ -301,27 +273,63 @@ def crear_aviso():
                 aviso_id=aviso.id,
             ))
 
-        # Fotos
+        # Fotos. Si el aviso no se llega a guardar, _undo_photos borra los archivos escritos y
+        # devuelve las subidas reanudables a su sesión (el cliente puede reintentar con los mismos ids).
         upload_folder = current_app.config["UPLOAD_FOLDER"]
-        for f in data["fotos_files"]:
-            nombre_archivo = save_uploaded_file(
-                f,
-                upload_folder=upload_folder,
-                tipo=data["tipo"],
-                edad=data["edad"],
-                unidad=data["unidad"],
-            )
-            s.add(Foto(
-                ruta_archivo="static/uploads",
-                nombre_archivo=nombre_archivo,
-                aviso_id=aviso.id,
-            ))
-
-        s.commit()
+        saved: List[str] = []
+        claimed: List[Tuple[str, str]] = []
+        try:
+            for f in data["fotos_files"]:
+                nombre_archivo = save_uploaded_file(
+                    f,
+                    upload_folder=upload_folder,
+                    tipo=data["tipo"],
+                    edad=data["edad"],
+                    unidad=data["unidad"],
+                )
+                saved.append(nombre_archivo)
+                s.add(Foto(
+                    ruta_archivo=UPLOADS_RUTA,
+                    nombre_archivo=nombre_archivo,
+                    aviso_id=aviso.id,
+                ))
+            for upload_id in data["fotos_uploads"]:
+                try:
+                    nombre_archivo = uploads.finalize(
+                        upload_id,
+                        upload_folder=upload_folder,
+                        tipo=data["tipo"],
+                        edad=data["edad"],
+                        unidad=data["unidad"],
+                    )
+                except KeyError:
+                    # otra request la reclamó (doble envío) o expiró entre la validación y aquí
+                    s.rollback()
+                    _undo_photos(uploads, upload_folder, saved, claimed)
+                    return jsonify({"errores": [f"Foto {upload_id}: subida no encontrada o incompleta."]}), 400
+                claimed.append((upload_id, nombre_archivo))
+                s.add(Foto(
+                    ruta_archivo=UPLOADS_RUTA,
+                    nombre_archivo=nombre_archivo,
+                    aviso_id=aviso.id,
+                ))
+
+            s.flush()
+            refresh_projection(s, [aviso.id])
+            record_changes(s, [("aviso", aviso.id, aviso.id, "create")])
+            s.commit()
+        except Exception:
+            s.rollback()
+            _undo_photos(uploads, upload_folder, saved, claimed)
+            raise
+        for upload_id, _ in claimed:
+            uploads.release(upload_id)
 
         # Respuesta
         region = s.get(Region, data["comuna"].region_id)
-        fotos_urls = [f"/static/uploads/{f.nombre_archivo}" for f in (aviso.fotos or [])]
+        get_feed().push(serialize_row((aviso, data["comuna"], region)))
+        publish("avisos", "stats", "comentarios")  # comentarios: el 404 de un id nuevo pudo quedar cacheado
+        fotos_urls = [build_photo_url(f.ruta_archivo, f.nombre_archivo) for f in (aviso.fotos or [])]
         contactos = [{"via": c.nombre, "id": c.identificador} for c in (aviso.contactos or [])]
 
         return jsonify({
@@ -345,6 +353,7 @@ def crear_aviso():
 
 
 @api_bp.get("/stats/daily")
+@admission("stats")
 def stats_daily():
     """
     Cantidad de avisos agregados por día en un rango.
@@ -353,41 +362,15 @@ def stats_daily():
       - JSON: {"labels": [YYYY-MM-DD, ...], "datasets": [{"label": "Avisos por día", "data": [int, ...]}]}
     """
     try:
-        to_s = request.args.get("to")
-        from_s = request.args.get("from")
-        today = date.today()
-        to_d = datetime.strptime(to_s, "%Y-%m-%d").date() if to_s else today
-        from_d = datetime.strptime(from_s, "%Y-%m-%d").date() if from_s else (to_d - timedelta(days=30))
-        if from_d > to_d:
-            from_d, to_d = to_d, from_d
+        from_d, to_d = parse_date_range(request.args)
     except ValueError:
         return jsonify({"error": "Formato de fecha inválido"}), 400
 
-    with get_session() as s:
-        rows = s.execute(
-            select(func.date(AvisoAdopcion.fecha_ingreso).label("dia"),
-                   func.count(AvisoAdopcion.id))
-            .where(AvisoAdopcion.fecha_ingreso >= datetime.combine(from_d, datetime.min.time()),
-                   AvisoAdopcion.fecha_ingreso <= datetime.combine(to_d, datetime.max.time()))
-            .group_by("dia")
-            .order_by("dia")
-        ).all()
-    counts = {r[0].strftime("%Y-%m-%d"): int(r[1]) for r in rows}
-    labels, data = [], []
-    cur = from_d
-    while cur <= to_d:
-        key = cur.strftime("%Y-%m-%d")
-        labels.append(key)
-        data.append(counts.get(key, 0))
-        cur += timedelta(days=1)
-
-    return jsonify({
-        "labels": labels,
-        "datasets": [{"label": "Avisos por día", "data": data}]
-    })
+    return jsonify(cached_daily(from_d, to_d))
 
 
 @api_bp.get("/stats/by-type")
+@admission("stats")
 def stats_by_type():
     """
     Totales de avisos por tipo de mascota.
@@ -395,22 +378,11 @@ def stats_by_type():
     ->
       - JSON: {"labels": ["gato","perro"], "datasets": [{"label": "Total por tipo", "data": [gatos, perros]}]}
     """
-    with get_session() as s:
-        rows = s.execute(
-            select(AvisoAdopcion.tipo, func.count(AvisoAdopcion.id))
-            .group_by(AvisoAdopcion.tipo)
-        ).all()
-    totals = {t: int(c) for (t, c) in rows}
-    labels = ["Gato", "Perro"]
-    data = [totals.get("gato", 0), totals.get("perro", 0)]
-    colors = ["#2196F3", "#FF9800"]
-    return jsonify({
-        "labels": labels,
-        "datasets": [{"label": "Total por tipo", "data": data, "backgroundColor": colors, }]
-    })
+    return jsonify(cached_by_type())
 
 
 @api_bp.get("/stats/monthly")
+@admission("stats")
 def stats_monthly():
     """
     Cantidad de avisos por mes (dos barras por mes: gatos y perros) para un año.
@@ -420,99 +392,94 @@ def stats_monthly():
                                                                  {"label": "Perros", "data": [..12..]}]}
     """
     try:
-        year = int(request.args.get("year")) if request.args.get("year") else datetime.now().year
+        year = parse_year(request.args)
     except ValueError:
         return jsonify({"error": "Parámetro 'year' inválido"}), 400
 
-    with get_session() as s:
-        rows = s.execute(
-            select(func.month(AvisoAdopcion.fecha_ingreso).label("mes"),
-                   AvisoAdopcion.tipo,
-                   func.count(AvisoAdopcion.id))
-            .where(func.year(AvisoAdopcion.fecha_ingreso) == year)
-            .group_by("mes", AvisoAdopcion.tipo)
-            .order_by("mes")
-        ).all()
-    gatos = [0] * 12
-    perros = [0] * 12
-    for mes, tipo, cnt in rows:
-        if 1 <= mes <= 12:
-            if tipo == "gato":
-                gatos[mes - 1] = int(cnt)
-            elif tipo == "perro":
-                perros[mes - 1] = int(cnt)
-
-    labels = [f"{year}-{m:02d}" for m in range(1, 13)]
-    return jsonify({
-        "labels": labels,
-        "datasets": [
-            {"label": "Gatos", "data": gatos, "backgroundColor": "#2196F3"},
-            {"label": "Perros", "data": perros, "backgroundColor": "#FF9800"}
-        ]
-    })
+    return jsonify(cached_monthly(year))
 
 
-@api_bp.get("/avisos/<int:aviso_id>/comentarios")
-def listar_comentarios(aviso_id: int):
+@api_bp.get("/stats/dashboard")
+@admission("stats")
+def stats_dashboard():
     """
-    Lista comentarios de un aviso.
-      - Query:
-          - offset: int >= 0 (default 0)
-          - limit:  int [1..100] (default 20)
-          - order:  'asc'|'desc' (default 'desc')
+    Las tres estadísticas de la página (diaria, por tipo y mensual) en un request: una consulta sobre los
+    rangos pedidos más el total por tipo (la entrada cacheada de stats_by_type).
+      - Query: from, to (serie diaria, ver stats_daily), year (serie mensual, ver stats_monthly)
     ->
-      - JSON: {"items":[...], "total":int, "offset":int, "limit":int, "order":str}
+      - JSON: {"daily": {...}, "by_type": {...}, "monthly": {...}} — cada uno en formato Chart.js.
     """
-    # parse query
     try:
-        offset = max(int(request.args.get("offset", "0")), 0)
+        from_d, to_d = parse_date_range(request.args)
+        year = parse_year(request.args)
     except ValueError:
-        offset = 0
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+    return jsonify(cached_dashboard(from_d, to_d, year))
+
+
+@api_bp.get("/stats/heatmap")
+@admission("stats")
+def stats_heatmap():
+    """
+    Avisos por región y mes para un año (calculado sobre el snapshot NumPy, ver analytics.py).
+      - Query: year=YYYY (opcional, default año actual)
+    ->
+      - JSON: {"labels": ["YYYY-01",...], "regions": [{"id","nombre"}], "data": [[12 ints] por región], "max": int}
+    """
     try:
-        limit = int(request.args.get("limit", "20"))
-        limit = max(1, min(limit, 100))
+        year = parse_year(request.args)
     except ValueError:
-        limit = 20
-    order = (request.args.get("order") or "desc").lower()
-    order = "asc" if order == "asc" else "desc"
+        return jsonify({"error": "Parámetro 'year' inválido"}), 400
 
-    with get_session() as s:
-        # verificar existencia aviso
-        exists = s.scalar(select(func.count(AvisoAdopcion.id)).where(AvisoAdopcion.id == aviso_id)) or 0
-        if not exists:
-            return jsonify({"error": "Aviso no encontrado"}), 404
+    return jsonify(heatmap_payload(get_snapshot(), year))
 
-        total = s.scalar(
-            select(func.count(Comentario.id)).where(Comentario.aviso_id == aviso_id)
-        ) or 0
 
-        q = select(Comentario).where(Comentario.aviso_id == aviso_id)
-        if order == "asc":
-            q = q.order_by(Comentario.fecha.asc(), Comentario.id.asc())
-        else:
-            q = q.order_by(Comentario.fecha.desc(), Comentario.id.desc())
+@api_bp.get("/stats/ages")
+@admission("stats")
+def stats_ages():
+    """
+    Distribución de edades (normalizadas a meses) por tipo de mascota.
+      - None
+    ->
+      - JSON formato Chart.js: {"labels": [rangos], "datasets": [{"label": "Gatos", ...}, {"label": "Perros", ...}]}
+    """
+    return jsonify(ages_payload(get_snapshot()))
 
-        rows: List[Comentario] = s.execute(q.offset(offset).limit(limit)).scalars().all()
 
-        items = [{
-            "id": c.id,
-            "aviso_id": c.aviso_id,
-            "nombre": c.nombre,
-            "texto": c.texto,
-            # usamos el mismo formato que el frontend ya consume (Card.#fmt soporta "YYYY-MM-DD HH:MM")
-            "fecha": _fmt(c.fecha),
-        } for c in rows]
+@api_bp.get("/stats/time-to-delivery")
+@admission("stats")
+def stats_time_to_delivery():
+    """
+    Histograma de días entre ingreso y fecha de entrega, por tipo de mascota.
+      - None
+    ->
+      - JSON formato Chart.js + "median_days".
+    """
+    return jsonify(delivery_payload(get_snapshot()))
 
-    return jsonify({
-        "items": items,
-        "total": int(total),
-        "offset": offset,
-        "limit": limit,
-        "order": order,
-    })
+
+@api_bp.get("/avisos/<int:aviso_id>/comentarios")
+def listar_comentarios(aviso_id: int):
+    """
+    Lista comentarios de un aviso.
+      - Query:
+          - offset: int >= 0 (default 0)
+          - limit:  int [1..100] (default 20)
+          - order:  'asc'|'desc' (default 'desc')
+    ->
+      - JSON: {"items":[...], "total":int, "offset":int, "limit":int, "order":str}
+    """
+    offset, limit, order = parse_comment_window(request.args)
+
+    payload = cached_comentarios_page(aviso_id, offset, limit, order)
+    if payload is None:
+        return jsonify({"error": "Aviso no encontrado"}), 404
+    return jsonify(payload)
 
 
 @api_bp.post("/avisos/<int:aviso_id>/comentarios")
+@rate_limited("post")
 def crear_comentario(aviso_id: int):
     """
     Crea un comentario para un aviso.
@@ -532,7 +499,7 @@ def crear_comentario(aviso_id: int):
 
     with get_session() as s:
         # verificar existencia aviso
-        exists = s.scalar(select(func.count(AvisoAdopcion.id)).where(AvisoAdopcion.id == aviso_id)) or 0
+        exists = s.scalar(hot_aviso_exists(), {"aviso_id": aviso_id}) or 0
         if not exists:
             return jsonify({"error": "Aviso no encontrado"}), 404
 
@@ -545,13 +512,11 @@ def crear_comentario(aviso_id: int):
             fecha=now,
         )
         s.add(c)
+        s.flush()  # obtener c.id para el log de cambios
+        bump_comentarios(s, aviso_id)
+        record_changes(s, [("comentario", c.id, aviso_id, "create")])
         s.commit()
         s.refresh(c)
+        publish("comentarios")
 
-        return jsonify({
-            "id": c.id,
-            "aviso_id": c.aviso_id,
-            "nombre": c.nombre,
-            "texto": c.texto,
-            "fecha": _fmt(c.fecha),
-        }), 201
+        return jsonify(serialize_comentario(c)), 201
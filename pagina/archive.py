@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import List, Type
+
+import click
+from flask import Flask
+from sqlalchemy import select, insert, delete, literal
+
+from .bus import publish
+from .changes import changes_for_avisos, purge_changes, record_changes
+from .db import Base, get_session
+from .feed import get_feed
+from .models import (
+    AvisoAdopcion, AvisoVistas, Foto, ContactarPor, Comentario, Nota,
+    AvisoAdopcionArchivo, FotoArchivo, ContactarPorArchivo, ComentarioArchivo, NotaArchivo,
+)
+from .readmodel import delete_projection
+
+# (tabla caliente, tabla de archivo) de los hijos de aviso_adopcion
+CHILD_TABLES = [
+    (Foto, FotoArchivo),
+    (ContactarPor, ContactarPorArchivo),
+    (Comentario, ComentarioArchivo),
+    (Nota, NotaArchivo),
+]
+
+
+def _copy_children(src: Type[Base], dst: Type[Base], ids: List[int]):
+    """
+    INSERT INTO <dst> SELECT ... FROM <src> WHERE aviso_id IN (ids).
+      - src: modelo caliente.
+      - dst: modelo de archivo (mismas columnas).
+      - ids: List[int] — IDs de avisos del lote.
+    ->
+      - Insert
+    """
+    cols = [c.name for c in dst.__table__.columns]
+    return insert(dst).from_select(
+        cols,
+        select(*[src.__table__.c[name] for name in cols]).where(src.aviso_id.in_(ids)),
+    )
+
+
+def archive_expired(cutoff: datetime, batch_size: int) -> int:
+    """
+    Mueve a las tablas *_archivo los avisos con fecha_entrega < cutoff (y sus hijos).
+    Cada lote es una transacción: copia aviso + hijos y luego los borra de las tablas calientes.
+      - cutoff: datetime — Se archivan avisos cuya fecha_entrega es anterior.
+      - batch_size: int — Avisos por transacción.
+    ->
+      - int — Cantidad de avisos archivados.
+    """
+    aviso_cols = [c.name for c in AvisoAdopcion.__table__.columns]
+    total = 0
+    while True:
+        with get_session() as s:
+            ids = s.scalars(
+                select(AvisoAdopcion.id)
+                .where(AvisoAdopcion.fecha_entrega < cutoff)
+                .order_by(AvisoAdopcion.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            s.execute(insert(AvisoAdopcionArchivo).from_select(
+                aviso_cols + ["archivado_en"],
+                select(
+                    *[AvisoAdopcion.__table__.c[name] for name in aviso_cols],
+                    literal(datetime.now()),
+                ).where(AvisoAdopcion.id.in_(ids)),
+            ))
+            for src, dst in CHILD_TABLES:
+                s.execute(_copy_children(src, dst, ids))
+                s.execute(delete(src).where(src.aviso_id.in_(ids)))
+            # las visitas sólo sirven para el ranking de avisos vigentes
+            s.execute(delete(AvisoVistas).where(AvisoVistas.aviso_id.in_(ids)))
+            s.execute(delete(AvisoAdopcion).where(AvisoAdopcion.id.in_(ids)))
+            delete_projection(s, ids)
+            # los espejos borran el aviso y sus comentarios
+            record_changes(s, changes_for_avisos(ids, "delete"))
+        total += len(ids)
+    return total
+
+
+def init_archive_cli(app: Flask) -> None:
+    """
+    Registra el comando `flask archivar-avisos` (pensado para cron).
+      - app: Flask — Aplicación (usa ARCHIVE_AFTER_DAYS y ARCHIVE_BATCH_SIZE).
+    ->
+      - None
+    """
+
+    @app.cli.command("archivar-avisos")
+    @click.option("--dias", type=int, default=None,
+                  help="Archivar avisos con fecha_entrega hace más de N días (default ARCHIVE_AFTER_DAYS).")
+    @click.option("--lote", type=int, default=None,
+                  help="Avisos por transacción (default ARCHIVE_BATCH_SIZE).")
+    def archivar_avisos(dias, lote):
+        dias = dias if dias is not None else app.config["ARCHIVE_AFTER_DAYS"]
+        lote = lote or app.config["ARCHIVE_BATCH_SIZE"]
+        cutoff = datetime.now() - timedelta(days=dias)
+        n = archive_expired(cutoff, lote)
+        if n:
+            # los workers de este host recargan su ring buffer de últimos avisos (los de otros nodos, vía bus)
+            get_feed().invalidate()
+            publish("avisos", "stats", "comentarios")
+        click.echo(f"{n} avisos archivados (fecha_entrega < {cutoff:%Y-%m-%d %H:%M}).")
+        with get_session() as s:
+            purged = purge_changes(s, datetime.now() - timedelta(days=app.config["CHANGE_LOG_RETENTION_DAYS"]))
+        if purged:
+            click.echo(f"{purged} filas del log de cambios purgadas.")
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import math
+
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart, Blueprint, current_app, request, jsonify
+from werkzeug.exceptions import HTTPException
+
+from . import create_app
+from .admission import call_admitted
+from .bus import start_bus
+from .catalog import catalog_ready, comuna_exists, get_comunas, get_regiones
+from .compression import init_async_compression
+from .config import Config
+from .db import get_async_session, dispose_async_engine
+from .feed import get_feed
+from .popular import popular_page, popular_ready, record_view
+from .profiler import init_async_profiler
+from .queries import (
+    hot_proyeccion, hot_proyeccion_page, hot_archived_aviso, projected_json, projection_source,
+    cached_avisos_page_json, cached_comentarios_page, cached_near_avisos_page,
+    parse_fields, parse_list_order, parse_near, parse_pagination, parse_latest_limit, parse_comment_window, parse_date_range, parse_year,
+)
+from .serializers import project, serialize_row
+from .stats import cached_by_type, cached_daily, cached_dashboard, cached_monthly
+
+# Endpoints de lectura en modo asíncrono (mismas URLs y payloads que api.py).
+# Escrituras, páginas y estáticos siguen atendidos por la app Flask (ver _Dispatcher).
+# Lo que api.py sirve desde el cache compartido o de memoria (listados, comentarios, catálogo,
+# estadísticas) pasa aquí por los mismos helpers, en un thread: una URL se comporta igual sea cual
+# sea la app que la atiende. Últimos avisos y detalle consultan con el engine async.
+async_api_bp = Blueprint("async_api", __name__, url_prefix="/api")
+
+
+@async_api_bp.get("/avisos")
+async def listar_avisos():
+    """
+    Listado paginado de avisos (ver api.listar_avisos).
+      - Query: page, size, order, view, fields, near_comuna_id, radius_km
+    ->
+      - JSON con {data, page, size, total_items, total_pages}.
+    """
+    try:
+        page, size = parse_pagination(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+    cfg = current_app.config
+    try:
+        fields = parse_fields(request.args)
+        order = parse_list_order(request.args)
+        near = parse_near(request.args, cfg["NEAR_DEFAULT_RADIUS_KM"], cfg["NEAR_MAX_RADIUS_KM"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if near is not None:
+        if order == "popular":
+            return jsonify({"error": "near_comuna_id no se combina con order=popular."}), 400
+        comuna_id, radius_km = near
+        # catálogo en memoria; la primera vez se carga con la sesión síncrona fuera del event loop
+        known = comuna_exists(comuna_id) if catalog_ready() else await asyncio.to_thread(comuna_exists, comuna_id)
+        if not known:
+            return jsonify({"error": "near_comuna_id no es una comuna."}), 400
+        # mismo helper cacheado que api.py (cache compartido, invalidación por bus), en un thread
+        return jsonify(await asyncio.to_thread(
+            cached_near_avisos_page, comuna_id, radius_km, page, size, sorted(fields) if fields is not None else None,
+        ))
+
+    if order == "popular":
+        # ranking en memoria; la primera vez se calcula con la sesión síncrona fuera del event loop
+        if popular_ready():
+            return jsonify(popular_page(page, size, fields))
+        return jsonify(await asyncio.to_thread(popular_page, page, size, fields))
+
+    # JSON de aviso_proyeccion por el mismo helper cacheado que api.py, en un thread
+    body = await asyncio.to_thread(
+        cached_avisos_page_json, page, size, sorted(fields) if fields is not None else None,
+    )
+    return current_app.response_class(body, mimetype="application/json")
+
+
+@async_api_bp.get("/avisos/latest")
+async def ultimos_avisos():
+    """
+    Últimos N avisos por fecha_ingreso desc (ver api.ultimos_avisos).
+      - Query: limit, view, fields
+    ->
+      - JSON con {"data": [...]}.
+    """
+    try:
+        limit = parse_latest_limit(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro 'limit' inválido"}), 400
+    try:
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ring buffer en memoria (feed.py); sólo se consulta la BD si está obsoleto
+    feed = get_feed()
+    data = feed.snapshot(limit)
+    if data is None:
+        stamp = feed.current_stamp()
+        async with get_async_session() as s:
+            raws = (await s.scalars(hot_proyeccion_page("completo"), {"limit": feed.capacity, "offset": 0})).all()
+            items = [json.loads(r) for r in raws]
+        feed.load(items, stamp)
+        data = items[:limit]
+
+    return jsonify({"data": [project(a, fields) for a in data]})
+
+
+@async_api_bp.get("/avisos/<int:aviso_id>")
+async def detalle_aviso(aviso_id: int):
+    """
+    Detalle de un aviso por ID (ver api.detalle_aviso).
+      - aviso_id: int — Identificador del aviso.
+      - Query: view, fields
+    ->
+      - JSON con el aviso serializado o 404.
+    """
+    try:
+        fields = parse_fields(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    column, prune = projection_source(fields)
+    async with get_async_session() as s:
+        raw = await s.scalar(hot_proyeccion(column), {"aviso_id": aviso_id})
+        if raw is not None:
+            record_view(aviso_id)
+            return current_app.response_class(projected_json(raw, fields, prune), mimetype="application/json")
+
+        row = (await s.execute(hot_archived_aviso(fields), {"aviso_id": aviso_id})).unique().first()
+        if row:
+            return jsonify({**serialize_row(row, fields), "archivado": True})
+
+    return jsonify({"error": "Aviso no encontrado"}), 404
+
+
+@async_api_bp.get("/regiones")
+async def listar_regiones():
+    """
+    Lista todas las regiones (ver api.listar_regiones).
+      - (None)
+    ->
+      - JSON con {"data": [{"id", "nombre"}, ...]}.
+    """
+    # catálogo en memoria (catalog.py); la primera vez se carga con la sesión síncrona fuera del event loop
+    data = get_regiones() if catalog_ready() else await asyncio.to_thread(get_regiones)
+    return jsonify({"data": data})
+
+
+@async_api_bp.get("/regiones/<int:region_id>/comunas")
+async def listar_comunas(region_id: int):
+    """
+    Lista comunas de una región (ver api.listar_comunas).
+      - region_id: int — ID de la región.
+    ->
+      - JSON con {"data": [{"id", "nombre"}, ...]}.
+    """
+    data = get_comunas(region_id) if catalog_ready() else await asyncio.to_thread(get_comunas, region_id)
+    return jsonify({"data": data})
+
+
+async def _stats(fn, *args):
+    """
+    Estadísticas por los mismos helpers cacheados que api.py (cache compartido e invalidación por
+    bus), en un thread y con el limitador 'stats' que comparte con la app Flask del proceso.
+      - fn: Callable — stats.cached_*.
+      - args: argumentos de fn.
+    ->
+      - Response — JSON, o 503 con Retry-After si no hubo turno.
+    """
+    limiter = current_app.extensions["admission"]["limiters"]["stats"]
+    admitted, payload = await asyncio.to_thread(call_admitted, limiter, fn, *args)
+    if not admitted:
+        response = jsonify({"error": "Servidor saturado, reintente más tarde."})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(max(1, math.ceil(current_app.config["ADMISSION_RETRY_AFTER"])))
+        return response
+    return jsonify(payload)
+
+
+@async_api_bp.get("/stats/daily")
+async def stats_daily():
+    """
+    Avisos por día en un rango (ver api.stats_daily).
+      - Query: from, to
+    ->
+      - JSON formato Chart.js.
+    """
+    try:
+        from_d, to_d = parse_date_range(request.args)
+    except ValueError:
+        return jsonify({"error": "Formato de fecha inválido"}), 400
+
+    return await _stats(cached_daily, from_d, to_d)
+
+
+@async_api_bp.get("/stats/by-type")
+async def stats_by_type():
+    """
+    Totales por tipo de mascota (ver api.stats_by_type).
+      - None
+    ->
+      - JSON formato Chart.js.
+    """
+    return await _stats(cached_by_type)
+
+
+@async_api_bp.get("/stats/monthly")
+async def stats_monthly():
+    """
+    Avisos por mes y tipo para un año (ver api.stats_monthly).
+      - Query: year
+    ->
+      - JSON formato Chart.js.
+    """
+    try:
+        year = parse_year(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro 'year' inválido"}), 400
+
+    return await _stats(cached_monthly, year)
+
+
+@async_api_bp.get("/stats/dashboard")
+async def stats_dashboard():
+    """
+    Estadísticas diaria, por tipo y mensual en un request (ver api.stats_dashboard).
+      - Query: from, to, year
+    ->
+      - JSON: {"daily", "by_type", "monthly"}.
+    """
+    try:
+        from_d, to_d = parse_date_range(request.args)
+        year = parse_year(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+    return await _stats(cached_dashboard, from_d, to_d, year)
+
+
+@async_api_bp.get("/avisos/<int:aviso_id>/comentarios")
+async def listar_comentarios(aviso_id: int):
+    """
+    Lista comentarios de un aviso (ver api.listar_comentarios).
+      - Query: offset, limit, order
+    ->
+      - JSON: {"items":[...], "total":int, "offset":int, "limit":int, "order":str}
+    """
+    offset, limit, order = parse_comment_window(request.args)
+
+    # mismo helper cacheado que api.py (incluye el fallback a comentario_archivo), en un thread
+    payload = await asyncio.to_thread(cached_comentarios_page, aviso_id, offset, limit, order)
+    if payload is None:
+        return jsonify({"error": "Aviso no encontrado"}), 404
+    return jsonify(payload)
+
+
+class _Dispatcher:
+    """
+    App ASGI que enruta cada request:
+      - rutas registradas en la app Quart (lecturas async) → Quart.
+      - todo lo demás (POST, páginas, estáticos) → app Flask vía WsgiToAsgi (pool de threads).
+    """
+
+    def __init__(self, async_app: Quart, wsgi_app) -> None:
+        self.async_app = async_app
+        self.wsgi_app = WsgiToAsgi(wsgi_app)
+
+    def _is_async_route(self, scope) -> bool:
+        """
+        Indica si (method, path) del scope calza con una ruta de la app Quart.
+          - scope: dict — Scope ASGI 'http'.
+        ->
+          - bool
+        """
+        adapter = self.async_app.url_map.bind("")
+        try:
+            adapter.match(scope["path"], method=scope["method"])
+        except HTTPException:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan" or (scope["type"] == "http" and self._is_async_route(scope)):
+            await self.async_app(scope, receive, send)
+            return
+        await self.wsgi_app(scope, receive, send)
+
+
+def create_asgi_app():
+    """
+    Crea la app ASGI: lecturas async sobre el engine asíncrono + app Flask para el resto.
+      - (None)
+    ->
+      - Callable ASGI — Servible con `hypercorn asgi:app`.
+    """
+    async_app = Quart(__name__)
+    async_app.config.from_object(Config)
+    async_app.register_blueprint(async_api_bp)
+    init_async_compression(async_app)
+
+    @async_app.before_serving
+    async def _start_bus() -> None:
+        # las lecturas async no pasan por before_request de Flask: el receptor arranca al servir
+        if async_app.config["BUS_BACKEND"] is not None:
+            start_bus()
+
+    @async_app.after_serving
+    async def _close_pool() -> None:
+        await dispose_async_engine()
+
+    wsgi_app = create_app()
+    # un solo limitador por clase en el proceso, sea Flask o Quart quien atienda
+    async_app.extensions["admission"] = wsgi_app.extensions["admission"]
+    init_async_profiler(async_app, wsgi_app.extensions["profiler"])
+    return _Dispatcher(async_app, wsgi_app)
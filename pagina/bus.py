@@ -0,0 +1,377 @@
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from flask import Flask
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from .db import get_session
+from .metrics import metrics
+from .models import Invalidacion, InvalidacionSeq
+
+# Bus de invalidación: las escrituras publican (después del commit) los namespaces que cambiaron
+# y cada capa de cache se suscribe. publish() aplica primero en el proceso actual y luego difunde
+# a los demás procesos / nodos según BUS_BACKEND:
+#   - None:  sólo el proceso actual (un nodo; el cache compartido y el stamp del feed ya son por host).
+#   - "udp": multicast UDP. Latencia de ms; un mensaje perdido se detecta por hueco en la secuencia
+#            del emisor y se invalida todo. Cada emisor repite su secuencia en un latido cada
+#            BUS_UDP_HEARTBEAT_INTERVAL s, así también se detecta la pérdida del último mensaje.
+#   - "db":  tabla de cambios (bdd/tabla-invalidacion.sql) consultada cada BUS_POLL_INTERVAL s.
+#            Confiable: obsolescencia ≤ BUS_POLL_INTERVAL + duración de la consulta. Los ids siguen
+#            el orden de commit (invalidacion_seq), así "id > último visto" no se salta filas.
+# Todos los workers escuchan (un listener por proceso), así también se limpian los caches en memoria.
+
+# Namespaces conocidos (ante pérdida de mensajes se invalidan todos)
+ALL_NAMESPACES = frozenset({"avisos", "stats", "comentarios", "catalogo"})
+
+Subscriber = Callable[[FrozenSet[str], bool], None]
+_subscribers: List[Subscriber] = []
+
+
+def subscribe(fn: Subscriber) -> None:
+    """
+    Registra una capa de cache. fn(namespaces, remote) se llama en cada publicación;
+    remote=False si la escritura ocurrió en este mismo proceso.
+      - fn: Callable[[frozenset[str], bool], None]
+    ->
+      - None
+    """
+    if fn not in _subscribers:
+        _subscribers.append(fn)
+
+
+def _deliver(namespaces: FrozenSet[str], remote: bool) -> None:
+    for fn in list(_subscribers):
+        try:
+            fn(namespaces, remote)
+        except Exception:  # noqa: BLE001 - una capa que falla no debe impedir invalidar las demás
+            metrics.inc("bus.subscriber_errors")
+
+
+class InvalidationBus:
+    """
+    Backend base: sin difusión (sólo el proceso actual).
+    """
+
+    def __init__(self) -> None:
+        # identifica al proceso emisor (para no re-aplicar los mensajes propios)
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def send(self, namespaces: FrozenSet[str]) -> None:
+        """
+        Difunde una publicación a los demás procesos.
+          - namespaces: frozenset[str]
+        ->
+          - None
+        """
+
+    def _listen(self) -> None:
+        """Bucle del thread receptor (llama a _deliver con remote=True)."""
+
+    def _loops(self) -> List[Callable[[], None]]:
+        """Bucles que corren en threads propios del proceso (el receptor y, en UDP, el latido)."""
+        return [self._listen]
+
+    def ensure_started(self) -> None:
+        """
+        Arranca el receptor de este proceso (una vez por PID: los threads no sobreviven al fork).
+          - (None)
+        ->
+          - None
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._pid = os.getpid()
+            try:
+                self._setup()
+            except OSError:
+                # p. ej. sin multicast en la interfaz: este proceso queda acotado por los TTL
+                metrics.inc("bus.errors")
+                return
+            for loop in self._loops():
+                threading.Thread(target=loop, name="invalidation-bus" + loop.__name__.replace("_", "-"), daemon=True).start()
+
+    def _setup(self) -> None:
+        """Prepara sockets / estado del proceso antes de arrancar el receptor."""
+
+
+class UdpMulticastBus(InvalidationBus):
+    """
+    Difusión por multicast UDP (todos los procesos de todos los nodos que se unen al grupo).
+    Mensaje JSON: {"o": origen, "s": secuencia, "ns": [...], "t": epoch}; el latido lleva "ns": []
+    y la última secuencia enviada (no la incrementa).
+      - group: str — Grupo multicast (p. ej. '239.255.50.2').
+      - port: int — Puerto UDP.
+      - hops: int — TTL multicast (1 = sólo la red local).
+      - iface: str — IP de la interfaz ('0.0.0.0' = la que elija el sistema).
+      - heartbeat: float — Segundos entre latidos (0 = sin latido).
+    """
+
+    def __init__(self, group: str, port: int, hops: int = 1, iface: str = "0.0.0.0",
+                 heartbeat: float = 0.0) -> None:
+        super().__init__()
+        self.group = group
+        self.port = port
+        self.hops = hops
+        self.iface = iface
+        self.heartbeat = heartbeat
+        self._seq = 0
+        self._last_seq: Dict[str, int] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._tx: Optional[socket.socket] = None
+        self._rx: Optional[socket.socket] = None
+
+    def _setup(self) -> None:
+        self._seq = 0
+        self._last_seq = {}
+        self._last_seen = {}
+        tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.hops)
+        tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        if self.iface != "0.0.0.0":
+            tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.iface))
+
+        rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        rx.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # varios workers del mismo host escuchan el mismo puerto (multicast se entrega a todos)
+            rx.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        rx.bind(("", self.port))
+        mreq = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton(self.iface))
+        rx.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        self._tx, self._rx = tx, rx
+
+    def send(self, namespaces: FrozenSet[str]) -> None:
+        self.ensure_started()
+        if self._tx is None:
+            raise OSError("bus UDP sin socket")
+        with self._lock:
+            self._seq += 1
+            msg = {"o": self.origin, "s": self._seq, "ns": sorted(namespaces), "t": time.time()}
+        self._tx.sendto(json.dumps(msg).encode("utf-8"), (self.group, self.port))
+
+    def _loops(self) -> List[Callable[[], None]]:
+        return [self._listen, self._heartbeat] if self.heartbeat > 0 else [self._listen]
+
+    def _heartbeat(self) -> None:
+        """Bucle del latido: difunde la última secuencia enviada cada `heartbeat` segundos."""
+        while True:
+            time.sleep(self.heartbeat)
+            with self._lock:
+                msg = {"o": self.origin, "s": self._seq, "ns": [], "t": time.time()}
+            try:
+                self._tx.sendto(json.dumps(msg).encode("utf-8"), (self.group, self.port))
+            except OSError:
+                metrics.inc("bus.errors")
+
+    def _listen(self) -> None:
+        rx = self._rx
+        while True:
+            try:
+                data, _ = rx.recvfrom(65535)
+                msg = json.loads(data)
+                origin, seq = msg["o"], int(msg["s"])
+                namespaces = frozenset(msg["ns"])
+            except (OSError, ValueError, KeyError, TypeError):
+                metrics.inc("bus.errors")
+                time.sleep(0.1)
+                continue
+            if origin != self.origin:
+                self._on_message(origin, seq, namespaces, msg.get("t"))
+
+    def _on_message(self, origin: str, seq: int, namespaces: FrozenSet[str], sent_at: Optional[float]) -> None:
+        """
+        Procesa un mensaje de otro proceso: detecta huecos en su secuencia y entrega.
+          - origin: str — Proceso emisor.
+          - seq: int — Secuencia del mensaje (en un latido, la última enviada).
+          - namespaces: frozenset[str] — Vacío en un latido.
+          - sent_at: float | None — Epoch de envío.
+        ->
+          - None
+        """
+        last = self._last_seq.get(origin)
+        self._last_seq[origin] = max(seq, last or 0)
+        self._last_seen[origin] = time.monotonic()
+        # un mensaje trae la secuencia siguiente a la última recibida; un latido, la misma
+        expected = (last or 0) + 1 if namespaces else last
+        if last is not None and seq > expected:
+            # se perdieron mensajes de ese emisor: no se sabe qué cambió
+            metrics.inc("bus.gaps")
+            namespaces = ALL_NAMESPACES
+        if namespaces:
+            _received(namespaces, sent_at)
+        if self.heartbeat > 0 and len(self._last_seen) > 64:
+            self._forget_silent()
+
+    def _forget_silent(self) -> None:
+        """Olvida a los emisores sin latido hace 10 intervalos (procesos que terminaron)."""
+        cutoff = time.monotonic() - 10 * self.heartbeat
+        for origin in [o for o, t in self._last_seen.items() if t < cutoff]:
+            self._last_seen.pop(origin, None)
+            self._last_seq.pop(origin, None)
+
+
+class DbLogBus(InvalidationBus):
+    """
+    Difusión por una tabla de cambios: publish inserta una fila (id tomado de invalidacion_seq, en
+    orden de commit); cada proceso consulta las filas con id mayor al último visto cada
+    `poll_interval` segundos.
+      - poll_interval: float — Segundos entre consultas.
+      - retention: float — Segundos que se conservan las filas (las más viejas se borran).
+    """
+
+    def __init__(self, poll_interval: float, retention: float) -> None:
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._last_id: Optional[int] = None
+        self._purged_at = 0.0
+
+    def _setup(self) -> None:
+        self._last_id = None
+        self._purged_at = time.monotonic()
+
+    def send(self, namespaces: FrozenSet[str]) -> None:
+        with get_session() as s:
+            # el lock de la fila de secuencia se mantiene hasta el commit del INSERT: un id menor
+            # nunca se hace visible después de uno mayor
+            if not s.execute(
+                update(InvalidacionSeq).where(InvalidacionSeq.id == 1).values(ultimo=InvalidacionSeq.ultimo + 1)
+            ).rowcount:
+                # base sin bdd/tabla-invalidacion.sql aplicado completo (ni flask init-db): se crea la fila
+                ultimo = s.scalar(select(func.max(Invalidacion.id))) or 0
+                s.execute(insert(InvalidacionSeq).values(id=1, ultimo=ultimo + 1))
+            s.execute(insert(Invalidacion).values(
+                id=s.scalar(select(InvalidacionSeq.ultimo).where(InvalidacionSeq.id == 1)),
+                namespaces=",".join(sorted(namespaces)),
+                origen=self.origin,
+                creado=datetime.now(),
+            ))
+
+    def _poll(self) -> None:
+        """
+        Una consulta: entrega las filas nuevas de otros procesos y purga las viejas.
+          - (None)
+        ->
+          - None
+        """
+        with get_session() as s:
+            if self._last_id is None:
+                # al arrancar sólo interesan los cambios desde ahora
+                self._last_id = s.scalar(select(func.max(Invalidacion.id))) or 0
+                return
+            rows = s.execute(
+                select(Invalidacion.id, Invalidacion.namespaces, Invalidacion.origen, Invalidacion.creado)
+                .where(Invalidacion.id > self._last_id)
+                .order_by(Invalidacion.id)
+            ).all()
+            if time.monotonic() - self._purged_at > self.retention / 10:
+                self._purged_at = time.monotonic()
+                s.execute(delete(Invalidacion).where(
+                    Invalidacion.creado < datetime.now() - timedelta(seconds=self.retention)
+                ))
+        namespaces = set()
+        sent_at = None
+        for r in rows:
+            self._last_id = r.id
+            if r.origen != self.origin:
+                namespaces.update(n for n in r.namespaces.split(",") if n)
+                sent_at = r.creado.timestamp()
+        if namespaces:
+            _received(frozenset(namespaces), sent_at)
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                self._poll()
+            except SQLAlchemyError:
+                metrics.inc("bus.errors")
+            time.sleep(self.poll_interval)
+
+
+_bus: InvalidationBus = InvalidationBus()
+_last_lag_ms: Optional[float] = None
+
+
+def _received(namespaces: FrozenSet[str], sent_at: Optional[float]) -> None:
+    global _last_lag_ms
+    metrics.inc("bus.received")
+    if sent_at is not None:
+        _last_lag_ms = max((time.time() - sent_at) * 1000.0, 0.0)
+    _deliver(namespaces, remote=True)
+
+
+def publish(*namespaces: str) -> None:
+    """
+    Publica que cambiaron datos de estos namespaces (llamar después del commit): se aplica
+    en este proceso y se difunde a los demás. Si la difusión falla, los demás procesos
+    quedan acotados por el TTL de cada capa.
+      - namespaces: str — p. ej. "avisos", "stats", "comentarios".
+    ->
+      - None
+    """
+    ns = frozenset(namespaces)
+    _deliver(ns, remote=False)
+    try:
+        _bus.send(ns)
+        metrics.inc("bus.published")
+    except (OSError, SQLAlchemyError):
+        metrics.inc("bus.errors")
+
+
+def make_bus(backend: Optional[str], config: Dict[str, Any]) -> InvalidationBus:
+    """
+    Crea el backend indicado.
+      - backend: str | None — None | "udp" | "db".
+      - config: dict-like — BUS_* de Config.
+    ->
+      - InvalidationBus. Lanza ValueError si el backend no existe.
+    """
+    if backend is None:
+        return InvalidationBus()
+    if backend == "udp":
+        return UdpMulticastBus(
+            config["BUS_UDP_GROUP"], config["BUS_UDP_PORT"], config["BUS_UDP_HOPS"], config["BUS_UDP_IFACE"],
+            config["BUS_UDP_HEARTBEAT_INTERVAL"],
+        )
+    if backend == "db":
+        return DbLogBus(config["BUS_POLL_INTERVAL"], config["BUS_LOG_RETENTION"])
+    raise ValueError(f"BUS_BACKEND desconocido: {backend}")
+
+
+def start_bus() -> None:
+    """
+    Arranca el receptor del bus en este proceso (idempotente; ver InvalidationBus.ensure_started).
+    La app Quart lo llama en before_serving (ver asgi.py); la Flask, en cada request.
+      - (None)
+    ->
+      - None
+    """
+    _bus.ensure_started()
+
+
+def init_bus(app: Flask) -> None:
+    """
+    Crea el bus (BUS_BACKEND) y arranca su receptor en cada worker en el primer request.
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    global _bus
+    _bus = make_bus(app.config["BUS_BACKEND"], app.config)
+    if app.config["BUS_BACKEND"] is not None:
+        app.before_request(start_bus)
+    metrics.register_gauge("bus.last_lag_ms", lambda: None if _last_lag_ms is None else round(_last_lag_ms, 1))
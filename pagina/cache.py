@@ -0,0 +1,502 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
+
+from .bus import subscribe
+from .metrics import metrics
+
+_MISS = object()
+
+# Versión del esquema del archivo SQLite; si no coincide se recrean las tablas (es un cache)
+SCHEMA_VERSION = 2
+# Cada cuánto (s) se actualiza 'accessed' en un hit: evita una escritura por lectura
+# a costa de que el orden LRU tenga esa resolución.
+ACCESS_RESOLUTION = 1.0
+# Cada cuántos set() (por proceso) se revisa el tope de entradas
+EVICT_CHECK_EVERY = 64
+# Lease entre procesos para calcular una clave (s): cota si el proceso que la tomó muere
+LEASE_TTL = 30.0
+# Espera máxima (s) por el cálculo de otro thread/proceso antes de calcular por cuenta propia
+FLIGHT_WAIT = 10.0
+LEASE_POLL = 0.05
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+class Entry(NamedTuple):
+    """
+    Resultado de SharedCache.lookup().
+      - state: str — FRESH (vigente), STALE (vencida dentro de la ventana stale) o MISS.
+      - value: Any — Último valor guardado (aun si es MISS por invalidación o ventana vencida), o _MISS.
+    """
+    state: str
+    value: Any
+
+
+class SharedCache:
+    """
+    Cache compartido por todos los workers de una máquina, sobre un archivo SQLite en modo WAL
+    (lectores concurrentes sin bloquear a los escritores).
+
+    - LRU: al superar `max_entries` se descartan las entradas con 'accessed' más antiguo.
+    - TTL: cada entrada expira `ttl` segundos después de guardada.
+    - Versiones por namespace: invalidate("stats") incrementa la versión del namespace y todas
+      sus entradas dejan de ser válidas en todos los procesos a la vez (sin borrarlas una a una).
+    - Stale: una entrada vencida se conserva `stale_ttl` segundos más (stale_until) para servirla
+      mientras se recalcula, o si la BD no responde.
+    - Leases: try_lease(key) coordina entre procesos quién recalcula una clave.
+      - path: str — Archivo SQLite (se crea si no existe).
+      - max_entries: int — Tope de entradas.
+      - default_ttl: float — TTL (s) cuando no se indica uno.
+      - default_stale_ttl: float — Ventana stale (s) cuando no se indica una.
+    """
+
+    def __init__(self, path: str, max_entries: int, default_ttl: float, default_stale_ttl: float = 0.0) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self._local = threading.local()
+        self._puts = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS entries")
+                conn.execute("DROP TABLE IF EXISTS leases")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, ns TEXT NOT NULL, version INTEGER NOT NULL, value BLOB NOT NULL,"
+                " expires REAL NOT NULL, stale_until REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (ns TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Conexión SQLite del thread actual (una por thread y por proceso: no se comparten tras fork).
+          - (None)
+        ->
+          - sqlite3.Connection
+        """
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None or local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # es un cache: perder lo último ante un corte no importa
+            conn.execute("PRAGMA mmap_size=67108864")
+            local.conn, local.pid = conn, os.getpid()
+        return conn
+
+    def lookup(self, ns: str, key: str) -> Entry:
+        """
+        Estado y valor de una clave. Una entrada de versión vieja (invalidada) es MISS: después de
+        una escritura no se sirve el dato anterior, salvo como respaldo si la BD falla.
+          - ns: str — Namespace.
+          - key: str — Clave completa.
+        ->
+          - Entry — (state, value)
+        """
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT e.value, e.expires, e.stale_until, e.accessed, e.version = v.version"
+            " FROM entries e LEFT JOIN versions v ON v.ns = e.ns WHERE e.key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return Entry(MISS, _MISS)
+        value, expires, stale_until, accessed, current = row
+        if not current or now >= stale_until:
+            state = MISS
+        elif now < expires:
+            state = FRESH
+        else:
+            state = STALE
+        if state != MISS and now - accessed > ACCESS_RESOLUTION:
+            self._conn().execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return Entry(state, json.loads(value))
+
+    def get(self, ns: str, key: str) -> Any:
+        """
+        Valor vigente (versión actual del namespace y no expirado) o _MISS.
+          - ns: str — Namespace.
+          - key: str — Clave completa.
+        ->
+          - Any | _MISS
+        """
+        entry = self.lookup(ns, key)
+        return entry.value if entry.state == FRESH else _MISS
+
+    def version(self, ns: str) -> int:
+        """
+        Versión actual de un namespace (leerla ANTES de calcular el valor a guardar).
+          - ns: str — Namespace.
+        ->
+          - int
+        """
+        row = self._conn().execute("SELECT version FROM versions WHERE ns = ?", (ns,)).fetchone()
+        if row is None:
+            self._conn().execute("INSERT OR IGNORE INTO versions (ns, version) VALUES (?, 0)", (ns,))
+            return 0
+        return row[0]
+
+    def set(self, ns: str, key: str, value: Any, version: int, ttl: Optional[float] = None,
+            stale_ttl: Optional[float] = None) -> None:
+        """
+        Guarda un valor calculado con la versión `version` del namespace. Si entre tanto hubo una
+        invalidación, la entrada queda con versión vieja y nunca se sirve.
+          - ns: str — Namespace.
+          - key: str — Clave completa.
+          - value: Any — Valor serializable a JSON.
+          - version: int — Resultado de version(ns) leído antes de calcular `value`.
+          - ttl: float | None — Segundos de validez (default: default_ttl).
+          - stale_ttl: float | None — Segundos extra servible como stale (default: default_stale_ttl).
+        ->
+          - None
+        """
+        now = time.time()
+        expires = now + (ttl if ttl is not None else self.default_ttl)
+        stale_until = expires + (stale_ttl if stale_ttl is not None else self.default_stale_ttl)
+        blob = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, ns, version, value, expires, stale_until, accessed)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, ns, version, blob, expires, stale_until, now),
+        )
+        self._puts += 1
+        if self._puts % EVICT_CHECK_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Borra entradas fuera de su ventana stale y, si aún se supera max_entries, las menos usadas recientemente.
+          - (None)
+        ->
+          - int — Entradas borradas.
+        """
+        conn = self._conn()
+        with conn:
+            now = time.time()
+            conn.execute("DELETE FROM leases WHERE until <= ?", (now,))
+            n = conn.execute("DELETE FROM entries WHERE stale_until <= ?", (now,)).rowcount
+            total = conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+            if total > self.max_entries:
+                n += conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (total - self.max_entries,),
+                ).rowcount
+        if n:
+            metrics.inc("cache.evicted", n)
+        return n
+
+    def try_lease(self, key: str, ttl: float = LEASE_TTL) -> bool:
+        """
+        Toma el lease de una clave si nadie lo tiene (o el anterior venció). Atómico entre procesos.
+          - key: str — Clave completa.
+          - ttl: float — Segundos de validez del lease.
+        ->
+          - bool — True si este proceso debe calcular la clave.
+        """
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO leases (key, until) VALUES (?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET until = excluded.until WHERE leases.until <= ?",
+            (key, now + ttl, now),
+        )
+        return cur.rowcount == 1
+
+    def release(self, key: str) -> None:
+        """
+        Suelta el lease de una clave.
+          - key: str — Clave completa.
+        ->
+          - None
+        """
+        self._conn().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+    def invalidate(self, *namespaces: str) -> None:
+        """
+        Incrementa la versión de los namespaces (invalida sus entradas en todos los procesos).
+          - namespaces: str — Namespaces a invalidar.
+        ->
+          - None
+        """
+        conn = self._conn()
+        with conn:
+            for ns in namespaces:
+                conn.execute(
+                    "INSERT INTO versions (ns, version) VALUES (?, 1)"
+                    " ON CONFLICT(ns) DO UPDATE SET version = version + 1",
+                    (ns,),
+                )
+
+    def clear(self) -> None:
+        """
+        Vacía el cache completo.
+          - (None)
+        ->
+          - None
+        """
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def count(self) -> int:
+        """
+        Entradas almacenadas (incluye expiradas/invalidadas aún no desalojadas).
+          - (None)
+        ->
+          - int
+        """
+        return self._conn().execute("SELECT count(*) FROM entries").fetchone()[0]
+
+
+_cache: Optional[SharedCache] = None
+
+
+def get_cache() -> Optional[SharedCache]:
+    """
+    Cache compartido del proceso, o None si está deshabilitado / no inicializado.
+      - (None)
+    ->
+      - SharedCache | None
+    """
+    return _cache
+
+
+def _make_key(fn: Callable, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    return f"{fn.__module__}.{fn.__qualname__}:" + json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+class _Flight:
+    """Cálculo en curso de una clave dentro del proceso (los demás threads esperan su resultado)."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = _MISS
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _join_flight(key: str) -> Tuple[_Flight, bool]:
+    """
+    Se une al cálculo en curso de `key` o inicia uno.
+      - key: str — Clave completa.
+    ->
+      - (flight, leader) — leader=True si este thread debe calcular (y llamar a _end_flight).
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _end_flight(key: str, flight: _Flight) -> None:
+    with _flights_lock:
+        _flights.pop(key, None)
+    flight.done.set()
+
+
+def _compute_and_store(cache: SharedCache, ns: str, key: str, call: Callable[[], Any],
+                       ttl: Optional[float], stale_ttl: Optional[float], wait: bool) -> Any:
+    """
+    Calcula y guarda una clave con lease entre procesos. Si otro proceso tiene el lease:
+    con `wait` espera a que publique el valor (hasta FLIGHT_WAIT) y si no, calcula igual;
+    sin `wait` (refresco en segundo plano) no hace nada y retorna _MISS.
+      - cache: SharedCache
+      - ns, key: str — Namespace y clave.
+      - call: Callable[[], Any] — Función de datos con sus argumentos.
+      - ttl, stale_ttl: float | None — Ver SharedCache.set.
+      - wait: bool — Esperar al otro proceso.
+    ->
+      - Any — Valor (o _MISS si no se calculó).
+    """
+    try:
+        version = cache.version(ns)
+        leased = cache.try_lease(key)
+    except sqlite3.Error:
+        metrics.inc("cache.errors")
+        return call()
+
+    if not leased:
+        if not wait:
+            return _MISS
+        deadline = time.monotonic() + FLIGHT_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LEASE_POLL)
+            try:
+                value = cache.get(ns, key)
+            except sqlite3.Error:
+                break
+            if value is not _MISS:
+                metrics.inc(f"cache.{ns}.coalesced")
+                return value
+
+    try:
+        value = call()
+        try:
+            cache.set(ns, key, value, version, ttl, stale_ttl)
+        except sqlite3.Error:
+            metrics.inc("cache.errors")
+        return value
+    finally:
+        if leased:
+            try:
+                cache.release(key)
+            except sqlite3.Error:
+                pass
+
+
+def _refresh_in_background(cache: SharedCache, ns: str, key: str, call: Callable[[], Any],
+                           ttl: Optional[float], stale_ttl: Optional[float]) -> None:
+    """
+    Recalcula una entrada stale en un thread aparte, uno por clave en todo el host
+    (flight en el proceso + lease entre procesos). Si falla, se sigue sirviendo lo stale.
+      - (ver _compute_and_store)
+    ->
+      - None
+    """
+    flight, leader = _join_flight(key)
+    if not leader:
+        return
+
+    def run() -> None:
+        try:
+            flight.value = _compute_and_store(cache, ns, key, call, ttl, stale_ttl, wait=False)
+            metrics.inc(f"cache.{ns}.refresh")
+        except Exception as e:  # noqa: BLE001 - el request ya respondió con el valor stale
+            flight.error = e
+            metrics.inc(f"cache.{ns}.refresh_errors")
+        finally:
+            _end_flight(key, flight)
+
+    threading.Thread(target=run, name=f"cache-refresh-{ns}", daemon=True).start()
+
+
+def cached(ns: str, ttl: Optional[float] = None, stale_ttl: Optional[float] = None) -> Callable:
+    """
+    Decorador: memoiza en el cache compartido el resultado (serializable a JSON) de una función
+    de datos. La clave se arma con el nombre de la función y sus argumentos.
+      - Single-flight: si varios requests (threads o workers) piden a la vez una clave ausente,
+        uno calcula y los demás esperan su resultado.
+      - Stale-while-revalidate: vencido el TTL, durante `stale_ttl` s se responde con el valor
+        anterior y un solo thread lo recalcula en segundo plano.
+      - Si la BD falla (SQLAlchemyError) y queda un valor anterior, se sirve ese.
+    Sin cache (deshabilitado) o si SQLite falla, se llama a la función directamente.
+    Métricas: cache.<ns>.hit | miss | stale | stale_error | coalesced | refresh | refresh_errors.
+      - ns: str — Namespace a invalidar con invalidate(ns).
+      - ttl: float | None — Segundos de validez (default SHARED_CACHE_TTL).
+      - stale_ttl: float | None — Ventana stale (default SHARED_CACHE_STALE_TTL).
+    ->
+      - Callable — Decorador.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return fn(*args, **kwargs)
+            key = _make_key(fn, args, kwargs)
+            call = functools.partial(fn, *args, **kwargs)
+            try:
+                entry = cache.lookup(ns, key)
+            except sqlite3.Error:
+                metrics.inc("cache.errors")
+                return call()
+
+            if entry.state == FRESH:
+                metrics.inc(f"cache.{ns}.hit")
+                return entry.value
+            if entry.state == STALE:
+                metrics.inc(f"cache.{ns}.stale")
+                _refresh_in_background(cache, ns, key, call, ttl, stale_ttl)
+                return entry.value
+
+            flight, leader = _join_flight(key)
+            try:
+                if not leader:
+                    if flight.done.wait(FLIGHT_WAIT) and flight.error is None and flight.value is not _MISS:
+                        metrics.inc(f"cache.{ns}.coalesced")
+                        return flight.value
+                    return call()
+                metrics.inc(f"cache.{ns}.miss")
+                try:
+                    flight.value = _compute_and_store(cache, ns, key, call, ttl, stale_ttl, wait=True)
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                return flight.value
+            except SQLAlchemyError:
+                if entry.value is _MISS:
+                    raise
+                metrics.inc(f"cache.{ns}.stale_error")
+                return entry.value
+            finally:
+                if leader:
+                    _end_flight(key, flight)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Invalida namespaces en el cache compartido (llamar después del commit de una escritura).
+      - namespaces: str — p. ej. "avisos", "stats".
+    ->
+      - None
+    """
+    if _cache is None:
+        return
+    try:
+        _cache.invalidate(*namespaces)
+    except sqlite3.Error:
+        # sin invalidación las entradas viejas igual caducan por TTL
+        metrics.inc("cache.errors")
+
+
+def init_cache(app: Flask) -> None:
+    """
+    Abre el cache compartido (SHARED_CACHE_*) y registra su tamaño como gauge.
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    global _cache
+    if not app.config["SHARED_CACHE_ENABLED"]:
+        _cache = None
+        return
+    path = app.config["SHARED_CACHE_PATH"] or os.path.join(app.instance_path, "shared_cache.sqlite3")
+    _cache = SharedCache(
+        path,
+        app.config["SHARED_CACHE_MAX_ENTRIES"],
+        app.config["SHARED_CACHE_TTL"],
+        app.config["SHARED_CACHE_STALE_TTL"],
+    )
+    metrics.register_gauge("cache.entries", _cache.count)
+    subscribe(_on_publish)
+
+
+def _on_publish(namespaces, remote: bool) -> None:
+    # escrituras de este proceso y de otros nodos (bus.publish)
+    invalidate(*namespaces)
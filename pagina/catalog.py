@@ -0,0 +1,95 @@
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from .cache import cached
+from .db import get_session
+from .models import Comuna
+from .queries import regiones_stmt
+
+# Catálogo de regiones y comunas en memoria. Son datos fijos (bdd/region-comuna.sql): se cargan
+# una vez por proceso, o antes del fork (ver prefork.preload) para compartirlos copy-on-write.
+_regiones: Optional[List[Dict[str, object]]] = None
+_comunas: Optional[Dict[int, List[Dict[str, object]]]] = None
+_comuna_ids: Optional[frozenset] = None
+_lock = threading.Lock()
+
+
+@cached("catalogo", ttl=24 * 3600)
+def _catalog_rows() -> Dict[str, list]:
+    """
+    Filas del catálogo en forma serializable (un worker que arranca en frío lo toma del cache compartido).
+      - (None)
+    ->
+      - dict — {"regiones": [{"id", "nombre"}], "comunas": [[id, nombre, region_id], ...]}
+    """
+    with get_session() as s:
+        regiones = [{"id": r.id, "nombre": r.nombre} for r in s.execute(regiones_stmt()).all()]
+        rows = s.execute(
+            select(Comuna.id, Comuna.nombre, Comuna.region_id).order_by(Comuna.nombre.asc())
+        ).all()
+    return {"regiones": regiones, "comunas": [[c.id, c.nombre, c.region_id] for c in rows]}
+
+
+def load_catalogs() -> None:
+    """
+    Carga regiones y comunas (todas las regiones en una sola consulta).
+      - (None)
+    ->
+      - None
+    """
+    global _regiones, _comunas, _comuna_ids
+    rows = _catalog_rows()
+    comunas: Dict[int, List[Dict[str, object]]] = {}
+    for cid, nombre, region_id in rows["comunas"]:
+        comunas.setdefault(region_id, []).append({"id": cid, "nombre": nombre})
+    with _lock:
+        _regiones, _comunas = rows["regiones"], comunas
+        _comuna_ids = frozenset(c[0] for c in rows["comunas"])
+
+
+def catalog_ready() -> bool:
+    """
+    Indica si el catálogo ya está en memoria (si no, la primera consulta lo carga desde la BD).
+      - (None)
+    ->
+      - bool
+    """
+    return _comuna_ids is not None
+
+
+def get_regiones() -> List[Dict[str, object]]:
+    """
+    Regiones ordenadas alfabéticamente (carga el catálogo si aún no está en memoria).
+      - (None)
+    ->
+      - list[dict] — [{"id", "nombre"}, ...]
+    """
+    if _regiones is None:
+        load_catalogs()
+    return _regiones
+
+
+def get_comunas(region_id: int) -> List[Dict[str, object]]:
+    """
+    Comunas de una región, ordenadas alfabéticamente.
+      - region_id: int — ID de la región.
+    ->
+      - list[dict] — [{"id", "nombre"}, ...] (vacía si la región no existe).
+    """
+    if _comunas is None:
+        load_catalogs()
+    return _comunas.get(region_id, [])
+
+
+def comuna_exists(comuna_id: int) -> bool:
+    """
+    Indica si `comuna_id` es una comuna del catálogo.
+      - comuna_id: int
+    ->
+      - bool
+    """
+    if _comuna_ids is None:
+        load_catalogs()
+    return comuna_id in _comuna_ids
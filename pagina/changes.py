@@ -0,0 +1,150 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .config import Config
+from .models import Cambio, CambioSeq, Comentario
+from .queries import hot_proyeccion_by_ids
+from .serializers import serialize_comentario
+
+# Log de cambios (tabla cambio) para espejos y clientes offline: cada escritura agrega, en su misma
+# transacción, una fila por entidad creada / modificada / borrada. El número de secuencia sale de la
+# fila única cambio_seq, actualizada como última sentencia antes del commit: el lock de esa fila se
+# mantiene hasta el commit, así que los números quedan en orden de commit y un cliente que pidió
+# "desde N" nunca se salta una fila que aparezca después con un número menor.
+# El token que ven los clientes es ese número (opaco para ellos).
+
+ENTIDADES = ("aviso", "comentario")
+
+Change = Tuple[str, int, int, str]  # (entidad, entidad_id, aviso_id, operacion)
+
+
+class ChangeTokenGone(Exception):
+    """
+    El token es anterior a lo purgado (o posterior a lo existente): el cliente debe resincronizar.
+    """
+
+
+def record_changes(s: Session, changes: Iterable[Change]) -> None:
+    """
+    Agrega filas al log en la transacción de `s` (llamar justo antes del commit).
+      - s: Session — Sesión de la escritura.
+      - changes: iterable de (entidad, entidad_id, aviso_id, operacion).
+    ->
+      - None
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    n = len(changes)
+    if not s.execute(update(CambioSeq).where(CambioSeq.id == 1).values(ultimo=CambioSeq.ultimo + n)).rowcount:
+        # base sin bdd/tabla-cambio.sql aplicado completo (ni flask init-db): se crea la fila
+        s.execute(insert(CambioSeq).values(id=1, ultimo=n, purgado_hasta=0))
+    ultimo = s.scalar(select(CambioSeq.ultimo).where(CambioSeq.id == 1))
+    now = datetime.now()
+    s.execute(insert(Cambio), [
+        {"id": ultimo - n + k + 1, "entidad": entidad, "entidad_id": entidad_id, "aviso_id": aviso_id,
+         "operacion": op, "creado": now}
+        for k, (entidad, entidad_id, aviso_id, op) in enumerate(changes)
+    ])
+
+
+def parse_changes_args(args: Mapping[str, str]) -> Tuple[int, int]:
+    """
+    Lee since / limit de GET /api/avisos/changes.
+      - args: Mapping — request.args.
+    ->
+      - (since, limit). Lanza ValueError si no son enteros válidos.
+    """
+    since = int(args.get("since", "0") or 0)
+    limit = int(args.get("limit", Config.CHANGES_DEFAULT_LIMIT))
+    if since < 0:
+        raise ValueError("since")
+    return since, max(1, min(limit, Config.CHANGES_MAX_LIMIT))
+
+
+def changes_since(s: Session, since: int, limit: int) -> Dict[str, Any]:
+    """
+    Cambios con secuencia > since, con el estado actual de cada entidad.
+    Dentro de la página sólo se deja el último cambio de cada entidad (un create seguido de delete
+    llega como delete); "data" es null en los delete y si la entidad ya no está en las tablas vigentes.
+      - s: Session
+      - since: int — Token devuelto como "next" en la llamada anterior (0 = desde el inicio).
+      - limit: int — Filas del log a leer.
+    ->
+      - dict — {"changes": [...], "next": str, "has_more": bool}. Lanza ChangeTokenGone.
+    """
+    seq = s.get(CambioSeq, 1)
+    ultimo, purgado = (seq.ultimo, seq.purgado_hasta) if seq else (0, 0)
+    if since < purgado or since > ultimo:
+        raise ChangeTokenGone()
+
+    rows = s.execute(
+        select(Cambio.id, Cambio.entidad, Cambio.entidad_id, Cambio.aviso_id, Cambio.operacion, Cambio.creado)
+        .where(Cambio.id > since)
+        .order_by(Cambio.id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest: Dict[Tuple[str, int], Any] = {}
+    for r in rows:
+        latest.pop((r.entidad, r.entidad_id), None)
+        latest[(r.entidad, r.entidad_id)] = r
+
+    live = {e: [eid for (ent, eid), r in latest.items() if ent == e and r.operacion != "delete"] for e in ENTIDADES}
+    data: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    if live["aviso"]:
+        for aviso_id, raw in s.execute(hot_proyeccion_by_ids(), {"ids": live["aviso"]}):
+            data[("aviso", aviso_id)] = json.loads(raw)
+    if live["comentario"]:
+        for c in s.scalars(select(Comentario).where(Comentario.id.in_(live["comentario"]))):
+            data[("comentario", c.id)] = serialize_comentario(c)
+
+    return {
+        "changes": [
+            {
+                "seq": r.id,
+                "entity": r.entidad,
+                "id": r.entidad_id,
+                "aviso_id": r.aviso_id,
+                "op": r.operacion,
+                "at": r.creado.strftime("%Y-%m-%d %H:%M:%S"),
+                "data": data.get(key),
+            }
+            for key, r in latest.items()
+        ],
+        "next": str(rows[-1].id if rows else since),
+        "has_more": has_more,
+    }
+
+
+def purge_changes(s: Session, before: datetime) -> int:
+    """
+    Borra las filas del log anteriores a `before` y sube purgado_hasta (tokens menores reciben 410).
+      - s: Session
+      - before: datetime
+    ->
+      - int — Filas borradas.
+    """
+    hasta: Optional[int] = s.scalar(select(func.max(Cambio.id)).where(Cambio.creado < before))
+    if hasta is None:
+        return 0
+    n = s.execute(delete(Cambio).where(Cambio.id <= hasta)).rowcount
+    s.execute(update(CambioSeq).where(CambioSeq.id == 1).values(purgado_hasta=hasta))
+    return n
+
+
+def changes_for_avisos(ids: List[int], op: str) -> List[Change]:
+    """
+    Filas del log para una lista de avisos.
+      - ids: List[int]
+      - op: str — 'create' | 'update' | 'delete'.
+    ->
+      - list de (entidad, entidad_id, aviso_id, operacion)
+    """
+    return [("aviso", i, i, op) for i in ids]
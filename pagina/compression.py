@@ -0,0 +1,266 @@
+import zlib
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+
+from flask import Flask, request
+
+if TYPE_CHECKING:  # quart sólo se instala para el modo ASGI (ver asgi.py)
+    from quart import Quart
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+
+def _gzip_compressor(level: int):
+    # wbits=31 → formato gzip (cabecera + CRC)
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class _BrotliAdapter:
+    """Adapta brotli.Compressor a la interfaz compress()/flush() de zlib."""
+
+    def __init__(self, quality: int) -> None:
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.finish()
+
+
+def _zstd_compressor(level: int):
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+def available_encodings() -> Dict[str, Callable[[int], object]]:
+    """
+    Codificaciones soportadas en este entorno (zstd/br sólo si su módulo está instalado).
+      - (None)
+    ->
+      - dict — {content-coding: factory(level) → objeto con compress()/flush()}.
+    """
+    encs: Dict[str, Callable[[int], object]] = {"gzip": _gzip_compressor}
+    if brotli is not None:
+        encs["br"] = _BrotliAdapter
+    if zstandard is not None:
+        encs["zstd"] = _zstd_compressor
+    return encs
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parsea Accept-Encoding a {coding: q}.
+      - header: str | None — Valor del header (p. ej. 'gzip, br;q=0.9, *;q=0').
+    ->
+      - dict[str, float]
+    """
+    result: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[coding.strip().lower()] = q
+    return result
+
+
+def choose_encoding(header: Optional[str], preference: Iterable[str]) -> Optional[str]:
+    """
+    Elige la codificación según Accept-Encoding y el orden de preferencia del servidor.
+      - header: str | None — Accept-Encoding del request.
+      - preference: Iterable[str] — Codificaciones disponibles, de mayor a menor preferencia.
+    ->
+      - str | None — Codificación elegida o None (identity).
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in preference:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _stream(chunks: Iterable[bytes], compressor) -> Iterator[bytes]:
+    """
+    Comprime un cuerpo streameado chunk a chunk (sin bufferizar la respuesta completa).
+      - chunks: Iterable[bytes] — Iterador original de la respuesta.
+      - compressor: objeto con compress()/flush().
+    ->
+      - Iterator[bytes]
+    """
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+class _Settings:
+    """
+    Parámetros de compresión leídos de la config (compartidos por la app Flask y la Quart).
+      - config: Mapping — app.config (usa COMPRESS_*).
+    """
+
+    def __init__(self, config) -> None:
+        self.encodings = available_encodings()
+        self.preference: List[str] = [e for e in config["COMPRESS_ALGORITHMS"] if e in self.encodings]
+        self.levels: Dict[str, int] = config["COMPRESS_LEVELS"]
+        self.mimetypes = set(config["COMPRESS_MIMETYPES"])
+        self.min_size: int = config["COMPRESS_MIN_SIZE"]
+        self.static_max_entries: int = config["COMPRESS_STATIC_CACHE_ENTRIES"]
+
+    def skip(self, response, method: str) -> bool:
+        """
+        Indica si la respuesta no se comprime (estado sin cuerpo, ya codificada, tipo no listado o HEAD).
+          - response: Response — Flask o Quart.
+          - method: str — Método del request.
+        ->
+          - bool
+        """
+        return (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in self.mimetypes
+            or method == "HEAD"
+        )
+
+    def compress(self, coding: str, body: bytes) -> bytes:
+        """
+        Comprime un cuerpo completo.
+          - coding: str — Codificación elegida (clave de encodings).
+          - body: bytes
+        ->
+          - bytes
+        """
+        compressor = self.encodings[coding](self.levels[coding])
+        return compressor.compress(body) + compressor.flush()
+
+
+def _mark_encoded(response, coding: str) -> None:
+    """
+    Agrega Content-Encoding y distingue el ETag de la representación comprimida.
+      - response: Response — Flask o Quart.
+      - coding: str
+    ->
+      - None
+    """
+    response.headers["Content-Encoding"] = coding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # la representación comprimida no es byte-idéntica a la original
+        response.set_etag(f"{etag}-{coding}")
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Registra la compresión negociada (zstd/br/gzip) de respuestas JSON/HTML/JS/CSS.
+      - app: Flask — Aplicación (usa COMPRESS_* de Config).
+    ->
+      - None
+    """
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+
+    settings = _Settings(app.config)
+    # estáticos (send_file) ya comprimidos, por (ruta, ETag, coding): el ETag cambia con el archivo
+    static_cache: Dict[tuple, bytes] = {}
+
+    @app.after_request
+    def _compress(response):
+        if settings.skip(response, request.method):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        coding = choose_encoding(request.headers.get("Accept-Encoding"), settings.preference)
+        if coding is None:
+            return response
+
+        if response.direct_passthrough:
+            # send_file: JS/CSS de /static (las fotos no son de un tipo listado)
+            etag = response.get_etag()[0]
+            key = (request.path, etag, coding)
+            body = static_cache.get(key) if etag else None
+            response.direct_passthrough = False
+            if body is None:
+                raw = response.get_data()
+                if len(raw) < settings.min_size:
+                    return response
+                body = settings.compress(coding, raw)
+                if etag:
+                    if len(static_cache) >= settings.static_max_entries:
+                        static_cache.clear()
+                    static_cache[key] = body
+            else:
+                close = getattr(response.response, "close", None)
+                if close is not None:
+                    close()
+            response.set_data(body)
+            response.headers.pop("Accept-Ranges", None)
+            _mark_encoded(response, coding)
+            # If-None-Match trae el ETag con sufijo, que send_file no reconoce: se revalida acá
+            return response.make_conditional(request)
+
+        if response.is_streamed:
+            compressor = settings.encodings[coding](settings.levels[coding])
+            response.response = _stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < settings.min_size:
+                return response
+            response.set_data(settings.compress(coding, body))
+
+        _mark_encoded(response, coding)
+        return response
+
+
+def init_async_compression(app: "Quart") -> None:
+    """
+    Misma compresión para la app Quart de lecturas async (ver asgi.py); sus respuestas son JSON
+    ya armados en memoria.
+      - app: Quart — Aplicación (usa COMPRESS_* de Config).
+    ->
+      - None
+    """
+    from quart import request as quart_request
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+
+    settings = _Settings(app.config)
+
+    @app.after_request
+    async def _compress(response):
+        if settings.skip(response, quart_request.method):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        coding = choose_encoding(quart_request.headers.get("Accept-Encoding"), settings.preference)
+        if coding is None:
+            return response
+
+        body = await response.get_data()
+        if len(body) < settings.min_size:
+            return response
+        response.set_data(settings.compress(coding, body))
+        _mark_encoded(response, coding)
+        return response
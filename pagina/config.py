@@ -2,17 +2,168 @@ import os
 
 
 class Config:
+    # Motor de BD: "mysql" (servidor, esquema tarea2) o "sqlite" (archivo embebido, sin esquema;
+    # se crea con `flask --app run init-db`). Para nodos chicos y corridas rápidas de benchmarks.
+    DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
     MYSQL_USER = "cc5002"
     MYSQL_PASSWORD = "programacionweb"
     MYSQL_HOST = "localhost"
     MYSQL_PORT = 3306
     MYSQL_DB = "tarea2"
-    SQLALCHEMY_DATABASE_URI = (
-        f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}"
-        f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}?charset=utf8"
+    # None → <raíz del repo>/instance/tarea2.sqlite3 (disco local: WAL no funciona sobre NFS)
+    SQLITE_PATH = os.environ.get("SQLITE_PATH") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "tarea2.sqlite3"
     )
+    # PRAGMAs de cada conexión SQLite: WAL (lectores no bloquean al escritor), fsync sólo en
+    # checkpoints, espera ante locks en vez de fallar y cache/mmap más grandes que los defaults.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,  # ms
+        "cache_size": -20000,  # KiB (negativo = tamaño, no páginas)
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+    if DB_BACKEND == "sqlite":
+        DB_SCHEMA = None
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{SQLITE_PATH}"
+        SQLALCHEMY_ASYNC_DATABASE_URI = f"sqlite+aiosqlite:///{SQLITE_PATH}"
+    else:
+        DB_SCHEMA = MYSQL_DB
+        SQLALCHEMY_DATABASE_URI = (
+            f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}"
+            f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}?charset=utf8"
+        )
+        # Misma base, driver asíncrono (modo ASGI, ver pagina/asgi.py)
+        SQLALCHEMY_ASYNC_DATABASE_URI = (
+            f"mysql+aiomysql://{MYSQL_USER}:{MYSQL_PASSWORD}"
+            f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}?charset=utf8"
+        )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     STATIC_DIR = os.path.join(BASE_DIR, "static")
     UPLOAD_FOLDER = os.path.join(STATIC_DIR, "uploads")
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024
+
+    # Admisión por clase de endpoint: (máx. concurrentes, máx. en cola, espera máx. en s).
+    # La suma de concurrentes debe quedar bajo el pool de SQLAlchemy (5 + 10 overflow)
+    # para que los endpoints baratos (listado, detalle) siempre obtengan conexión.
+    ADMISSION_LIMITS = {
+        "write": (4, 8, 2.0),   # crear_aviso (multipart + escritura de archivos)
+        "stats": (4, 16, 1.0),  # /api/stats/*
+    }
+    ADMISSION_RETRY_AFTER = 2
+    # Token bucket por cliente para rutas POST: (tokens por segundo, ráfaga)
+    RATE_LIMIT_POST = (0.5, 5)
+    # /api/metrics (pagina/metrics.py) exige el header X-Admin-Token = METRICS_TOKEN; sin token
+    # configurado responde 404 (expone RSS, PIDs y el estado interno de limitadores y caches).
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+    # TTL (s) del cache de datos iniciales embebidos en las páginas (pages._initial_data)
+    PAGE_FRAGMENT_TTL = 30
+
+    # Compresión de respuestas (pagina/compression.py). zstd y br sólo si
+    # los módulos 'zstandard' / 'brotli' están instalados; gzip siempre.
+    COMPRESS_ENABLED = True
+    COMPRESS_ALGORITHMS = ("zstd", "br", "gzip")  # orden de preferencia del servidor
+    COMPRESS_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+    COMPRESS_MIN_SIZE = 500  # bytes; bajo esto no compensa
+    COMPRESS_STATIC_CACHE_ENTRIES = 256  # JS/CSS de /static ya comprimidos, por worker
+    COMPRESS_MIMETYPES = (
+        "application/json",
+        "text/html",
+        "application/javascript",
+        "text/javascript",  # .js en mimetypes de Python 3.11+ (estáticos de /static)
+        "text/css",
+        "text/plain",
+    )
+
+    # Ring buffer de últimos avisos (pagina/feed.py). El stamp coordina a los workers
+    # de una máquina; None → <instance_path>/latest_feed.stamp
+    LATEST_FEED_SIZE = 10
+    LATEST_FEED_STAMP = None
+    LATEST_FEED_MAX_AGE = 300
+
+    # Archivo de avisos vencidos (`flask archivar-avisos`, ver pagina/archive.py)
+    ARCHIVE_AFTER_DAYS = 180  # días desde fecha_entrega
+    ARCHIVE_BATCH_SIZE = 500  # avisos por transacción
+
+    # Log de cambios (GET /api/avisos/changes, ver pagina/changes.py). `flask archivar-avisos` purga
+    # las filas más antiguas que la retención; un token anterior a lo purgado recibe 410.
+    CHANGE_LOG_RETENTION_DAYS = 30
+    CHANGES_DEFAULT_LIMIT = 100
+    CHANGES_MAX_LIMIT = 500
+
+    # Proyección de lectura aviso_proyeccion (ver pagina/readmodel.py): avisos por transacción al
+    # reconstruirla con `flask reconstruir-proyeccion`.
+    READMODEL_BATCH_SIZE = 500
+
+    # Cache compartido entre workers (pagina/cache.py): SQLite en WAL, LRU + TTL + versiones.
+    # None → <instance_path>/shared_cache.sqlite3 (debe ser un disco local, no NFS)
+    SHARED_CACHE_ENABLED = True
+    SHARED_CACHE_PATH = None
+    SHARED_CACHE_MAX_ENTRIES = 5000
+    SHARED_CACHE_TTL = 60  # s
+    # Vencido el TTL, una entrada se sigue sirviendo hasta N s más mientras se recalcula en segundo
+    # plano (o si la BD no responde); 0 = sin stale-while-revalidate
+    SHARED_CACHE_STALE_TTL = 300
+
+    # Snapshot NumPy de avisos para /api/stats/heatmap|ages|time-to-delivery (pagina/analytics.py):
+    # segundos mínimos entre consultas de avisos nuevos
+    ANALYTICS_REFRESH_INTERVAL = 10
+    # ids bajo el último conocido que se releen en cada refresco (avisos con commit tardío: el id se
+    # asigna al insertar); debe cubrir los avisos que se crean mientras otro espera su commit
+    ANALYTICS_REORDER_WINDOW = 200
+
+    # Fotos subidas (/fotos/<nombre>, pagina/photos.py). Los nombres son únicos e inmutables → cache largo.
+    # PHOTO_OFFLOAD: None (Python envía el archivo), "x-sendfile" (Apache mod_xsendfile / lighttpd)
+    # o "x-accel-redirect" (nginx; PHOTO_ACCEL_PREFIX debe ser una location `internal` con alias a UPLOAD_FOLDER).
+    PHOTO_OFFLOAD = None
+    PHOTO_ACCEL_PREFIX = "/_uploads/"
+    PHOTO_MAX_AGE = 365 * 24 * 3600
+
+    # Subidas reanudables por trozos (/api/uploads, pagina/resumable.py).
+    # None → <instance_path>/uploads-partial (mismo disco que UPLOAD_FOLDER para que mover sea un rename)
+    UPLOAD_SESSIONS_DIR = None
+    UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 256 * 1024  # sugerido al cliente
+    UPLOAD_SESSION_TTL = 24 * 3600
+    UPLOAD_MAX_SESSIONS_PER_CLIENT = 10  # sesiones abiertas por IP (POST /api/uploads → 429)
+    UPLOAD_MAX_BYTES_PER_CLIENT = 50 * 1024 * 1024  # suma de tamaños declarados abiertos por IP
+
+    # Bus de invalidación entre nodos (pagina/bus.py): None (un solo nodo), "udp" (multicast) o
+    # "db" (tabla bdd/tabla-invalidacion.sql consultada cada BUS_POLL_INTERVAL s)
+    BUS_BACKEND = os.environ.get("BUS_BACKEND") or None
+    BUS_UDP_GROUP = "239.255.50.2"
+    BUS_UDP_PORT = 50020
+    BUS_UDP_HOPS = 1  # TTL multicast: 1 = sólo la red local
+    BUS_UDP_IFACE = "0.0.0.0"
+    BUS_UDP_HEARTBEAT_INTERVAL = 5.0  # s; el latido repite la última secuencia (detecta la pérdida del último mensaje)
+    BUS_POLL_INTERVAL = 1.0
+    BUS_LOG_RETENTION = 3600  # s que se conservan las filas del backend "db"
+
+    # Visitas al detalle y ranking ?order=popular (pagina/popular.py). Requiere bdd/tabla-vistas.sql.
+    # Las visitas se acumulan en memoria y se vuelcan cada VIEW_FLUSH_INTERVAL s en un upsert por lotes.
+    VIEW_COUNTERS_ENABLED = True
+    VIEW_FLUSH_INTERVAL = 10
+    POPULAR_REFRESH_INTERVAL = 60  # s entre recálculos del ranking
+    POPULAR_TOP_N = 100
+    POPULAR_COMMENT_WEIGHT = 5  # un comentario vale 5 visitas
+    POPULAR_HALF_LIFE_HOURS = 72  # el puntaje cae a la mitad cada 3 días
+
+    # Búsqueda por cercanía (?near_comuna_id=&radius_km= en /api/avisos, ver pagina/proximity.py).
+    # None → bdd/comuna-coordenadas.csv. Las vecinas se precalculan hasta NEAR_MAX_RADIUS_KM.
+    COMUNA_COORDS_PATH = None
+    NEAR_DEFAULT_RADIUS_KM = 10
+    NEAR_MAX_RADIUS_KM = 50
+
+    # Profiler por muestreo (pagina/profiler.py). Las rutas /admin/profiler/* sólo existen si hay
+    # PROFILER_ADMIN_TOKEN (se envía en el header X-Admin-Token). PROFILER_ENABLED=1 muestrea desde
+    # el arranque; si no, se activa con POST /admin/profiler/start.
+    PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED") == "1"
+    PROFILER_ADMIN_TOKEN = os.environ.get("PROFILER_ADMIN_TOKEN") or None
+    PROFILER_INTERVAL = 0.01  # s entre muestras (100 Hz)
+    PROFILER_MAX_DEPTH = 64  # frames por stack
+    PROFILER_MAX_STACKS = 5000  # stacks distintos retenidos por proceso
+    PROFILER_TRACEMALLOC_FRAMES = 10  # frames por asignación cuando se activa tracemalloc
@@ -1,12 +1,16 @@
-from typing import Iterator
-from contextlib import contextmanager
+import os
+import threading
+from typing import AsyncIterator, Iterator, Optional
+from contextlib import contextmanager, asynccontextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import Config
 
 # Credenciales indicadas
 DB_URL = Config.SQLALCHEMY_DATABASE_URI
+ASYNC_DB_URL = Config.SQLALCHEMY_ASYNC_DATABASE_URI
 
 
 class Base(DeclarativeBase):
@@ -14,14 +18,102 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    DB_URL,
-    echo=False,
-    pool_pre_ping=True,
-    pool_recycle=1800,
-)
+# El engine se crea a demanda (no al importar): con un servidor pre-fork que precarga la app
+# (gunicorn --preload) el proceso padre puede abrir conexiones; los workers no deben heredarlas.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+SessionLocal = sessionmaker(autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+def _set_sqlite_pragmas(dbapi_conn, _record) -> None:
+    """
+    Listener "connect": aplica Config.SQLITE_PRAGMAS a cada conexión SQLite nueva.
+      - dbapi_conn: conexión DBAPI (sqlite3 o el adaptador de aiosqlite).
+    ->
+      - None
+    """
+    cur = dbapi_conn.cursor()
+    try:
+        for name, value in Config.SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cur.close()
+
+
+def _configure_engine(engine: Engine) -> None:
+    """
+    Ajustes por dialecto sobre un engine recién creado (síncrono o el sync_engine del asíncrono).
+      - engine: Engine
+    ->
+      - None
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+def get_engine() -> Engine:
+    """
+    Retorna (creándolo la primera vez) el engine síncrono del proceso.
+      - (None)
+    ->
+      - Engine — Engine sobre DB_URL; SessionLocal queda ligado a él.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    DB_URL,
+                    echo=False,
+                    pool_pre_ping=True,
+                    pool_recycle=1800,
+                )
+                _configure_engine(_engine)
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def warm_pool(n: int) -> int:
+    """
+    Abre de antemano hasta `n` conexiones del pool (las deja en el pool, listas para usar),
+    así los primeros requests de un worker no pagan el connect (ni los PRAGMAs de SQLite).
+      - n: int — Conexiones a abrir (se acota al tamaño del pool).
+    ->
+      - int — Conexiones abiertas.
+    """
+    engine = get_engine()
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        n = min(n, size())
+    conns = []
+    try:
+        for _ in range(max(n, 0)):
+            conns.append(engine.connect())
+    finally:
+        for c in conns:
+            c.close()
+    return len(conns)
+
+
+def _after_fork_in_child() -> None:
+    """
+    Hook post-fork (proceso hijo): descarta los pools heredados sin cerrar los sockets del padre.
+      - (None)
+    ->
+      - None
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _engine is not None:
+        # close=False: el hijo olvida las conexiones del padre en vez de cerrarlas (el padre las sigue usando)
+        _engine.dispose(close=False)
+    # el pool asíncrono pertenece al event loop del padre; el hijo crea el suyo a demanda
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
+if hasattr(os, "register_at_fork"):  # no existe en Windows (sin fork)
+    os.register_at_fork(after_in_child=_after_fork_in_child)
 
 
 @contextmanager
@@ -33,6 +125,7 @@ def get_session() -> Iterator[SessionLocal]:
     ->
       - Iterator[Session] — Iterador de contexto que produce una Session activa.
     """
+    get_engine()
     session = SessionLocal()
     try:
         yield session
@@ -42,3 +135,65 @@ def get_session() -> Iterator[SessionLocal]:
         raise
     finally:
         session.close()
+
+
+# --- Modo ASGI ---
+# El engine asíncrono se crea a demanda: el modo WSGI no necesita el driver aiomysql / aiosqlite.
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Retorna (creándolo la primera vez) el engine asíncrono.
+      - (None)
+    ->
+      - AsyncEngine — Engine sobre ASYNC_DB_URL con la misma configuración de pool.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DB_URL,
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
+        _configure_engine(_async_engine.sync_engine)
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine, autoflush=False, autocommit=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """
+    Cierra el pool del engine asíncrono (al apagar el servidor ASGI).
+      - (None)
+    ->
+      - None
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    Equivalente asíncrono de get_session(): commit al salir, rollback ante excepciones.
+      - (None)
+    ->
+      - AsyncIterator[AsyncSession] — Iterador de contexto que produce una AsyncSession activa.
+    """
+    get_async_engine()
+    session = _AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
+
+from .bus import subscribe
+from .db import get_session
+from .queries import latest_avisos
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: sin lock entre procesos (queda FEED_MAX_AGE)
+    fcntl = None
+
+
+class LatestFeed:
+    """
+    Ring buffer en memoria con los últimos avisos ya serializados (más nuevo primero).
+
+    Coherencia entre procesos: un archivo "stamp" guarda un contador que cada crear_aviso
+    incrementa. Cada worker recuerda el valor que refleja su buffer; si el archivo cambió
+    (otro worker creó un aviso) el buffer se considera obsoleto y se recarga desde la BD.
+    Además se recarga si tiene más de `max_age` segundos, como cota de obsolescencia.
+      - capacity: int — Avisos retenidos (= máximo 'limit' de /api/avisos/latest).
+      - stamp_path: str — Archivo compartido por los workers de la misma máquina.
+      - max_age: float — Segundos máximos sin recargar.
+    """
+
+    def __init__(self, capacity: int, stamp_path: str, max_age: float) -> None:
+        self.capacity = capacity
+        self.stamp_path = stamp_path
+        self.max_age = max_age
+        self._items: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._stamp: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+
+    def current_stamp(self) -> int:
+        """
+        Lee el contador compartido (0 si el archivo aún no existe).
+          - (None)
+        ->
+          - int
+        """
+        try:
+            with open(self.stamp_path, "r", encoding="ascii") as fh:
+                return int(fh.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def snapshot(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Últimos `limit` avisos desde memoria, o None si el buffer está obsoleto (hay que cargar).
+          - limit: int — Cantidad pedida (≤ capacity).
+        ->
+          - list[dict] | None
+        """
+        stamp = self.current_stamp()
+        with self._lock:
+            if self._stamp != stamp or time.monotonic() - self._loaded_at > self.max_age:
+                return None
+            return list(self._items)[:limit]
+
+    def load(self, items: List[Dict[str, Any]], stamp: int) -> None:
+        """
+        Reemplaza el contenido del buffer con datos leídos de la BD.
+          - items: list[dict] — Avisos serializados, más nuevo primero.
+          - stamp: int — Valor de current_stamp() leído ANTES de la consulta.
+        ->
+          - None
+        """
+        with self._lock:
+            self._items = deque(items[: self.capacity], maxlen=self.capacity)
+            self._stamp = stamp
+            self._loaded_at = time.monotonic()
+
+    def _bump(self) -> int:
+        """
+        Incrementa el contador compartido bajo lock de archivo (debe llamarse con self._lock tomado).
+          - (None)
+        ->
+          - int — Valor ANTERIOR del contador.
+        """
+        with open(self.stamp_path, "a+", encoding="ascii") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            fh.seek(0)
+            try:
+                before = int(fh.read().strip() or 0)
+            except ValueError:
+                before = 0
+            fh.seek(0)
+            fh.truncate()
+            fh.write(str(before + 1))
+            fh.flush()
+        return before
+
+    def invalidate(self) -> None:
+        """
+        Marca obsoletos los buffers de todos los workers (p. ej. tras archivar avisos).
+          - (None)
+        ->
+          - None
+        """
+        with self._lock:
+            self._bump()
+            self._stamp = None
+
+    def push(self, item: Dict[str, Any]) -> None:
+        """
+        Agrega un aviso recién creado (llamar después del commit) e incrementa el stamp.
+        Si otro worker había creado avisos que este buffer no refleja, se marca obsoleto.
+          - item: dict — Aviso serializado (serialize_row).
+        ->
+          - None
+        """
+        with self._lock:
+            before = self._bump()
+            if self._stamp == before:
+                self._items.appendleft(item)
+                self._stamp = before + 1
+            else:
+                self._stamp = None
+
+
+_feed: Optional[LatestFeed] = None
+
+
+def get_feed() -> LatestFeed:
+    """
+    Feed del proceso (creado por init_latest_feed).
+      - (None)
+    ->
+      - LatestFeed
+    """
+    if _feed is None:
+        raise RuntimeError("init_latest_feed(app) no fue llamado")
+    return _feed
+
+
+def get_latest(limit: int) -> List[Dict[str, Any]]:
+    """
+    Últimos avisos desde memoria; si el buffer está obsoleto lo recarga desde la BD.
+      - limit: int — Cantidad pedida (≤ capacity).
+    ->
+      - list[dict]
+    """
+    feed = get_feed()
+    data = feed.snapshot(limit)
+    if data is None:
+        stamp = feed.current_stamp()
+        with get_session() as s:
+            items = latest_avisos(s, feed.capacity)["data"]
+        feed.load(items, stamp)
+        data = items[:limit]
+    return data
+
+
+def init_latest_feed(app: Flask) -> None:
+    """
+    Crea el feed del proceso y lo precarga (si la BD no responde, se cargará en el primer request).
+      - app: Flask — Aplicación (usa LATEST_FEED_* de Config).
+    ->
+      - None
+    """
+    global _feed
+    stamp_path = app.config["LATEST_FEED_STAMP"] or os.path.join(app.instance_path, "latest_feed.stamp")
+    _feed = LatestFeed(app.config["LATEST_FEED_SIZE"], stamp_path, app.config["LATEST_FEED_MAX_AGE"])
+    try:
+        get_latest(_feed.capacity)
+    except SQLAlchemyError:
+        app.logger.warning("No se pudo precargar el feed de últimos avisos; se cargará a demanda.")
+    subscribe(_on_publish)
+
+
+def _on_publish(namespaces, remote: bool) -> None:
+    # avisos creados/archivados en otro nodo: el stamp local no se enteró (los locales ya hicieron push)
+    if remote and "avisos" in namespaces and _feed is not None:
+        _feed.invalidate()
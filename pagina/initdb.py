@@ -0,0 +1,140 @@
+import ast
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+import click
+from flask import Flask
+from sqlalchemy import func, insert, select
+
+from .db import Base, get_engine, get_session
+from .models import AvisoAdopcion, Comentario, Comuna, ContactarPor, Foto, Region
+from .readmodel import rebuild_projection
+
+# Creación de la base desde los modelos (pensado para el modo SQLite, DB_BACKEND=sqlite, donde no
+# se corre bdd/tarea2.sql): create_all + regiones/comunas de bdd/region-comuna.sql y, opcionalmente,
+# avisos sintéticos para benchmarks (más su proyección de lectura). En MySQL sólo crea las tablas que falten.
+
+BDD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bdd")
+REGION_COMUNA_SQL = os.path.join(BDD_DIR, "region-comuna.sql")
+
+INSERT_RE = re.compile(r"^INSERT INTO (\w+) \(([^)]*)\) VALUES (\(.*\));\s*$")
+SEED_MODELS = {"region": Region, "comuna": Comuna}
+
+
+def parse_inserts(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Lee los INSERT de una fila por línea de un script SQL (formato de bdd/region-comuna.sql).
+      - path: str — Archivo .sql.
+    ->
+      - Iterator[(tabla, {columna: valor})]. Lanza ValueError si una línea INSERT no se entiende.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        for n, line in enumerate(fh, 1):
+            if not line.startswith("INSERT"):
+                continue
+            m = INSERT_RE.match(line)
+            if m is None:
+                raise ValueError(f"{path}:{n}: INSERT no reconocido")
+            cols = [c.strip() for c in m.group(2).split(",")]
+            # los literales del script (enteros y strings con ' o ") son literales Python válidos
+            values = ast.literal_eval(m.group(3))
+            yield m.group(1), dict(zip(cols, values))
+
+
+def seed_region_comuna(path: str = REGION_COMUNA_SQL) -> int:
+    """
+    Carga regiones y comunas si la tabla region está vacía.
+      - path: str — Script con los INSERT (default bdd/region-comuna.sql).
+    ->
+      - int — Filas insertadas (0 si ya estaban).
+    """
+    rows: Dict[str, List[Dict[str, Any]]] = {"region": [], "comuna": []}
+    for table, row in parse_inserts(path):
+        rows[table].append(row)
+    with get_session() as s:
+        if s.scalar(select(func.count(Region.id))):
+            return 0
+        for table in ("region", "comuna"):
+            if rows[table]:
+                s.execute(insert(SEED_MODELS[table]), rows[table])
+    return len(rows["region"]) + len(rows["comuna"])
+
+
+def seed_dummy_avisos(n: int, seed: int = 0) -> int:
+    """
+    Inserta n avisos sintéticos (con fotos, contactos y comentarios) repartidos en el último año,
+    para correr los benchmarks sobre una base recién creada. Reproducible con la misma semilla.
+      - n: int — Avisos a crear.
+      - seed: int — Semilla del generador.
+    ->
+      - int — Avisos insertados. Lanza ValueError si no hay comunas cargadas.
+    """
+    rnd = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    with get_session() as s:
+        comunas = s.scalars(select(Comuna.id)).all()
+        if not comunas:
+            raise ValueError("No hay comunas: cargue primero bdd/region-comuna.sql.")
+        next_id = (s.scalar(select(func.max(AvisoAdopcion.id))) or 0) + 1
+        avisos, fotos, contactos, comentarios = [], [], [], []
+        for aviso_id in range(next_id, next_id + n):
+            tipo = rnd.choice(("gato", "perro"))
+            ingreso = now - timedelta(minutes=rnd.randint(0, 365 * 24 * 60))
+            avisos.append({
+                "id": aviso_id,
+                "fecha_ingreso": ingreso,
+                "comuna_id": rnd.choice(comunas),
+                "sector": f"Sector {rnd.randint(1, 50)}",
+                "nombre": f"Contacto {aviso_id}",
+                "email": f"contacto{aviso_id}@example.cl",
+                "celular": f"+569.{rnd.randint(10000000, 99999999)}",
+                "tipo": tipo,
+                "cantidad": rnd.randint(1, 4),
+                "edad": rnd.randint(1, 12),
+                "unidad_medida": rnd.choice(("a", "m")),
+                "fecha_entrega": ingreso + timedelta(hours=rnd.randint(3, 240)),
+                "descripcion": None,
+            })
+            for k in range(rnd.randint(1, 3)):
+                fotos.append({"ruta_archivo": "static/uploads", "nombre_archivo": f"{tipo}-{aviso_id}-{k}.jpg",
+                              "aviso_id": aviso_id})
+            contactos.append({"nombre": "whatsapp", "identificador": f"+569{rnd.randint(10000000, 99999999)}",
+                              "aviso_id": aviso_id})
+            for k in range(rnd.randint(0, 3)):
+                comentarios.append({"nombre": f"Visita {k}", "texto": "¿Sigue disponible?",
+                                    "fecha": ingreso + timedelta(hours=k + 1), "aviso_id": aviso_id})
+        for model, batch in ((AvisoAdopcion, avisos), (Foto, fotos), (ContactarPor, contactos),
+                             (Comentario, comentarios)):
+            if batch:
+                s.execute(insert(model), batch)
+    return n
+
+
+def init_db_cli(app: Flask) -> None:
+    """
+    Registra el comando `flask init-db`.
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+
+    @app.cli.command("init-db")
+    @click.option("--avisos", type=int, default=0, help="Además, crear N avisos sintéticos (benchmarks).")
+    @click.option("--semilla", type=int, default=0, help="Semilla de los avisos sintéticos.")
+    def init_db(avisos, semilla):
+        engine = get_engine()
+        if engine.dialect.name == "sqlite":
+            os.makedirs(os.path.dirname(os.path.abspath(app.config["SQLITE_PATH"])), exist_ok=True)
+        Base.metadata.create_all(engine)
+        click.echo(f"Tablas listas en {engine.url.render_as_string(hide_password=True)}.")
+        click.echo(f"{seed_region_comuna()} regiones/comunas cargadas.")
+        if avisos:
+            try:
+                click.echo(f"{seed_dummy_avisos(avisos, semilla)} avisos sintéticos creados.")
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            # los sintéticos se insertan directo en las tablas: se proyectan aparte (ver readmodel.py)
+            click.echo(f"{rebuild_projection(app.config['READMODEL_BATCH_SIZE'])} avisos proyectados.")
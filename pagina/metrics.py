@@ -0,0 +1,136 @@
+import hmac
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask, Blueprint, abort, current_app, g, jsonify, request
+
+
+class Metrics:
+    """
+    Registro en memoria (por proceso) de contadores, gauges y latencias.
+      - Contadores: inc("admission.write.rejected")
+      - Gauges: funciones evaluadas al momento de leer (register_gauge)
+      - Latencias: observe("http.api.listar_avisos", ms) → count/sum/max
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def inc(self, name: str, n: int = 1) -> None:
+        """
+        Incrementa un contador.
+          - name: str — Nombre con puntos (p. ej. 'ratelimit.post.rejected').
+          - n: int — Incremento (default 1).
+        ->
+          - None
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """
+        Registra una observación de latencia.
+          - name: str — Serie (p. ej. 'http.api.listar_avisos').
+          - value_ms: float — Duración en milisegundos.
+        ->
+          - None
+        """
+        with self._lock:
+            t = self._timings.get(name)
+            if t is None:
+                t = self._timings[name] = {"count": 0, "sum_ms": 0.0, "max_ms": 0.0}
+            t["count"] += 1
+            t["sum_ms"] += value_ms
+            if value_ms > t["max_ms"]:
+                t["max_ms"] = value_ms
+
+    def register_gauge(self, name: str, fn: Callable[[], Any]) -> None:
+        """
+        Registra un gauge calculado al leer.
+          - name: str — Nombre del gauge.
+          - fn: Callable[[], Any] — Función sin argumentos que retorna el valor actual.
+        ->
+          - None
+        """
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Copia consistente de todas las métricas.
+          - (None)
+        ->
+          - dict — {"counters": {...}, "gauges": {...}, "timings": {name: {count, sum_ms, max_ms, avg_ms}}}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {k: dict(v) for k, v in self._timings.items()}
+            gauges = dict(self._gauges)
+        for t in timings.values():
+            t["avg_ms"] = t["sum_ms"] / t["count"] if t["count"] else 0.0
+        return {
+            "counters": counters,
+            "gauges": {k: fn() for k, fn in gauges.items()},
+            "timings": timings,
+        }
+
+
+metrics = Metrics()
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api")
+
+
+def check_admin_token(token: Optional[str]):
+    """
+    Control de acceso de las rutas internas (métricas, profiler): header X-Admin-Token = token.
+      - token: str | None — Token configurado (None = la ruta no existe).
+    ->
+      - None si pasa; 403 si el header no calza. Aborta con 404 si no hay token configurado.
+    """
+    if not token:
+        abort(404)
+    given = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+        return jsonify({"error": "No autorizado"}), 403
+    return None
+
+
+@metrics_bp.before_request
+def _require_token():
+    return check_admin_token(current_app.config["METRICS_TOKEN"])
+
+
+@metrics_bp.get("/metrics")
+def ver_metricas():
+    """
+    Métricas del proceso actual (admisión, rate limit, latencias por endpoint).
+      - Header X-Admin-Token: METRICS_TOKEN (sin token configurado, 404).
+    ->
+      - JSON: {"counters": {...}, "gauges": {...}, "timings": {...}}
+    """
+    return jsonify(metrics.snapshot())
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    Registra el endpoint /api/metrics y la medición de latencia por endpoint.
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    app.register_blueprint(metrics_bp)
+
+    @app.before_request
+    def _start_timer() -> None:
+        g._t0 = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        t0 = g.pop("_t0", None)
+        if t0 is not None and request.endpoint:
+            metrics.observe(f"http.{request.endpoint}", (time.perf_counter() - t0) * 1000.0)
+        return response
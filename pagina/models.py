@@ -1,12 +1,27 @@
 from typing import List, Optional
 from datetime import datetime
 from sqlalchemy import (
-    Integer, String, ForeignKey, Text, Enum, DateTime
+    Integer, String, ForeignKey, Text, Enum, DateTime, Index
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, foreign
+from .config import Config
 from .db import Base
 
-SCHEMA = "tarea2"
+# "tarea2" en MySQL; None en SQLite (un archivo = una base, sin esquemas)
+SCHEMA = Config.DB_SCHEMA
+# SQLite sólo autoincrementa un INTEGER PRIMARY KEY de una columna: ahí foto y contactar_por
+# usan PK (id) en vez de (id, aviso_id). id es único igual, así que el mapeo es equivalente.
+COMPOSITE_CHILD_PK = Config.DB_BACKEND != "sqlite"
+
+
+def _fk(target: str) -> str:
+    """
+    Nombre calificado de una columna para ForeignKey ('tabla.col' → 'tarea2.tabla.col' si hay esquema).
+      - target: str — 'tabla.columna'.
+    ->
+      - str
+    """
+    return f"{SCHEMA}.{target}" if SCHEMA else target
 
 TipoMascota = Enum("gato", "perro", name="tipo_mascota", native_enum=False, create_constraint=False)
 UnidadMedida = Enum("a", "m", name="unidad_medida", native_enum=False, create_constraint=False)
@@ -54,7 +69,7 @@ class Comuna(Base):
     nombre: Mapped[str] = mapped_column(String(200), nullable=False)
     region_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey(f"{SCHEMA}.region.id", ondelete="NO ACTION", onupdate="NO ACTION"),
+        ForeignKey(_fk("region.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
         nullable=False,
         index=True,
     )
@@ -91,10 +106,10 @@ class AvisoAdopcion(Base):
     __table_args__ = {"schema": SCHEMA}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    fecha_ingreso: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    fecha_ingreso: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     comuna_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey(f"{SCHEMA}.comuna.id", ondelete="NO ACTION", onupdate="NO ACTION"),
+        ForeignKey(_fk("comuna.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
         nullable=False,
         index=True,
     )
@@ -106,7 +121,7 @@ class AvisoAdopcion(Base):
     cantidad: Mapped[int] = mapped_column(Integer, nullable=False)
     edad: Mapped[int] = mapped_column(Integer, nullable=False)
     unidad_medida: Mapped[str] = mapped_column(UnidadMedida, nullable=False)
-    fecha_entrega: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    fecha_entrega: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     descripcion: Mapped[Optional[str]] = mapped_column(Text(500))
 
     comuna: Mapped["Comuna"] = relationship(back_populates="avisos")
@@ -144,14 +159,14 @@ class Foto(Base):
     __tablename__ = "foto"
     __table_args__ = {"schema": SCHEMA}
 
-    # PK compuesta (id, aviso_id)
+    # PK compuesta (id, aviso_id) (sólo id en SQLite, ver COMPOSITE_CHILD_PK)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     ruta_archivo: Mapped[str] = mapped_column(String(300), nullable=False)
     nombre_archivo: Mapped[str] = mapped_column(String(300), nullable=False)
     aviso_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey(f"{SCHEMA}.aviso_adopcion.id", ondelete="NO ACTION", onupdate="NO ACTION"),
-        primary_key=True,
+        ForeignKey(_fk("aviso_adopcion.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
+        primary_key=COMPOSITE_CHILD_PK,
         nullable=False,
         index=True,
     )
@@ -175,14 +190,14 @@ class ContactarPor(Base):
     __tablename__ = "contactar_por"
     __table_args__ = {"schema": SCHEMA}
 
-    # PK compuesta (id, aviso_id)
+    # PK compuesta (id, aviso_id) (sólo id en SQLite, ver COMPOSITE_CHILD_PK)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     nombre: Mapped[str] = mapped_column(ViaContacto, nullable=False)
     identificador: Mapped[str] = mapped_column(String(150), nullable=False)
     aviso_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey(f"{SCHEMA}.aviso_adopcion.id", ondelete="NO ACTION", onupdate="NO ACTION"),
-        primary_key=True,
+        ForeignKey(_fk("aviso_adopcion.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
+        primary_key=COMPOSITE_CHILD_PK,
         nullable=False,
         index=True,
     )
@@ -208,7 +223,7 @@ class Comentario(Base):
 
     aviso_id: Mapped[int] = mapped_column(
         Integer,
-        ForeignKey(f"{SCHEMA}.aviso_adopcion.id", ondelete="NO ACTION", onupdate="NO ACTION"),
+        ForeignKey(_fk("aviso_adopcion.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
         nullable=False,
         index=True,
     )
@@ -224,3 +239,227 @@ class Comentario(Base):
             "texto": self.texto,
             "fecha": iso,
         }
+
+
+class Nota(Base):
+    """
+    Modelo Nota (evaluación de un aviso).
+      - Tabla: tarea2.nota
+      - Columnas: id, aviso_id(FK), nota
+    """
+    __tablename__ = "nota"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    aviso_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey(_fk("aviso_adopcion.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
+        nullable=False,
+        index=True,
+    )
+    nota: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class AvisoVistas(Base):
+    """
+    Contador de visitas al detalle de un aviso (lo escribe popular.py en lotes).
+    Sin FK: el upsert no debe fallar si el aviso se archivó entre la visita y el flush.
+      - Tabla: tarea2.aviso_vistas
+      - Columnas: aviso_id (PK), vistas, actualizado
+    """
+    __tablename__ = "aviso_vistas"
+    __table_args__ = {"schema": SCHEMA}
+
+    aviso_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    vistas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    actualizado: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class AvisoProyeccion(Base):
+    """
+    Proyección de lectura de un aviso vigente (ver readmodel.py): el JSON ya serializado, completo y
+    con la vista card, más las columnas por las que se ordena / filtra. Sin FK, como aviso_vistas.
+      - Tabla: tarea2.aviso_proyeccion
+      - Columnas: aviso_id (PK), fecha_ingreso, comuna_id, tipo, n_comentarios, completo, tarjeta
+    """
+    __tablename__ = "aviso_proyeccion"
+    __table_args__ = (
+        # orden del listado (fecha_ingreso desc, id desc) resuelto por el índice
+        Index("ix_aviso_proyeccion_orden", "fecha_ingreso", "aviso_id"),
+        {"schema": SCHEMA},
+    )
+
+    aviso_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    fecha_ingreso: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    comuna_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    tipo: Mapped[str] = mapped_column(TipoMascota, nullable=False)
+    n_comentarios: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completo: Mapped[str] = mapped_column(Text, nullable=False)
+    tarjeta: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class Invalidacion(Base):
+    """
+    Registro de invalidaciones de cache publicadas (backend "db" del bus, ver bus.py).
+    id lo asigna InvalidacionSeq (orden de commit, no de inserción).
+      - Tabla: tarea2.invalidacion
+      - Columnas: id, namespaces ('avisos,stats,...'), origen (proceso emisor), creado
+    """
+    __tablename__ = "invalidacion"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    namespaces: Mapped[str] = mapped_column(String(200), nullable=False)
+    origen: Mapped[str] = mapped_column(String(120), nullable=False)
+    creado: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class InvalidacionSeq(Base):
+    """
+    Fila única (id = 1) con el último id asignado en invalidacion.
+      - Tabla: tarea2.invalidacion_seq
+      - Columnas: id, ultimo
+    """
+    __tablename__ = "invalidacion_seq"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    ultimo: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class Cambio(Base):
+    """
+    Log de cambios para espejos y clientes offline (GET /api/avisos/changes, ver changes.py).
+    id lo asigna CambioSeq (orden de commit, no de inserción).
+      - Tabla: tarea2.cambio
+      - Columnas: id (secuencia), entidad ('aviso'|'comentario'), entidad_id, aviso_id,
+                  operacion ('create'|'update'|'delete'), creado
+    """
+    __tablename__ = "cambio"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    entidad: Mapped[str] = mapped_column(String(20), nullable=False)
+    entidad_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    aviso_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    operacion: Mapped[str] = mapped_column(String(10), nullable=False)
+    creado: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class CambioSeq(Base):
+    """
+    Fila única (id = 1) con el último número de secuencia del log y hasta dónde se purgó.
+      - Tabla: tarea2.cambio_seq
+      - Columnas: id, ultimo, purgado_hasta (tokens menores ya no se pueden continuar)
+    """
+    __tablename__ = "cambio_seq"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    ultimo: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    purgado_hasta: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# --- Archivo (avisos con fecha_entrega vencida, ver archive.py) ---
+# Mismas columnas e ids que las tablas "calientes", sin FKs hacia ellas.
+
+
+class AvisoAdopcionArchivo(Base):
+    """
+    Aviso archivado.
+      - Campos: los de AvisoAdopcion + archivado_en: datetime
+      - Relaciones (sólo lectura): fotos, contactos
+    ->
+      - Tabla 'tarea2.aviso_adopcion_archivo'
+    """
+    __tablename__ = "aviso_adopcion_archivo"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    fecha_ingreso: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    comuna_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey(_fk("comuna.id"), ondelete="NO ACTION", onupdate="NO ACTION"),
+        nullable=False,
+        index=True,
+    )
+    sector: Mapped[Optional[str]] = mapped_column(String(100))
+    nombre: Mapped[str] = mapped_column(String(200), nullable=False)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
+    celular: Mapped[Optional[str]] = mapped_column(String(15))
+    tipo: Mapped[str] = mapped_column(TipoMascota, nullable=False)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False)
+    edad: Mapped[int] = mapped_column(Integer, nullable=False)
+    unidad_medida: Mapped[str] = mapped_column(UnidadMedida, nullable=False)
+    fecha_entrega: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    descripcion: Mapped[Optional[str]] = mapped_column(Text(500))
+    archivado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    fotos: Mapped[List["FotoArchivo"]] = relationship(
+        primaryjoin=lambda: AvisoAdopcionArchivo.id == foreign(FotoArchivo.aviso_id),
+        viewonly=True,
+    )
+    contactos: Mapped[List["ContactarPorArchivo"]] = relationship(
+        primaryjoin=lambda: AvisoAdopcionArchivo.id == foreign(ContactarPorArchivo.aviso_id),
+        viewonly=True,
+    )
+
+
+class FotoArchivo(Base):
+    """
+    Foto de un aviso archivado (mismas columnas que Foto).
+    ->
+      - Tabla 'tarea2.foto_archivo'
+    """
+    __tablename__ = "foto_archivo"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    ruta_archivo: Mapped[str] = mapped_column(String(300), nullable=False)
+    nombre_archivo: Mapped[str] = mapped_column(String(300), nullable=False)
+    aviso_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, index=True)
+
+
+class ContactarPorArchivo(Base):
+    """
+    Medio de contacto de un aviso archivado (mismas columnas que ContactarPor).
+    ->
+      - Tabla 'tarea2.contactar_por_archivo'
+    """
+    __tablename__ = "contactar_por_archivo"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    nombre: Mapped[str] = mapped_column(ViaContacto, nullable=False)
+    identificador: Mapped[str] = mapped_column(String(150), nullable=False)
+    aviso_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False, index=True)
+
+
+class ComentarioArchivo(Base):
+    """
+    Comentario de un aviso archivado (mismas columnas que Comentario).
+    ->
+      - Tabla 'tarea2.comentario_archivo'
+    """
+    __tablename__ = "comentario_archivo"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    nombre: Mapped[str] = mapped_column(String(80), nullable=False)
+    texto: Mapped[str] = mapped_column(String(300), nullable=False)
+    fecha: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    aviso_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+
+class NotaArchivo(Base):
+    """
+    Nota de un aviso archivado (mismas columnas que Nota).
+    ->
+      - Tabla 'tarea2.nota_archivo'
+    """
+    __tablename__ = "nota_archivo"
+    __table_args__ = {"schema": SCHEMA}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    aviso_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    nota: Mapped[int] = mapped_column(Integer, nullable=False)
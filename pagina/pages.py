@@ -1,39 +1,198 @@
-from flask import Blueprint, render_template, Response, url_for
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Blueprint, current_app, render_template, request, Response, url_for
+from markupsafe import Markup
+from sqlalchemy.exc import SQLAlchemyError
+
+from .bus import subscribe
+from .db import get_session
+from .feed import get_latest
+from .queries import avisos_page, aviso_detail, comentarios_page
+from .serializers import CARD_FIELDS, project
 
 pages_bp = Blueprint("pages", __name__)
 
+# Cantidades que piden las vistas JS en su primera carga (HomeView / ListView / DetailView)
+HOME_LATEST_LIMIT = 5
+LIST_PAGE_SIZE = 5
+DETAIL_COMMENTS_LIMIT = 20
+
+
+class FragmentCache:
+    """
+    Cache en memoria (por proceso) de fragmentos HTML ya renderizados, con TTL.
+      - ttl: float — Segundos de validez de cada fragmento.
+      - max_entries: int — Tope de entradas (al llenarse se descarta la más antigua).
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: Dict[Hashable, Tuple[float, Markup]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Markup]) -> Markup:
+        """
+        Retorna el fragmento cacheado o lo renderiza y guarda.
+          - key: Hashable — Clave del fragmento.
+          - render: Callable[[], Markup] — Render a ejecutar en caso de miss.
+        ->
+          - Markup — HTML listo para insertar en la plantilla.
+        """
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+        html = render()
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (now + self.ttl, html)
+        return html
+
+    def clear(self) -> None:
+        """
+        Descarta todos los fragmentos (tras escrituras que cambian los datos embebidos).
+          - (None)
+        ->
+          - None
+        """
+        with self._lock:
+            self._data.clear()
+
+
+_fragments: Optional[FragmentCache] = None
+
+
+def _fragment_cache() -> FragmentCache:
+    global _fragments
+    if _fragments is None:
+        _fragments = FragmentCache(current_app.config["PAGE_FRAGMENT_TTL"])
+    return _fragments
+
+
+def invalidate_fragments() -> None:
+    """
+    Invalida los datos iniciales embebidos (llamar después de crear avisos/comentarios).
+      - (None)
+    ->
+      - None
+    """
+    if _fragments is not None:
+        _fragments.clear()
+
+
+def _on_publish(namespaces, remote: bool) -> None:
+    if namespaces & {"avisos", "comentarios"}:
+        invalidate_fragments()
+
+
+subscribe(_on_publish)
+
+
+def _routes_map() -> Dict[str, str]:
+    """
+    Rutas públicas del sitio (window.ROUTES).
+      - (None)
+    ->
+      - dict — {home, list, stats}.
+    """
+    return {
+        "home": url_for("pages.index"),
+        "list": url_for("pages.list_view"),
+        "stats": url_for("pages.stats_view"),
+    }
+
+
+def _initial_data(key: Hashable, load: Callable[[Any], Dict[str, Any]]) -> Markup:
+    """
+    Fragmento con window.ROUTES y los datos de la primera carga (JSON embebido), cacheado.
+    Si la BD falla se embebe sólo ROUTES y la vista JS pide los datos a la API como antes.
+      - key: Hashable — Clave del fragmento (vista + parámetros).
+      - load: Callable[[Session], dict] — Carga los datos con una sesión abierta.
+    ->
+      - Markup
+    """
+    def render() -> Markup:
+        with get_session() as s:
+            data = load(s)
+        return Markup(render_template("_initial_data.html", routes=_routes_map(), data=data))
+
+    try:
+        return _fragment_cache().get_or_render(key, render)
+    except SQLAlchemyError:
+        current_app.logger.exception("No se pudieron embeber los datos iniciales de %s", key)
+        return Markup(render_template("_initial_data.html", routes=_routes_map(), data={}))
+
 
 @pages_bp.route("/", methods=["GET"])
 def index():
-    return render_template("index.html")
+    # los últimos avisos salen del ring buffer (feed.py), sin pasar por el cache de fragmentos;
+    # se embeben con los campos de la tarjeta (lo mismo que pide HomeView con view=card)
+    try:
+        latest = {"data": [project(a, CARD_FIELDS) for a in get_latest(HOME_LATEST_LIMIT)]}
+    except SQLAlchemyError:
+        current_app.logger.exception("No se pudieron embeber los últimos avisos")
+        latest = None
+    data = {"latest": latest} if latest is not None else {}
+    initial = Markup(render_template("_initial_data.html", routes=_routes_map(), data=data))
+    return render_template("index.html", initial_data=initial)
 
 
 @pages_bp.route("/list", methods=["GET"])
 def list_view():
-    return render_template("list.html")
+    try:
+        page = max(int(request.args.get("page", "1")), 1)
+    except ValueError:
+        page = 1
+    initial = _initial_data(
+        ("list", page),
+        lambda s: {"page": avisos_page(s, page, LIST_PAGE_SIZE)},
+    )
+    return render_template("list.html", initial_data=initial)
 
 
 @pages_bp.route("/list/<int:aviso_id>", methods=["GET"])
 def list_detail(aviso_id):
-    return render_template("detail.html", aviso_id=aviso_id)
+    def load(s) -> Dict[str, Any]:
+        aviso = aviso_detail(s, aviso_id)
+        if aviso is None:
+            return {}
+        return {
+            "aviso": aviso,
+            "comentarios": comentarios_page(s, aviso_id, 0, DETAIL_COMMENTS_LIMIT, "desc",
+                                            aviso.get("archivado", False)),
+        }
+
+    initial = _initial_data(("detail", aviso_id), load)
+    # la visita no se cuenta aquí: la cuenta GET /api/avisos/<id>, que la vista JS llama siempre
+    # (con ?fields=id si usó los datos embebidos, ver DetailView.js)
+    return render_template("detail.html", aviso_id=aviso_id, initial_data=initial)
 
 
 @pages_bp.route("/stats", methods=["GET"])
 def stats_view():
-    return render_template("stats.html")
+    initial = Markup(render_template("_initial_data.html", routes=_routes_map(), data={}))
+    return render_template("stats.html", initial_data=initial)
 
 
 @pages_bp.route("/routes.js", methods=["GET"])
 def routes_js():
     """
     Devuelve un JS con las rutas públicas (window.ROUTES).
+    Las páginas ya lo embeben (ver _initial_data); se mantiene para clientes externos.
       - (None)
     ->
       - ResponseReturnValue — Respuesta con mimetype application/javascript.
     """
+    routes = _routes_map()
     js = f"""window.ROUTES = {{
-        home: "{url_for('pages.index')}",
-        list: "{url_for('pages.list_view')}",
-        stats: "{url_for('pages.stats_view')}"
+        home: "{routes['home']}",
+        list: "{routes['list']}",
+        stats: "{routes['stats']}"
     }};"""
     return Response(js, mimetype="application/javascript")
@@ -0,0 +1,65 @@
+import mimetypes
+import os
+from urllib.parse import quote
+
+from flask import Blueprint, abort, current_app, request
+from werkzeug.utils import safe_join, send_file
+
+from .serializers import PHOTO_URL_PREFIX
+
+# Fotos subidas por los usuarios. A diferencia del handler de /static:
+#   - ETag fuerte (tamaño + mtime) y Last-Modified → 304 en revalidaciones.
+#   - Cache-Control largo e 'immutable' (los nombres llevan sufijo aleatorio, ver upload.build_timestamp_name).
+#   - Range (206) para descargas parciales / reanudadas.
+#   - Opcionalmente delega el envío al proxy (X-Sendfile / X-Accel-Redirect) y el worker queda libre.
+photos_bp = Blueprint("photos", __name__)
+
+
+@photos_bp.get(f"{PHOTO_URL_PREFIX}/<path:nombre>")
+def foto(nombre: str):
+    """
+    Sirve una foto de UPLOAD_FOLDER.
+      - nombre: str — Nombre del archivo (sin directorios fuera de UPLOAD_FOLDER).
+    ->
+      - ResponseReturnValue — 200 / 206 / 304 / 416, o 404 si no existe.
+    """
+    folder = current_app.config["UPLOAD_FOLDER"]
+    path = safe_join(folder, nombre)
+    if path is None:
+        abort(404)
+    try:
+        st = os.stat(path)
+    except OSError:
+        abort(404)
+    if not os.path.isfile(path):
+        abort(404)
+
+    etag = f"{st.st_size:x}-{st.st_mtime_ns:x}"
+    max_age = current_app.config["PHOTO_MAX_AGE"]
+    offload = current_app.config["PHOTO_OFFLOAD"]
+
+    if offload == "x-accel-redirect":
+        # nginx envía el archivo (y atiende Range); aquí sólo se resuelven los condicionales
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        res = current_app.response_class(mimetype=mimetype)
+        res.headers["X-Accel-Redirect"] = current_app.config["PHOTO_ACCEL_PREFIX"] + quote(nombre)
+        res.set_etag(etag)
+        res.last_modified = st.st_mtime
+        res.cache_control.public = True
+        res.cache_control.max_age = max_age
+        res.cache_control.immutable = True
+        return res.make_conditional(request)
+
+    res = send_file(
+        path,
+        request.environ,
+        conditional=True,
+        etag=etag,
+        last_modified=st.st_mtime,
+        max_age=max_age,
+        use_x_sendfile=offload == "x-sendfile",
+        response_class=current_app.response_class,
+    )
+    res.cache_control.public = True
+    res.cache_control.immutable = True
+    return res
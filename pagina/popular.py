@@ -0,0 +1,317 @@
+import atexit
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from flask import Flask
+from sqlalchemy import select, Insert
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from .cache import cached
+from .db import get_session
+from .metrics import metrics
+from .models import AvisoAdopcion, AvisoVistas
+from .queries import hot_proyeccion_by_ids, popular_candidates_stmt
+from .serializers import project
+
+# Visitas al detalle y ranking de avisos populares (?order=popular en el listado).
+# Cada visita sólo incrementa un dict en memoria; un thread por proceso vuelca los contadores
+# a aviso_vistas en un upsert por lotes (VIEW_FLUSH_INTERVAL) y recalcula el top-N
+# (POPULAR_REFRESH_INTERVAL), que se sirve ya serializado desde memoria.
+# Cada worker suma sus propias visitas (el upsert es aditivo). El ranking se calcula una vez por
+# intervalo en el host: el resultado va al cache compartido (namespace "avisos", single-flight) y los
+# demás workers lo leen de ahí en vez de puntuar de nuevo todos los avisos vigentes.
+
+
+def _upsert_stmt(dialect: str) -> Insert:
+    """
+    INSERT ... que suma vistas si el aviso ya tiene fila (MySQL: ON DUPLICATE KEY, SQLite: ON CONFLICT).
+      - dialect: str — Nombre del dialecto del engine.
+    ->
+      - Insert — Se ejecuta con una lista de {"aviso_id", "vistas", "actualizado"} (executemany).
+    """
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(AvisoVistas)
+        return stmt.on_duplicate_key_update(
+            vistas=AvisoVistas.vistas + stmt.inserted.vistas,
+            actualizado=stmt.inserted.actualizado,
+        )
+    stmt = sqlite.insert(AvisoVistas)
+    return stmt.on_conflict_do_update(
+        index_elements=[AvisoVistas.aviso_id],
+        set_={"vistas": AvisoVistas.vistas + stmt.excluded.vistas, "actualizado": stmt.excluded.actualizado},
+    )
+
+
+class ViewCounter:
+    """
+    Visitas pendientes de volcar, por aviso (en memoria del proceso).
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, aviso_id: int) -> None:
+        """
+        Cuenta una visita (sin tocar la BD).
+          - aviso_id: int
+        ->
+          - None
+        """
+        with self._lock:
+            self._pending[aviso_id] = self._pending.get(aviso_id, 0) + 1
+
+    def pending(self) -> int:
+        """
+        Visitas aún no volcadas.
+          - (None)
+        ->
+          - int
+        """
+        with self._lock:
+            return sum(self._pending.values())
+
+    def flush(self) -> int:
+        """
+        Vuelca los contadores en un solo upsert por lotes. Sólo se guardan ids de avisos vigentes
+        (una URL con un id inventado no crea filas). Si la BD falla, los contadores se reponen.
+          - (None)
+        ->
+          - int — Visitas volcadas.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with get_session() as s:
+                ids = s.scalars(select(AvisoAdopcion.id).where(AvisoAdopcion.id.in_(list(pending)))).all()
+                if ids:
+                    now = datetime.now()
+                    rows = [{"aviso_id": i, "vistas": pending[i], "actualizado": now} for i in ids]
+                    s.execute(_upsert_stmt(s.get_bind().dialect.name), rows)
+        except SQLAlchemyError:
+            with self._lock:
+                for aviso_id, n in pending.items():
+                    self._pending[aviso_id] = self._pending.get(aviso_id, 0) + n
+            metrics.inc("views.flush_errors")
+            raise
+        n = sum(pending[i] for i in ids)
+        metrics.inc("views.flushed", n)
+        return n
+
+
+class PopularRanking:
+    """
+    Top-N de avisos vigentes por puntaje, ya serializados (se reemplaza la lista entera al recalcular).
+    Puntaje: (vistas + comment_weight · comentarios + 1) · 0.5^(horas desde el ingreso / half_life_hours).
+      - top_n: int — Avisos retenidos.
+      - comment_weight: float — Cuántas visitas vale un comentario.
+      - half_life_hours: float — Horas en que el puntaje cae a la mitad.
+      - shared_ttl: float | None — Si se indica, compute() pasa por el cache compartido con ese TTL.
+    """
+
+    def __init__(self, top_n: int, comment_weight: float, half_life_hours: float,
+                 shared_ttl: Optional[float] = None) -> None:
+        self.top_n = top_n
+        self.comment_weight = comment_weight
+        self.half_life_hours = half_life_hours
+        self.items: List[Dict[str, Any]] = []
+        self.computed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load = cached("avisos", ttl=shared_ttl)(self.compute) if shared_ttl else self.compute
+
+    def score(self, vistas: int, comentarios: int, fecha_ingreso: datetime, now: datetime) -> float:
+        """
+        Puntaje de un aviso.
+          - vistas, comentarios: int
+          - fecha_ingreso, now: datetime
+        ->
+          - float
+        """
+        age_h = max((now - fecha_ingreso).total_seconds() / 3600.0, 0.0)
+        return (vistas + self.comment_weight * comentarios + 1) * 0.5 ** (age_h / self.half_life_hours)
+
+    def compute(self) -> List[Dict[str, Any]]:
+        """
+        Puntúa todos los avisos vigentes y serializa los top_n.
+          - (None)
+        ->
+          - list[dict] — Avisos del ranking, del mayor puntaje al menor.
+        """
+        now = datetime.now()
+        with get_session() as s:
+            rows = s.execute(popular_candidates_stmt()).all()
+            top = heapq.nlargest(
+                self.top_n, rows,
+                key=lambda r: (self.score(r.vistas, r.comentarios, r.fecha_ingreso, now), r.id),
+            )
+            ids = [r.id for r in top]
+            by_id = {}
+            if ids:
+                for aviso_id, raw in s.execute(hot_proyeccion_by_ids(), {"ids": ids}):
+                    by_id[aviso_id] = json.loads(raw)
+        return [by_id[i] for i in ids if i in by_id]
+
+    def refresh(self) -> None:
+        """
+        Reemplaza el ranking en memoria (desde el cache compartido si lo calculó otro worker).
+          - (None)
+        ->
+          - None
+        """
+        with self._lock:
+            self.items = self._load()
+            self.computed_at = time.monotonic()
+
+    def page(self, page: int, size: int, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """
+        Página del ranking con la misma forma que queries.avisos_page.
+          - page: int — Página (>= 1).
+          - size: int — Tamaño de página.
+          - fields: frozenset[str] | None — Campos de cada aviso (None = todos).
+        ->
+          - dict — {data, page, size, total_items, total_pages}.
+        """
+        items = self.items
+        start = (page - 1) * size
+        total_items = len(items)
+        return {
+            "data": [project(a, fields) for a in items[start:start + size]],
+            "page": page,
+            "size": size,
+            "total_items": total_items,
+            "total_pages": (total_items + size - 1) // size if size else 0,
+        }
+
+
+class _Flusher:
+    """
+    Thread de fondo del proceso: vuelca visitas y recalcula el ranking.
+    Se arranca a demanda y por PID (los threads no sobreviven al fork de gunicorn).
+    """
+
+    def __init__(self, counter: ViewCounter, ranking: PopularRanking,
+                 flush_interval: float, refresh_interval: float, logger: logging.Logger) -> None:
+        self.counter = counter
+        self.ranking = ranking
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.logger = logger
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="popular-flusher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.tick()
+
+    def tick(self) -> None:
+        """
+        Una vuelta: vuelca visitas y, si toca, recalcula el ranking. Nunca lanza: si el thread
+        muriera, el proceso seguiría acumulando visitas sin volcarlas.
+          - (None)
+        ->
+          - None
+        """
+        try:
+            self.counter.flush()
+            computed = self.ranking.computed_at
+            if computed is None or time.monotonic() - computed >= self.refresh_interval:
+                self.ranking.refresh()
+        except SQLAlchemyError:
+            # se reintenta en la próxima vuelta (las visitas quedaron repuestas en memoria)
+            pass
+        except Exception:  # noqa: BLE001 - cualquier otro error también se reintenta en la próxima vuelta
+            metrics.inc("views.flusher_errors")
+            self.logger.exception("Falló el volcado de visitas / ranking de populares; se reintenta.")
+
+
+_counter: Optional[ViewCounter] = None
+_ranking: Optional[PopularRanking] = None
+_flusher: Optional[_Flusher] = None
+
+
+def record_view(aviso_id: int) -> None:
+    """
+    Cuenta una visita al detalle de un aviso (no-op si VIEW_COUNTERS_ENABLED es False).
+      - aviso_id: int
+    ->
+      - None
+    """
+    if _counter is None:
+        return
+    _flusher.ensure_started()
+    _counter.hit(aviso_id)
+
+
+def popular_page(page: int, size: int, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Página de avisos populares desde memoria (la primera vez en el proceso calcula el ranking).
+      - page: int — Página (>= 1).
+      - size: int — Tamaño de página.
+      - fields: frozenset[str] | None — Campos de cada aviso.
+    ->
+      - dict — {data, page, size, total_items, total_pages}. Lanza SQLAlchemyError si no se pudo calcular.
+    """
+    _flusher.ensure_started()
+    if _ranking.computed_at is None:
+        _ranking.refresh()
+    return _ranking.page(page, size, fields)
+
+
+def popular_ready() -> bool:
+    """
+    True si el ranking ya está en memoria (popular_page no tocará la BD).
+      - (None)
+    ->
+      - bool
+    """
+    return _ranking is not None and _ranking.computed_at is not None
+
+
+def _flush_at_exit() -> None:
+    if _counter is not None:
+        try:
+            _counter.flush()
+        except SQLAlchemyError:
+            pass
+
+
+def init_popular(app: Flask) -> None:
+    """
+    Crea contadores, ranking y thread de volcado del proceso (VIEW_*, POPULAR_* de Config).
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    global _counter, _ranking, _flusher
+    cfg = app.config
+    _ranking = PopularRanking(cfg["POPULAR_TOP_N"], cfg["POPULAR_COMMENT_WEIGHT"], cfg["POPULAR_HALF_LIFE_HOURS"],
+                              cfg["POPULAR_REFRESH_INTERVAL"])
+    counter = ViewCounter()
+    _flusher = _Flusher(counter, _ranking, cfg["VIEW_FLUSH_INTERVAL"], cfg["POPULAR_REFRESH_INTERVAL"], app.logger)
+    _counter = counter if cfg["VIEW_COUNTERS_ENABLED"] else None
+
+    metrics.register_gauge("views.pending", counter.pending)
+    metrics.register_gauge(
+        "popular.age_s",
+        lambda: round(time.monotonic() - _ranking.computed_at, 1) if _ranking.computed_at is not None else None,
+    )
+    atexit.register(_flush_at_exit)
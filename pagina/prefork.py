@@ -0,0 +1,87 @@
+import gc
+import os
+import sys
+import time
+from typing import Optional
+
+from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+
+from .catalog import load_catalogs
+from .db import get_engine, get_session
+from .metrics import metrics
+from .queries import warm_up_statements
+
+_started_at = time.time()
+
+
+def rss_bytes(pid: Optional[int] = None) -> int:
+    """
+    Memoria residente (RSS) de un proceso.
+      - pid: int | None — Proceso a medir (default: el actual).
+    ->
+      - int — Bytes (0 si no se puede medir en esta plataforma).
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if pid is None:
+        try:
+            import resource
+        except ImportError:  # pragma: no cover - Windows
+            return 0
+        # máximo histórico; Linux lo reporta en KiB y macOS en bytes
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return 0
+
+
+def preload(app: Flask) -> None:
+    """
+    Deja lista la app antes del fork para que los workers compartan (copy-on-write) lo cargado:
+    plantillas compiladas, mappers ORM configurados, catálogo de regiones/comunas y el SQL
+    compilado de las consultas calientes (queries.warm_up_statements).
+    Termina con gc.freeze() para que el GC de los workers no toque esas páginas.
+      - app: Flask — Aplicación ya creada (create_app).
+    ->
+      - None
+    """
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
+    configure_mappers()
+    try:
+        load_catalogs()
+    except SQLAlchemyError:
+        app.logger.warning("No se pudo precargar el catálogo de regiones/comunas; se cargará a demanda.")
+    try:
+        with get_session() as s:
+            warm_up_statements(s)
+    except SQLAlchemyError:
+        app.logger.warning("No se pudieron precompilar las consultas; se compilarán en el primer request.")
+    # el cache de compilación vive en el engine y se hereda; las conexiones del master no hacen falta
+    get_engine().dispose()
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def report_startup(app: Flask, t0: float) -> float:
+    """
+    Registra y reporta el tiempo de arranque en frío (importar + create_app + preload).
+    Expone en /api/metrics los gauges process.cold_start_ms, process.rss_bytes y process.uptime_s
+    (cada worker reporta su propio RSS).
+      - app: Flask — Aplicación.
+      - t0: float — time.perf_counter() tomado antes de importar la app.
+    ->
+      - float — Milisegundos de arranque.
+    """
+    cold_start_ms = (time.perf_counter() - t0) * 1000.0
+    metrics.register_gauge("process.cold_start_ms", lambda: round(cold_start_ms, 1))
+    metrics.register_gauge("process.pid", os.getpid)
+    metrics.register_gauge("process.rss_bytes", rss_bytes)
+    metrics.register_gauge("process.uptime_s", lambda: round(time.time() - _started_at, 1))
+    app.logger.info("Arranque en frío: %.1f ms, RSS %.1f MiB", cold_start_ms, rss_bytes() / 2**20)
+    return cold_start_ms
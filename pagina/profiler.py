@@ -0,0 +1,539 @@
+import asyncio
+import html
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
+
+if TYPE_CHECKING:  # quart sólo se instala para el modo ASGI (ver asgi.py)
+    from quart import Quart
+
+from .metrics import check_admin_token, metrics
+
+# Profiler por muestreo dentro del proceso (no se pueden adjuntar profilers externos en producción).
+# Cada PROFILER_INTERVAL s un thread lee los stacks (sys._current_frames) sólo de los threads que
+# están atendiendo un request y suma el stack por endpoint. Costo: proporcional a la frecuencia y a
+# los requests en curso, no al tráfico. Opcionalmente, tracemalloc para reportar las líneas que más
+# memoria asignaron (caro: actívelo sólo mientras se investiga).
+# Las rutas /admin/profiler/* requieren el header X-Admin-Token = PROFILER_ADMIN_TOKEN (sin token
+# configurado no existen). Como /api/metrics, todo es por proceso: cada worker tiene su profiler.
+# En la app ASGI todos los requests comparten el thread del event loop: ahí se registra la task de
+# cada request y, al muestrear, el stack del loop se asigna al endpoint de la task que corre en ese
+# momento (lo que va a asyncio.to_thread no se atribuye).
+
+TRUNCATED = "[truncado]"
+
+
+def _frame_label(code) -> str:
+    """
+    Nombre de un frame en el stack colapsado: 'ruta/corta.py:funcion' (sin ';', que separa frames).
+      - code: CodeType
+    ->
+      - str
+    """
+    path = code.co_filename
+    marker = "site-packages" + os.sep
+    i = path.rfind(marker)
+    if i >= 0:
+        path = path[i + len(marker):]
+    else:
+        parts = path.split(os.sep)
+        path = os.sep.join(parts[-2:])
+    return f"{path}:{code.co_name}".replace(";", ",")
+
+
+class SamplingProfiler:
+    """
+    Muestreo periódico de los stacks de los threads que atienden requests, agregados por endpoint.
+      - interval: float — Segundos entre muestras.
+      - max_depth: int — Frames por stack (se conservan los más internos).
+      - max_stacks: int — Stacks distintos retenidos; los nuevos sobre el tope se cuentan como TRUNCATED.
+    """
+
+    def __init__(self, interval: float, max_depth: int, max_stacks: int) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self._active: Dict[int, str] = {}  # thread id → endpoint en curso
+        self._tasks: Dict[asyncio.Task, str] = {}  # task → endpoint en curso (app ASGI)
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}  # thread id → su event loop
+        self._stacks: Counter = Counter()  # (endpoint, "f1;f2;...") → muestras
+        self._labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._gen = 0  # cada start() crea un thread nuevo; los anteriores terminan al ver otro _gen
+        self._pid: Optional[int] = None
+        self.samples = 0
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running and self._pid == os.getpid()
+
+    def enter(self, endpoint: str) -> None:
+        """Marca el thread actual como atendiendo `endpoint` (before_request)."""
+        self._active[threading.get_ident()] = endpoint
+
+    def exit(self) -> None:
+        """Desmarca el thread actual (teardown_request)."""
+        self._active.pop(threading.get_ident(), None)
+
+    def enter_task(self, endpoint: str) -> None:
+        """Marca la task actual del event loop como atendiendo `endpoint` (before_request de Quart)."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks[task] = endpoint
+            self._loops[threading.get_ident()] = task.get_loop()
+
+    def exit_task(self) -> None:
+        """Desmarca la task actual (teardown_request de Quart)."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.pop(task, None)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Arranca el muestreo en este proceso (no-op si ya corre).
+          - interval: float | None — Nuevo intervalo en segundos.
+        ->
+          - None
+        """
+        with self._lock:
+            if interval:
+                self.interval = interval
+            if self.running:
+                return
+            self._running = True
+            self._gen += 1
+            self._pid = os.getpid()
+            self.started_at = time.time()
+            threading.Thread(target=self._run, args=(self._gen,), name="sampling-profiler", daemon=True).start()
+
+    def stop(self) -> None:
+        """Detiene el muestreo (los stacks acumulados se conservan)."""
+        self._running = False
+
+    def reset(self) -> None:
+        """Descarta los stacks acumulados."""
+        with self._lock:
+            self._stacks = Counter()
+            self.samples = 0
+            self.started_at = time.time() if self.running else None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def sample(self) -> None:
+        """
+        Toma una muestra de los threads con un request en curso.
+          - (None)
+        ->
+          - None
+        """
+        frames = sys._current_frames()
+        me = threading.get_ident()
+        active = list(self._active.items())
+        for tid, loop in list(self._loops.items()):
+            # la task que el loop está ejecutando ahora (None si espera I/O)
+            endpoint = self._tasks.get(asyncio.current_task(loop))
+            if endpoint is not None:
+                active.append((tid, endpoint))
+        taken = []
+        for tid, endpoint in active:
+            frame = frames.get(tid)
+            if frame is None or tid == me:
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if frame is not None:
+                stack.append("…")
+            stack.reverse()
+            taken.append((endpoint, ";".join(stack)))
+        del frames
+        with self._lock:
+            self.samples += 1
+            for key in taken:
+                if key not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    key = (key[0], TRUNCATED)
+                self._stacks[key] += 1
+
+    def _run(self, gen: int) -> None:
+        while self._running and self._gen == gen and self._pid == os.getpid():
+            t0 = time.perf_counter()
+            self.sample()
+            metrics.observe("profiler.sample", (time.perf_counter() - t0) * 1000.0)
+            time.sleep(self.interval)
+
+    def collapsed(self, endpoint: Optional[str] = None) -> Dict[str, int]:
+        """
+        Stacks en formato colapsado ('endpoint;f1;f2' → muestras), entrada de flamegraph.pl / speedscope.
+          - endpoint: str | None — Sólo ese endpoint (None = todos).
+        ->
+          - dict
+        """
+        with self._lock:
+            items = list(self._stacks.items())
+        out: Dict[str, int] = {}
+        for (ep, stack), n in items:
+            if endpoint is None or ep == endpoint:
+                out[f"{ep};{stack}"] = n
+        return out
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Muestras por endpoint y, en cada uno, las funciones donde más tiempo se estuvo (frame final).
+          - top: int — Funciones por endpoint.
+        ->
+          - dict — {running, interval, samples, started_at, endpoints: {ep: {samples, self: [[fn, n], ...]}}}
+        """
+        with self._lock:
+            items = list(self._stacks.items())
+        per_ep: Dict[str, Counter] = {}
+        totals: Counter = Counter()
+        for (ep, stack), n in items:
+            totals[ep] += n
+            per_ep.setdefault(ep, Counter())[stack.rsplit(";", 1)[-1]] += n
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "started_at": self.started_at,
+            "endpoints": {
+                ep: {"samples": totals[ep], "self": [[fn, n] for fn, n in per_ep[ep].most_common(top)]}
+                for ep in sorted(totals, key=totals.get, reverse=True)
+            },
+        }
+
+
+def render_flamegraph(stacks: Dict[str, int], title: str, width: int = 1200) -> str:
+    """
+    SVG de un flame graph (raíz abajo, ancho ∝ muestras; tooltip con nombre y porcentaje).
+      - stacks: dict — Formato colapsado ('f1;f2;f3' → muestras).
+      - title: str
+      - width: int — Ancho en px.
+    ->
+      - str — Documento SVG.
+    """
+    # árbol: nodo = [muestras, {hijo: nodo}]
+    root: List[Any] = [0, {}]
+    depth = 0
+    for stack, n in stacks.items():
+        node = root
+        node[0] += n
+        frames = stack.split(";")
+        depth = max(depth, len(frames))
+        for name in frames:
+            node = node[1].setdefault(name, [0, {}])
+            node[0] += n
+
+    row_h, pad_top = 16, 30
+    height = pad_top + (depth + 1) * row_h + 10
+    total = root[0] or 1
+    scale = (width - 20) / total
+    rects: List[str] = []
+
+    def draw(name: str, node: List[Any], x: float, level: int) -> None:
+        w = node[0] * scale
+        if w < 0.3:
+            return
+        y = height - 10 - (level + 1) * row_h
+        hue = zlib.crc32(name.encode("utf-8")) % 40
+        label = html.escape(name)
+        pct = 100.0 * node[0] / total
+        text = ""
+        chars = int((w - 6) / 7)
+        if chars >= 3:
+            shown = name if len(name) <= chars else name[:chars - 1] + "…"
+            text = f'<text x="{x + 3:.1f}" y="{y + 12}">{html.escape(shown)}</text>'
+        rects.append(
+            f'<g><title>{label} ({node[0]} muestras, {pct:.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_h - 1}" rx="2" '
+            f'fill="hsl({hue + 10},85%,{55 + hue % 10}%)"/>{text}</g>'
+        )
+        child_x = x
+        for child_name, child in sorted(node[1].items()):
+            draw(child_name, child, child_x, level + 1)
+            child_x += child[0] * scale
+
+    draw("all", root, 10, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<text x="10" y="20" font-size="14">{html.escape(title)}</text>'
+        + "".join(rects) + "</svg>"
+    )
+
+
+class AllocationTracker:
+    """
+    Reportes de tracemalloc: líneas (o tracebacks) con más memoria asignada viva, y la diferencia
+    contra la foto tomada al iniciar/reiniciar.
+      - nframes: int — Frames guardados por asignación (más = más caro).
+    """
+
+    FILTERS = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ]
+
+    def __init__(self, nframes: int) -> None:
+        self.nframes = nframes
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, nframes: Optional[int] = None) -> None:
+        """
+        Activa tracemalloc y toma la foto base.
+          - nframes: int | None — Frames por asignación.
+        ->
+          - None
+        """
+        if nframes:
+            self.nframes = nframes
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        """Desactiva tracemalloc (libera sus trazas)."""
+        tracemalloc.stop()
+        self._baseline = None
+
+    def reset(self) -> None:
+        """Nueva foto base (los reportes con diff=1 parten desde aquí)."""
+        if tracemalloc.is_tracing():
+            self._baseline = self._snapshot()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    def report(self, top: int, group: str = "lineno", diff: bool = False) -> Dict[str, Any]:
+        """
+        Top de asignaciones vivas.
+          - top: int — Entradas.
+          - group: str — 'lineno' | 'filename' | 'traceback'.
+          - diff: bool — Comparar contra la foto base (crecimiento desde start/reset).
+        ->
+          - dict — {traced_kib, peak_kib, stats: [{where, size_kib, count, size_diff_kib?, traceback?}]}.
+                   Lanza RuntimeError si tracemalloc no está activo.
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc no está activo")
+        snap = self._snapshot()
+        if diff and self._baseline is not None:
+            stats = snap.compare_to(self._baseline, group)
+        else:
+            stats = snap.statistics(group)
+        out = []
+        for st in stats[:top]:
+            frame = st.traceback[0]
+            item = {
+                "where": f"{frame.filename}:{frame.lineno}",
+                "size_kib": round(st.size / 1024, 1),
+                "count": st.count,
+            }
+            if hasattr(st, "size_diff"):
+                item["size_diff_kib"] = round(st.size_diff / 1024, 1)
+            if group == "traceback":
+                item["traceback"] = [f"{f.filename}:{f.lineno}" for f in st.traceback]
+            out.append(item)
+        current, peak = tracemalloc.get_traced_memory()
+        return {"traced_kib": round(current / 1024, 1), "peak_kib": round(peak / 1024, 1), "stats": out}
+
+
+profiler_bp = Blueprint("profiler", __name__, url_prefix="/admin/profiler")
+
+
+@profiler_bp.before_request
+def _require_token():
+    return check_admin_token(current_app.config["PROFILER_ADMIN_TOKEN"])
+
+
+def _profiler() -> SamplingProfiler:
+    return current_app.extensions["profiler"]
+
+
+def _allocations() -> AllocationTracker:
+    return current_app.extensions["allocations"]
+
+
+@profiler_bp.get("")
+def estado_profiler():
+    """
+    Estado del profiler de este proceso y resumen por endpoint.
+      - Query: top: int (default 10) — Funciones por endpoint.
+    ->
+      - JSON {pid, running, interval, samples, started_at, endpoints, tracemalloc}
+    """
+    top = request.args.get("top", default=10, type=int)
+    data = _profiler().summary(max(1, min(top, 100)))
+    data["tracemalloc"] = _allocations().running
+    return jsonify(data)
+
+
+@profiler_bp.post("/start")
+def iniciar_profiler():
+    """
+    Arranca el muestreo y/o tracemalloc en este proceso.
+      - Body JSON (opcional): {"interval": float, "tracemalloc": bool, "nframes": int}
+    ->
+      - JSON con el estado.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        interval = float(payload["interval"]) if payload.get("interval") is not None else None
+        nframes = int(payload["nframes"]) if payload.get("nframes") is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "interval/nframes inválidos"}), 400
+    if interval is not None and not (0.001 <= interval <= 1.0):
+        return jsonify({"error": "interval debe estar entre 0.001 y 1 s"}), 400
+    if nframes is not None and not (1 <= nframes <= 100):
+        return jsonify({"error": "nframes debe estar entre 1 y 100"}), 400
+    _profiler().start(interval)
+    if payload.get("tracemalloc"):
+        _allocations().start(nframes)
+    return estado_profiler()
+
+
+@profiler_bp.post("/stop")
+def detener_profiler():
+    """
+    Detiene el muestreo y tracemalloc (los stacks se conservan hasta /reset).
+    ->
+      - JSON con el estado.
+    """
+    _profiler().stop()
+    if _allocations().running:
+        _allocations().stop()
+    return estado_profiler()
+
+
+@profiler_bp.post("/reset")
+def reiniciar_profiler():
+    """
+    Descarta los stacks acumulados y toma una nueva foto base de tracemalloc.
+    ->
+      - JSON con el estado.
+    """
+    _profiler().reset()
+    _allocations().reset()
+    return estado_profiler()
+
+
+@profiler_bp.get("/collapsed")
+def stacks_colapsados():
+    """
+    Stacks colapsados ('endpoint;f1;f2 N' por línea), para flamegraph.pl o speedscope.
+      - Query: endpoint: str (opcional) — p. ej. 'api.crear_aviso'.
+    ->
+      - text/plain
+    """
+    stacks = _profiler().collapsed(request.args.get("endpoint") or None)
+    body = "".join(f"{k} {v}\n" for k, v in sorted(stacks.items()))
+    return Response(body, mimetype="text/plain")
+
+
+@profiler_bp.get("/flamegraph")
+def flamegraph():
+    """
+    Flame graph SVG de los stacks acumulados.
+      - Query: endpoint: str (opcional)
+    ->
+      - image/svg+xml
+    """
+    endpoint = request.args.get("endpoint") or None
+    prof = _profiler()
+    stacks = prof.collapsed(endpoint)
+    title = f"pid {os.getpid()} · {endpoint or 'todos los endpoints'} · {sum(stacks.values())} muestras"
+    return Response(render_flamegraph(stacks, title), mimetype="image/svg+xml")
+
+
+@profiler_bp.get("/allocations")
+def asignaciones():
+    """
+    Top de memoria asignada viva según tracemalloc.
+      - Query: top: int (default 20), group: 'lineno'|'filename'|'traceback', diff: '1' (desde start/reset)
+    ->
+      - JSON {traced_kib, peak_kib, stats} o 409 si tracemalloc no está activo.
+    """
+    top = max(1, min(request.args.get("top", default=20, type=int), 200))
+    group = request.args.get("group", "lineno")
+    if group not in ("lineno", "filename", "traceback"):
+        return jsonify({"error": "group debe ser lineno, filename o traceback"}), 400
+    try:
+        return jsonify(_allocations().report(top, group, request.args.get("diff") == "1"))
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+
+
+def init_profiler(app: Flask) -> None:
+    """
+    Crea el profiler del proceso, engancha el registro de endpoints en curso y las rutas de admin
+    (PROFILER_* de Config). Si PROFILER_ENABLED, muestrea desde el primer request de cada worker.
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    cfg = app.config
+    prof = SamplingProfiler(cfg["PROFILER_INTERVAL"], cfg["PROFILER_MAX_DEPTH"], cfg["PROFILER_MAX_STACKS"])
+    allocs = AllocationTracker(cfg["PROFILER_TRACEMALLOC_FRAMES"])
+    app.extensions["profiler"] = prof
+    app.extensions["allocations"] = allocs
+    app.register_blueprint(profiler_bp)
+
+    @app.before_request
+    def _profiler_enter() -> None:
+        if cfg["PROFILER_ENABLED"] and prof._pid != os.getpid():
+            # por PID: el thread de muestreo no sobrevive al fork de gunicorn
+            prof.start()
+        if request.endpoint:
+            prof.enter(request.endpoint)
+
+    @app.teardown_request
+    def _profiler_exit(_exc) -> None:
+        prof.exit()
+
+    metrics.register_gauge("profiler.samples", lambda: prof.samples)
+
+
+def init_async_profiler(app: "Quart", prof: SamplingProfiler) -> None:
+    """
+    Engancha las lecturas async (asgi.py) al profiler de la app Flask del mismo proceso: las rutas
+    /admin/profiler/* (atendidas por Flask) muestran también sus endpoints ('async_api.*').
+      - app: Quart — Aplicación async.
+      - prof: SamplingProfiler — Profiler creado por init_profiler.
+    ->
+      - None
+    """
+    from quart import request as quart_request
+
+    cfg = app.config
+
+    @app.before_request
+    async def _profiler_enter() -> None:
+        if cfg["PROFILER_ENABLED"] and prof._pid != os.getpid():
+            prof.start()
+        if quart_request.endpoint:
+            prof.enter_task(quart_request.endpoint)
+
+    @app.teardown_request
+    async def _profiler_exit(_exc) -> None:
+        prof.exit_task()
@@ -0,0 +1,120 @@
+import csv
+import math
+import os
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask
+
+# Búsqueda "cerca de una comuna": coordenadas por comuna (bdd/comuna-coordenadas.csv, centroide del
+# polígono de la División Político-Administrativa 2023 de IDE Chile; la columna cut es el código oficial)
+# y, por cada comuna, la lista de las demás ordenada por distancia (acotada a NEAR_MAX_RADIUS_KM).
+# Un radio se resuelve con bisect en esa lista y el listado filtra por comuna_id IN (...) (índice de
+# aviso_adopcion.comuna_id). Una comuna sin fila en el archivo sólo se encuentra a sí misma.
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_COORDS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bdd", "comuna-coordenadas.csv"
+)
+
+Coords = Tuple[float, float]
+
+
+def haversine_km(a: Coords, b: Coords) -> float:
+    """
+    Distancia de círculo máximo entre dos puntos.
+      - a, b: (lat, lon) en grados.
+    ->
+      - float — Kilómetros.
+    """
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def load_coords(path: str) -> Dict[int, Coords]:
+    """
+    Lee el CSV de coordenadas (columnas comuna_id, lat, lon; las demás se ignoran).
+      - path: str
+    ->
+      - dict — {comuna_id: (lat, lon)}. Lanza OSError / ValueError si el archivo no se puede leer.
+    """
+    coords: Dict[int, Coords] = {}
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            coords[int(row["comuna_id"])] = (float(row["lat"]), float(row["lon"]))
+    return coords
+
+
+class ProximityIndex:
+    """
+    Vecinas de cada comuna ordenadas por distancia (precalculadas al construir).
+      - coords: dict — {comuna_id: (lat, lon)}.
+      - max_radius_km: float — Sólo se guardan vecinas hasta esta distancia.
+    """
+
+    def __init__(self, coords: Dict[int, Coords], max_radius_km: float) -> None:
+        self.max_radius_km = max_radius_km
+        # por comuna: distancias ascendentes y los ids en el mismo orden (la propia comuna primero, a 0 km)
+        self._dists: Dict[int, List[float]] = {}
+        self._ids: Dict[int, List[int]] = {}
+        items = list(coords.items())
+        for cid, point in items:
+            near = [(0.0, cid)]
+            for other, p in items:
+                if other != cid:
+                    d = haversine_km(point, p)
+                    if d <= max_radius_km:
+                        near.append((d, other))
+            near.sort()
+            self._dists[cid] = [d for d, _ in near]
+            self._ids[cid] = [other for _, other in near]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def within(self, comuna_id: int, radius_km: float) -> List[Tuple[int, float]]:
+        """
+        Comunas a lo más a `radius_km` de `comuna_id`, de la más cercana a la más lejana.
+          - comuna_id: int
+          - radius_km: float — Se acota a max_radius_km.
+        ->
+          - list — [(comuna_id, distancia_km), ...]; [(comuna_id, 0.0)] si no tiene coordenadas.
+        """
+        dists = self._dists.get(comuna_id)
+        if dists is None:
+            return [(comuna_id, 0.0)]
+        n = bisect_right(dists, min(radius_km, self.max_radius_km))
+        return list(zip(self._ids[comuna_id][:n], dists[:n]))
+
+
+_index: Optional[ProximityIndex] = None
+
+
+def get_proximity_index() -> ProximityIndex:
+    """
+    Índice del proceso (creado por init_proximity).
+      - (None)
+    ->
+      - ProximityIndex
+    """
+    return _index
+
+
+def init_proximity(app: Flask) -> None:
+    """
+    Carga las coordenadas (COMUNA_COORDS_PATH) y construye el índice de vecinas.
+    Si el archivo falta, el índice queda vacío (cada comuna sólo se encuentra a sí misma).
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    global _index
+    path = app.config["COMUNA_COORDS_PATH"] or DEFAULT_COORDS_PATH
+    try:
+        coords = load_coords(path)
+    except (OSError, ValueError, KeyError):
+        app.logger.warning("No se pudieron leer coordenadas de comunas (%s); búsqueda cercana sin vecinas.", path)
+        coords = {}
+    _index = ProximityIndex(coords, app.config["NEAR_MAX_RADIUS_KM"])
@@ -0,0 +1,775 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from datetime import datetime, timedelta, date
+
+from sqlalchemy import bindparam, case, select, func, Integer, Select
+from sqlalchemy.orm import joinedload, load_only, Session
+
+from .cache import cached
+from .db import get_session
+from .models import (
+    AvisoAdopcion, AvisoAdopcionArchivo, AvisoProyeccion, AvisoVistas, Comuna, Region, Comentario, ComentarioArchivo,
+)
+from .proximity import get_proximity_index
+from .serializers import AVISO_FIELDS, CARD_FIELDS, project, serialize_row, serialize_comentario, to_json
+
+# Statements compartidos por los handlers WSGI (api.py) y ASGI (asgi.py).
+# Sólo construyen el SELECT; cada capa lo ejecuta con su propia sesión. Al final, las páginas
+# cacheadas (cached_*) que ambas capas sirven por igual.
+
+# Columnas del aviso que necesita cada campo serializado (ver serializers.AVISO_FIELDS).
+# id siempre se carga; region/comuna salen de los joins; fotos/contactar_por de las relaciones.
+FIELD_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "sector": ("sector",),
+    "contacto_nombre": ("nombre",),
+    "contacto_email": ("email",),
+    "contacto_celular": ("celular",),
+    "tipo": ("tipo",),
+    "cantidad": ("cantidad",),
+    "edad": ("edad",),
+    "edad_unidad": ("unidad_medida",),
+    "fecha_disponible": ("fecha_entrega",),
+    "creado_en": ("fecha_ingreso",),
+    "descripcion": ("descripcion",),
+}
+
+# Presets de ?view= (None = aviso completo)
+VIEWS: Dict[str, Optional[FrozenSet[str]]] = {
+    "full": None,
+    "card": CARD_FIELDS,
+}
+
+
+def aviso_load_options(model, fields: Optional[FrozenSet[str]]) -> List[Any]:
+    """
+    Opciones de carga para un SELECT (Aviso, Comuna, Región) según los campos pedidos.
+    Sin `fields` se cargan todas las columnas más fotos y contactos (joinedload); con `fields`
+    sólo las columnas necesarias, y fotos/contactos únicamente si se piden.
+      - model: AvisoAdopcion | AvisoAdopcionArchivo
+      - fields: frozenset[str] | None — Campos a serializar (None = todos).
+    ->
+      - list — Opciones para Select.options().
+    """
+    if fields is None:
+        return [joinedload(model.fotos), joinedload(model.contactos)]
+
+    cols = [getattr(model, c) for f in sorted(fields) for c in FIELD_COLUMNS.get(f, ())]
+    opts: List[Any] = [
+        load_only(*cols) if cols else load_only(model.id),
+        load_only(Comuna.nombre) if "comuna" in fields else load_only(Comuna.id),
+        load_only(Region.nombre) if "region" in fields else load_only(Region.id),
+    ]
+    if "fotos" in fields:
+        opts.append(joinedload(model.fotos))
+    if "contactar_por" in fields:
+        opts.append(joinedload(model.contactos))
+    return opts
+
+
+def count_avisos_stmt() -> Select:
+    """
+    SELECT COUNT(*) sobre aviso_adopcion.
+      - (None)
+    ->
+      - Select — Statement escalar.
+    """
+    return select(func.count(AvisoAdopcion.id))
+
+
+def avisos_stmt(fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    SELECT (Aviso, Comuna, Región) con fotos y contactos, más recientes primero.
+      - fields: frozenset[str] | None — Campos pedidos (poda columnas y relaciones, ver aviso_load_options).
+    ->
+      - Select — Statement base para listado/últimos (sin limit/offset).
+    """
+    return (
+        select(AvisoAdopcion, Comuna, Region)
+        .join(Comuna, Comuna.id == AvisoAdopcion.comuna_id)
+        .join(Region, Region.id == Comuna.region_id)
+        .options(*aviso_load_options(AvisoAdopcion, fields))
+        .order_by(AvisoAdopcion.fecha_ingreso.desc(), AvisoAdopcion.id.desc())
+    )
+
+
+def archived_aviso_stmt(aviso_id: int, fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    SELECT (AvisoArchivado, Comuna, Región) de un aviso archivado por ID.
+      - aviso_id: int | BindParameter — Identificador del aviso.
+      - fields: frozenset[str] | None — Campos pedidos (None = todos).
+    ->
+      - Select — Statement con fotos y contactos archivados precargados.
+    """
+    return (
+        select(AvisoAdopcionArchivo, Comuna, Region)
+        .join(Comuna, Comuna.id == AvisoAdopcionArchivo.comuna_id)
+        .join(Region, Region.id == Comuna.region_id)
+        .options(*aviso_load_options(AvisoAdopcionArchivo, fields))
+        .where(AvisoAdopcionArchivo.id == aviso_id)  # type: ignore[arg-type]
+    )
+
+
+def aviso_exists_stmt(aviso_id: int, archived: bool = False) -> Select:
+    """
+    SELECT COUNT(*) de un aviso por ID (0 ó 1).
+      - aviso_id: int | BindParameter — Identificador del aviso.
+      - archived: bool — Buscar en aviso_adopcion_archivo en vez de la tabla vigente.
+    ->
+      - Select — Statement escalar.
+    """
+    model = AvisoAdopcionArchivo if archived else AvisoAdopcion
+    return select(func.count(model.id)).where(model.id == aviso_id)
+
+
+def popular_candidates_stmt() -> Select:
+    """
+    SELECT (id, fecha_ingreso, vistas, comentarios) de los avisos vigentes, para puntuar el ranking.
+    Los comentarios salen del contador de aviso_proyeccion (sin agrupar la tabla comentario).
+      - (None)
+    ->
+      - Select — Una fila por aviso (vistas en 0 si no tiene).
+    """
+    return (
+        select(
+            AvisoProyeccion.aviso_id.label("id"),
+            AvisoProyeccion.fecha_ingreso,
+            func.coalesce(AvisoVistas.vistas, 0).label("vistas"),
+            AvisoProyeccion.n_comentarios.label("comentarios"),
+        )
+        .outerjoin(AvisoVistas, AvisoVistas.aviso_id == AvisoProyeccion.aviso_id)
+    )
+
+
+def regiones_stmt() -> Select:
+    """
+    SELECT (id, nombre) de regiones ordenadas alfabéticamente.
+      - (None)
+    ->
+      - Select
+    """
+    return select(Region.id, Region.nombre).order_by(Region.nombre.asc())
+
+
+def count_comentarios_stmt(aviso_id: int, archived: bool = False) -> Select:
+    """
+    SELECT COUNT(*) de comentarios de un aviso.
+      - aviso_id: int | BindParameter — Identificador del aviso.
+      - archived: bool — Contar en comentario_archivo (aviso archivado).
+    ->
+      - Select — Statement escalar.
+    """
+    model = ComentarioArchivo if archived else Comentario
+    return select(func.count(model.id)).where(model.aviso_id == aviso_id)
+
+
+def comentarios_stmt(aviso_id: int, order: str, offset: int, limit: int, archived: bool = False) -> Select:
+    """
+    SELECT de comentarios de un aviso, paginados.
+      - aviso_id: int | BindParameter — Identificador del aviso.
+      - order: str — 'asc' | 'desc' (por fecha, id).
+      - offset: int | BindParameter — Desplazamiento (>= 0).
+      - limit: int | BindParameter — Máximo de filas.
+      - archived: bool — Leer de comentario_archivo (aviso archivado).
+    ->
+      - Select
+    """
+    model = ComentarioArchivo if archived else Comentario
+    q = select(model).where(model.aviso_id == aviso_id)
+    if order == "asc":
+        q = q.order_by(model.fecha.asc(), model.id.asc())
+    else:
+        q = q.order_by(model.fecha.desc(), model.id.desc())
+    return q.offset(offset).limit(limit)
+
+
+# --- Statements precompilados ---
+# Las consultas calientes se construyen una sola vez (por combinación de campos / orden) con
+# parámetros ligados (aviso_id, limit, offset). Al reutilizar el mismo objeto, SQLAlchemy no
+# reconstruye el SELECT ni recalcula su clave de cache y toma el SQL ya compilado del engine:
+# cada request sólo liga valores. Se ejecutan con s.execute(stmt, {"aviso_id": ..., ...}).
+
+def _limit_offset() -> Tuple[Any, Any]:
+    return bindparam("limit", type_=Integer), bindparam("offset", type_=Integer)
+
+
+@lru_cache(maxsize=64)
+def hot_archived_aviso(fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    Aviso archivado por ID. Parámetro: aviso_id.
+      - fields: frozenset[str] | None — Campos pedidos.
+    ->
+      - Select
+    """
+    return archived_aviso_stmt(bindparam("aviso_id", type_=Integer), fields)
+
+
+@lru_cache(maxsize=None)
+def hot_avisos_by_ids() -> Select:
+    """
+    Avisos vigentes completos por lista de IDs (orden por fecha, no el de la lista). Parámetro: ids.
+      - (None)
+    ->
+      - Select
+    """
+    return avisos_stmt().where(AvisoAdopcion.id.in_(bindparam("ids", expanding=True)))
+
+
+def _comuna_params(n: int) -> List[Any]:
+    return [bindparam(f"c{i}", type_=Integer) for i in range(n)]
+
+
+@lru_cache(maxsize=None)
+def hot_count_avisos_near(n: int) -> Select:
+    """
+    COUNT(*) de avisos en n comunas. Parámetros: c0..c{n-1} (ver near_params).
+      - n: int — Cantidad de comunas.
+    ->
+      - Select
+    """
+    return count_avisos_stmt().where(AvisoAdopcion.comuna_id.in_(_comuna_params(n)))
+
+
+@lru_cache(maxsize=256)
+def hot_near_avisos_page(n: int, fields: Optional[FrozenSet[str]] = None) -> Select:
+    """
+    Página de avisos en n comunas, primero las más cercanas (orden de c0..c{n-1}) y dentro de cada
+    una los más recientes. Parámetros: c0..c{n-1}, limit, offset. Un statement por n (no por lista).
+      - n: int — Cantidad de comunas.
+      - fields: frozenset[str] | None — Campos pedidos (ver aviso_load_options).
+    ->
+      - Select
+    """
+    comunas = _comuna_params(n)
+    rank = case(*[(AvisoAdopcion.comuna_id == c, i) for i, c in enumerate(comunas)], else_=n)
+    limit, offset = _limit_offset()
+    return (
+        avisos_stmt(fields)
+        .where(AvisoAdopcion.comuna_id.in_(comunas))
+        .order_by(None)
+        .order_by(rank, AvisoAdopcion.fecha_ingreso.desc(), AvisoAdopcion.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+@lru_cache(maxsize=None)
+def hot_aviso_exists(archived: bool = False) -> Select:
+    """
+    COUNT(*) de un aviso por ID (0 ó 1). Parámetro: aviso_id.
+      - archived: bool — En el archivo en vez de la tabla vigente.
+    ->
+      - Select
+    """
+    return aviso_exists_stmt(bindparam("aviso_id", type_=Integer), archived)
+
+
+@lru_cache(maxsize=None)
+def hot_count_comentarios(archived: bool = False) -> Select:
+    """
+    COUNT(*) de comentarios de un aviso. Parámetro: aviso_id.
+      - archived: bool — En comentario_archivo.
+    ->
+      - Select
+    """
+    return count_comentarios_stmt(bindparam("aviso_id", type_=Integer), archived)
+
+
+@lru_cache(maxsize=None)
+def hot_comentarios(order: str, archived: bool = False) -> Select:
+    """
+    Comentarios paginados de un aviso. Parámetros: aviso_id, limit, offset.
+      - order: str — 'asc' | 'desc'.
+      - archived: bool — De comentario_archivo.
+    ->
+      - Select
+    """
+    limit, offset = _limit_offset()
+    return comentarios_stmt(bindparam("aviso_id", type_=Integer), order, offset, limit, archived)
+
+
+# --- Proyección de lectura (aviso_proyeccion, ver readmodel.py) ---
+# Listado, últimos y detalle leen el JSON ya serializado: una columna de una tabla indexada, sin
+# joins ni hidratación ORM. La vista card tiene su propia columna; otros `fields` se podan desde el
+# JSON completo (json.loads + project), lo que sigue sin tocar el ORM.
+
+def projection_source(fields: Optional[FrozenSet[str]]) -> Tuple[str, bool]:
+    """
+    Columna de aviso_proyeccion de la que se sirven los campos pedidos.
+      - fields: frozenset[str] | None — Campos pedidos (None = todos).
+    ->
+      - (columna, podar) — 'completo' | 'tarjeta', y si hay que podar el JSON guardado.
+    """
+    if fields is None:
+        return "completo", False
+    if fields <= CARD_FIELDS:
+        return "tarjeta", fields != CARD_FIELDS
+    return "completo", True
+
+
+def projected_json(raw: str, fields: Optional[FrozenSet[str]], prune: bool) -> str:
+    """
+    JSON guardado, podado a `fields` si hace falta.
+      - raw: str — Columna completo/tarjeta.
+      - fields: frozenset[str] | None
+      - prune: bool — Ver projection_source.
+    ->
+      - str
+    """
+    return to_json(project(json.loads(raw), fields)) if prune else raw
+
+
+def page_json(items: List[str], total_items: int, page: int, size: int) -> str:
+    """
+    Cuerpo de una página del listado armado con los JSON guardados (sin decodificarlos).
+    Las claves van en orden alfabético, igual que jsonify.
+      - items: list[str] — JSON de cada aviso.
+      - total_items, page, size: int
+    ->
+      - str — {"data": [...], "page", "size", "total_items", "total_pages"}.
+    """
+    total_pages = (total_items + size - 1) // size if size else 0
+    return (
+        '{"data":[' + ",".join(items) + f'],"page":{page},"size":{size},'
+        f'"total_items":{total_items},"total_pages":{total_pages}}}'
+    )
+
+
+@lru_cache(maxsize=None)
+def hot_count_proyeccion() -> Select:
+    """
+    COUNT(*) de avisos vigentes en la proyección (sin parámetros).
+      - (None)
+    ->
+      - Select
+    """
+    return select(func.count()).select_from(AvisoProyeccion)
+
+
+@lru_cache(maxsize=None)
+def hot_proyeccion_page(column: str) -> Select:
+    """
+    JSON guardados de una página, más recientes primero. Parámetros: limit, offset.
+      - column: str — 'completo' | 'tarjeta'.
+    ->
+      - Select
+    """
+    limit, offset = _limit_offset()
+    return (
+        select(getattr(AvisoProyeccion, column))
+        .order_by(AvisoProyeccion.fecha_ingreso.desc(), AvisoProyeccion.aviso_id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+@lru_cache(maxsize=None)
+def hot_proyeccion(column: str) -> Select:
+    """
+    JSON guardado de un aviso vigente. Parámetro: aviso_id.
+      - column: str — 'completo' | 'tarjeta'.
+    ->
+      - Select
+    """
+    return select(getattr(AvisoProyeccion, column)).where(
+        AvisoProyeccion.aviso_id == bindparam("aviso_id", type_=Integer)
+    )
+
+
+@lru_cache(maxsize=None)
+def hot_proyeccion_by_ids() -> Select:
+    """
+    (aviso_id, completo) de los avisos vigentes de una lista de IDs. Parámetro: ids.
+      - (None)
+    ->
+      - Select
+    """
+    return select(AvisoProyeccion.aviso_id, AvisoProyeccion.completo).where(
+        AvisoProyeccion.aviso_id.in_(bindparam("ids", expanding=True))
+    )
+
+
+def warm_up_statements(s: Session) -> int:
+    """
+    Ejecuta una vez cada statement caliente (con ids inexistentes) para dejar su SQL en el cache
+    de compilación del engine. Llamado al arrancar (prefork.preload): los workers lo heredan.
+      - s: Session — Sesión abierta.
+    ->
+      - int — Statements ejecutados.
+    """
+    n = 0
+    for fields in (None, CARD_FIELDS):
+        s.execute(hot_archived_aviso(fields), {"aviso_id": 0}).unique().all()
+        n += 1
+    for column in ("completo", "tarjeta"):
+        s.scalars(hot_proyeccion_page(column), {"limit": 1, "offset": 0}).all()
+        s.scalar(hot_proyeccion(column), {"aviso_id": 0})
+        n += 2
+    s.scalar(hot_count_proyeccion())
+    s.scalar(hot_count_avisos_near(1), {"c0": 0})
+    s.execute(hot_near_avisos_page(1), {"c0": 0, "limit": 1, "offset": 0}).unique().all()
+    n += 3
+    for archived in (False, True):
+        s.scalar(hot_aviso_exists(archived), {"aviso_id": 0})
+        s.scalar(hot_count_comentarios(archived), {"aviso_id": 0})
+        n += 2
+        for order in ("asc", "desc"):
+            s.execute(hot_comentarios(order, archived), {"aviso_id": 0, "limit": 1, "offset": 0}).all()
+            n += 1
+    return n
+
+
+# --- Consultas completas (sesión síncrona) ---
+# Usadas por la API y por las páginas (datos iniciales embebidos), con el mismo serializador.
+
+def avisos_page_json(s: Session, page: int, size: int, fields: Optional[FrozenSet[str]] = None) -> str:
+    """
+    Página del listado de avisos como JSON, armada desde aviso_proyeccion.
+      - s: Session — Sesión abierta.
+      - page: int — Página (>= 1).
+      - size: int — Tamaño de página.
+      - fields: frozenset[str] | None — Campos de cada aviso (None = todos).
+    ->
+      - str — {data, page, size, total_items, total_pages}.
+    """
+    column, prune = projection_source(fields)
+    total_items = s.scalar(hot_count_proyeccion()) or 0
+    raws = s.scalars(hot_proyeccion_page(column), {"limit": size, "offset": (page - 1) * size}).all()
+    return page_json([projected_json(r, fields, prune) for r in raws], total_items, page, size)
+
+
+def avisos_page(s: Session, page: int, size: int, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Página del listado de avisos (para los datos embebidos de las páginas).
+      - s, page, size, fields: ver avisos_page_json.
+    ->
+      - dict — {data, page, size, total_items, total_pages}.
+    """
+    return json.loads(avisos_page_json(s, page, size, fields))
+
+
+def near_params(near: List[Tuple[int, float]]) -> Dict[str, int]:
+    """
+    Parámetros c0..c{n-1} de hot_*_near a partir de las comunas ordenadas por distancia.
+      - near: list — [(comuna_id, distancia_km), ...] (ver proximity.ProximityIndex.within).
+    ->
+      - dict
+    """
+    return {f"c{i}": cid for i, (cid, _) in enumerate(near)}
+
+
+def near_payload(rows, near: List[Tuple[int, float]], total_items: int, page: int, size: int,
+                 fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Arma la página de avisos cercanos: cada aviso lleva distancia_km (la de su comuna).
+      - rows: Iterable[(Aviso, Comuna, Región)] — Resultado de hot_near_avisos_page.
+      - near: list — [(comuna_id, distancia_km), ...].
+      - total_items, page, size: int
+      - fields: frozenset[str] | None — Campos de cada aviso.
+    ->
+      - dict — {data, page, size, total_items, total_pages, comunas: [{id, distancia_km}]}.
+    """
+    dist = dict(near)
+    data = []
+    for r in rows:
+        item = serialize_row(r, fields)
+        item["distancia_km"] = round(dist.get(r[1].id, 0.0), 1)
+        data.append(item)
+    return {
+        "data": data,
+        "page": page,
+        "size": size,
+        "total_items": total_items,
+        "total_pages": (total_items + size - 1) // size if size else 0,
+        "comunas": [{"id": cid, "distancia_km": round(d, 1)} for cid, d in near],
+    }
+
+
+def near_avisos_page(s: Session, near: List[Tuple[int, float]], page: int, size: int,
+                     fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Página del listado restringido a comunas cercanas (comuna_id IN (...)), por distancia y recencia.
+      - s: Session — Sesión abierta.
+      - near: list — [(comuna_id, distancia_km), ...] de la más cercana a la más lejana.
+      - page: int — Página (>= 1).
+      - size: int — Tamaño de página.
+      - fields: frozenset[str] | None — Campos de cada aviso (None = todos).
+    ->
+      - dict — Ver near_payload.
+    """
+    params = near_params(near)
+    total_items = s.scalar(hot_count_avisos_near(len(near)), params) or 0
+    rows = s.execute(
+        hot_near_avisos_page(len(near), fields),
+        {**params, "limit": size, "offset": (page - 1) * size},
+    ).unique().all()
+    return near_payload(rows, near, total_items, page, size, fields)
+
+
+def latest_avisos(s: Session, limit: int, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Últimos `limit` avisos por fecha_ingreso desc (desde aviso_proyeccion).
+      - s: Session — Sesión abierta.
+      - limit: int — Cantidad.
+      - fields: frozenset[str] | None — Campos de cada aviso (None = todos).
+    ->
+      - dict — {"data": [...]}.
+    """
+    column, _ = projection_source(fields)
+    raws = s.scalars(hot_proyeccion_page(column), {"limit": limit, "offset": 0}).all()
+    return {"data": [project(json.loads(r), fields) for r in raws]}
+
+
+def aviso_detail_json(s: Session, aviso_id: int,
+                      fields: Optional[FrozenSet[str]] = None) -> Optional[Tuple[str, bool]]:
+    """
+    Aviso por ID como JSON: el guardado en aviso_proyeccion o, si ya fue archivado, el del archivo
+    (con "archivado": true, serializado desde el ORM).
+      - s: Session — Sesión abierta.
+      - aviso_id: int — Identificador del aviso.
+      - fields: frozenset[str] | None — Campos a incluir (None = todos).
+    ->
+      - (json, archivado) | None — None si no existe.
+    """
+    column, prune = projection_source(fields)
+    raw = s.scalar(hot_proyeccion(column), {"aviso_id": aviso_id})
+    if raw is not None:
+        return projected_json(raw, fields, prune), False
+    row = s.execute(hot_archived_aviso(fields), {"aviso_id": aviso_id}).unique().first()
+    if row:
+        return to_json({**serialize_row(row, fields), "archivado": True}), True
+    return None
+
+
+def aviso_detail(s: Session, aviso_id: int, fields: Optional[FrozenSet[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Aviso serializado por ID (para las páginas); ver aviso_detail_json.
+      - s: Session — Sesión abierta.
+      - aviso_id: int — Identificador del aviso.
+      - fields: frozenset[str] | None — Campos a incluir (None = todos).
+    ->
+      - dict | None — None si no existe.
+    """
+    found = aviso_detail_json(s, aviso_id, fields)
+    return json.loads(found[0]) if found else None
+
+
+def aviso_archived(s: Session, aviso_id: int) -> Optional[bool]:
+    """
+    Dónde está un aviso: vigente, archivado o en ninguna parte.
+      - s: Session — Sesión abierta.
+      - aviso_id: int — Identificador del aviso.
+    ->
+      - bool | None — False si está vigente, True si está archivado, None si no existe.
+    """
+    if s.scalar(hot_aviso_exists(), {"aviso_id": aviso_id}):
+        return False
+    if s.scalar(hot_aviso_exists(True), {"aviso_id": aviso_id}):
+        return True
+    return None
+
+
+def comentarios_page(s: Session, aviso_id: int, offset: int, limit: int, order: str,
+                     archived: bool = False) -> Dict[str, Any]:
+    """
+    Comentarios paginados de un aviso (no verifica que el aviso exista).
+      - s: Session — Sesión abierta.
+      - aviso_id: int — Identificador del aviso.
+      - offset: int — Desplazamiento.
+      - limit: int — Máximo de items.
+      - order: str — 'asc' | 'desc'.
+      - archived: bool — El aviso está archivado (comentarios de comentario_archivo).
+    ->
+      - dict — {items, total, offset, limit, order}.
+    """
+    total = s.scalar(hot_count_comentarios(archived), {"aviso_id": aviso_id}) or 0
+    params = {"aviso_id": aviso_id, "limit": limit, "offset": offset}
+    rows = s.execute(hot_comentarios(order, archived), params).scalars().all()
+    return {
+        "items": [serialize_comentario(c) for c in rows],
+        "total": int(total),
+        "offset": offset,
+        "limit": limit,
+        "order": order,
+    }
+
+
+# --- Parámetros de consulta ---
+
+def parse_pagination(args) -> Tuple[int, int]:
+    """
+    Lee page/size del query string y los acota.
+      - args: MultiDict — request.args.
+    ->
+      - (page, size) — page >= 1, size [1..50] (default 5). Lanza ValueError si no son enteros.
+    """
+    page = int(args.get("page", "1"))
+    size = int(args.get("size", "5"))
+    if page < 1:
+        page = 1
+    if size < 1 or size > 50:
+        size = 5
+    return page, size
+
+
+def parse_latest_limit(args) -> int:
+    """
+    Lee 'limit' para últimos avisos y lo acota a [1..10].
+      - args: MultiDict — request.args.
+    ->
+      - int — Límite (default 5). Lanza ValueError si no es entero.
+    """
+    limit = int(args.get("limit", "5"))
+    if limit < 1:
+        limit = 1
+    if limit > 10:
+        limit = 10
+    return limit
+
+
+def parse_fields(args) -> Optional[FrozenSet[str]]:
+    """
+    Lee 'view' (preset: full | card) y/o 'fields' (lista separada por comas) del query string.
+    Si vienen ambos se unen; 'id' siempre se incluye.
+      - args: MultiDict — request.args.
+    ->
+      - frozenset[str] | None — Campos pedidos o None (aviso completo). Lanza ValueError si hay
+                                una vista o campo desconocido.
+    """
+    view = (args.get("view") or "").strip().lower()
+    raw = (args.get("fields") or "").strip()
+    if view and view not in VIEWS:
+        raise ValueError(f"Vista desconocida: {view}. Opciones: {', '.join(VIEWS)}.")
+    base = VIEWS.get(view)
+    if not raw:
+        return base
+
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = sorted(fields - AVISO_FIELDS.keys())
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}.")
+    if view == "full":
+        return None
+    return frozenset(fields | (base or set()) | {"id"})
+
+
+def parse_list_order(args) -> str:
+    """
+    Lee 'order' del listado de avisos.
+      - args: MultiDict — request.args.
+    ->
+      - str — 'recent' (default) | 'popular'. Lanza ValueError si es otro valor.
+    """
+    order = (args.get("order") or "recent").strip().lower()
+    if order not in ("recent", "popular"):
+        raise ValueError(f"Orden desconocido: {order}. Opciones: recent, popular.")
+    return order
+
+
+def parse_near(args, default_radius_km: float, max_radius_km: float) -> Optional[Tuple[int, float]]:
+    """
+    Lee 'near_comuna_id' y 'radius_km' (búsqueda de avisos en comunas cercanas).
+      - args: MultiDict — request.args.
+      - default_radius_km: float — Radio si no viene radius_km.
+      - max_radius_km: float — Radio máximo aceptado.
+    ->
+      - (comuna_id, radius_km) | None — None si no se pidió. Lanza ValueError si son inválidos.
+    """
+    raw = (args.get("near_comuna_id") or "").strip()
+    raw_radius = (args.get("radius_km") or "").strip()
+    if not raw:
+        if raw_radius:
+            raise ValueError("radius_km requiere near_comuna_id.")
+        return None
+    try:
+        comuna_id = int(raw)
+        radius = float(raw_radius) if raw_radius else float(default_radius_km)
+    except ValueError:
+        raise ValueError("near_comuna_id debe ser entero y radius_km numérico.")
+    if not (0 <= radius <= max_radius_km):
+        raise ValueError(f"radius_km debe estar entre 0 y {max_radius_km:g}.")
+    return comuna_id, radius
+
+
+def parse_comment_window(args) -> Tuple[int, int, str]:
+    """
+    Lee offset/limit/order del listado de comentarios (valores inválidos → default).
+      - args: MultiDict — request.args.
+    ->
+      - (offset, limit, order) — offset >= 0, limit [1..100], order 'asc'|'desc'.
+    """
+    try:
+        offset = max(int(args.get("offset", "0")), 0)
+    except ValueError:
+        offset = 0
+    try:
+        limit = int(args.get("limit", "20"))
+        limit = max(1, min(limit, 100))
+    except ValueError:
+        limit = 20
+    order = (args.get("order") or "desc").lower()
+    order = "asc" if order == "asc" else "desc"
+    return offset, limit, order
+
+
+def parse_date_range(args) -> Tuple[date, date]:
+    """
+    Lee from/to (YYYY-MM-DD); por defecto los últimos 30 días hasta hoy.
+      - args: MultiDict — request.args.
+    ->
+      - (from_d, to_d) — Rango ordenado. Lanza ValueError si el formato es inválido.
+    """
+    to_s = args.get("to")
+    from_s = args.get("from")
+    today = date.today()
+    to_d = datetime.strptime(to_s, "%Y-%m-%d").date() if to_s else today
+    from_d = datetime.strptime(from_s, "%Y-%m-%d").date() if from_s else (to_d - timedelta(days=30))
+    if from_d > to_d:
+        from_d, to_d = to_d, from_d
+    return from_d, to_d
+
+
+def parse_year(args) -> int:
+    """
+    Lee 'year' (YYYY); por defecto el año actual.
+      - args: MultiDict — request.args.
+    ->
+      - int — Año en [1..9998]. Lanza ValueError si no es entero o está fuera de rango.
+    """
+    year = int(args.get("year")) if args.get("year") else datetime.now().year
+    # monthly_stmt filtra por [1 ene year, 1 ene year + 1): datetime sólo llega al año 9999
+    if not 1 <= year <= 9998:
+        raise ValueError("year")
+    return year
+
+
+# --- Páginas cacheadas (cache compartido entre workers, ver cache.py) ---
+# Las usan api.py y asgi.py (en un thread), así una URL tiene el mismo cache e invalidación sea
+# cual sea la app que la atiende. Se invalidan por namespace (bus.publish) desde crear_aviso
+# ("avisos", "stats", "comentarios") y crear_comentario ("comentarios"), en este nodo y en los demás.
+
+@cached("avisos")
+def cached_avisos_page_json(page: int, size: int, fields: Optional[List[str]] = None) -> str:
+    # fields llega como lista ordenada (parte de la clave del cache); se cachea el cuerpo ya armado
+    with get_session() as s:
+        return avisos_page_json(s, page, size, frozenset(fields) if fields is not None else None)
+
+
+@cached("avisos")
+def cached_near_avisos_page(comuna_id: int, radius_km: float, page: int, size: int,
+                            fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    near = get_proximity_index().within(comuna_id, radius_km)
+    with get_session() as s:
+        payload = near_avisos_page(s, near, page, size, frozenset(fields) if fields is not None else None)
+    payload["near_comuna_id"], payload["radius_km"] = comuna_id, radius_km
+    return payload
+
+
+@cached("comentarios")
+def cached_comentarios_page(aviso_id: int, offset: int, limit: int, order: str) -> Optional[Dict[str, Any]]:
+    with get_session() as s:
+        archived = aviso_archived(s, aviso_id)
+        if archived is None:
+            return None
+        # un aviso archivado conserva sus comentarios en comentario_archivo (ver archive.py)
+        return comentarios_page(s, aviso_id, offset, limit, order, archived)
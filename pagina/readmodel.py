@@ -0,0 +1,138 @@
+from typing import Any, Dict, List
+
+import click
+from flask import Flask
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .bus import publish
+from .db import get_session
+from .feed import get_feed
+from .models import AvisoAdopcion, AvisoProyeccion, Comentario
+from .queries import hot_avisos_by_ids
+from .serializers import CARD_FIELDS, project, serialize_row, to_json
+
+# Proyección de lectura (tabla aviso_proyeccion): por aviso vigente, el JSON listo para enviar
+# (completo y vista card) más fecha_ingreso / comuna_id / tipo / n_comentarios para ordenar y filtrar.
+# Las escrituras la mantienen en su misma transacción: crear_aviso (refresh_projection),
+# crear_comentario (bump_comentarios) y el archivado (delete_projection). `flask reconstruir-proyeccion`
+# la rehace desde las tablas normalizadas (después de crear la tabla o de un cambio en el serializador).
+
+
+def projection_rows(s: Session, ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Filas de aviso_proyeccion para los avisos vigentes de `ids` (los que no existen se omiten).
+      - s: Session — Sesión abierta.
+      - ids: List[int] — IDs de avisos.
+    ->
+      - list[dict] — Valores para INSERT.
+    """
+    # populate_existing: el aviso recién creado ya está en la sesión con fotos/contactos sin cargar
+    rows = s.execute(hot_avisos_by_ids(), {"ids": ids},
+                     execution_options={"populate_existing": True}).unique().all()
+    n_comentarios = dict(s.execute(
+        select(Comentario.aviso_id, func.count(Comentario.id))
+        .where(Comentario.aviso_id.in_(ids))
+        .group_by(Comentario.aviso_id)
+    ).all())
+    out = []
+    for row in rows:
+        aviso = row[0]
+        item = serialize_row(row)
+        out.append({
+            "aviso_id": aviso.id,
+            "fecha_ingreso": aviso.fecha_ingreso,
+            "comuna_id": aviso.comuna_id,
+            "tipo": aviso.tipo,
+            "n_comentarios": n_comentarios.get(aviso.id, 0),
+            "completo": to_json(item),
+            "tarjeta": to_json(project(item, CARD_FIELDS)),
+        })
+    return out
+
+
+def refresh_projection(s: Session, ids: List[int]) -> int:
+    """
+    Reescribe la proyección de `ids` en la transacción de `s` (llamar después del flush del aviso y
+    de sus fotos / contactos, antes del commit).
+      - s: Session — Sesión de la escritura.
+      - ids: List[int] — IDs de avisos.
+    ->
+      - int — Filas escritas.
+    """
+    rows = projection_rows(s, ids)
+    s.execute(delete(AvisoProyeccion).where(AvisoProyeccion.aviso_id.in_(ids)))
+    if rows:
+        s.execute(insert(AvisoProyeccion), rows)
+    return len(rows)
+
+
+def bump_comentarios(s: Session, aviso_id: int, delta: int = 1) -> None:
+    """
+    Ajusta el contador de comentarios de un aviso en la transacción de `s`.
+      - s: Session — Sesión de la escritura.
+      - aviso_id: int
+      - delta: int — +1 al crear un comentario.
+    ->
+      - None
+    """
+    s.execute(
+        update(AvisoProyeccion)
+        .where(AvisoProyeccion.aviso_id == aviso_id)
+        .values(n_comentarios=AvisoProyeccion.n_comentarios + delta)
+    )
+
+
+def delete_projection(s: Session, ids: List[int]) -> None:
+    """
+    Quita de la proyección los avisos `ids` (archivados) en la transacción de `s`.
+      - s: Session
+      - ids: List[int]
+    ->
+      - None
+    """
+    s.execute(delete(AvisoProyeccion).where(AvisoProyeccion.aviso_id.in_(ids)))
+
+
+def rebuild_projection(batch_size: int) -> int:
+    """
+    Reconstruye aviso_proyeccion por lotes de IDs (una transacción por lote, así la tabla nunca
+    queda vacía mientras se sirve) y borra las filas de avisos que ya no están vigentes.
+      - batch_size: int — Avisos por transacción.
+    ->
+      - int — Avisos proyectados.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        with get_session() as s:
+            ids = s.scalars(
+                select(AvisoAdopcion.id)
+                .where(AvisoAdopcion.id > last_id)
+                .order_by(AvisoAdopcion.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            total += refresh_projection(s, ids)
+        last_id = ids[-1]
+    with get_session() as s:
+        s.execute(delete(AvisoProyeccion).where(AvisoProyeccion.aviso_id.not_in(select(AvisoAdopcion.id))))
+    return total
+
+
+def init_readmodel_cli(app: Flask) -> None:
+    """
+    Registra el comando `flask reconstruir-proyeccion`.
+      - app: Flask — Aplicación (usa READMODEL_BATCH_SIZE).
+    ->
+      - None
+    """
+
+    @app.cli.command("reconstruir-proyeccion")
+    @click.option("--lote", type=int, default=None, help="Avisos por transacción (default READMODEL_BATCH_SIZE).")
+    def reconstruir_proyeccion(lote):
+        n = rebuild_projection(lote or app.config["READMODEL_BATCH_SIZE"])
+        get_feed().invalidate()
+        publish("avisos")
+        click.echo(f"{n} avisos proyectados.")
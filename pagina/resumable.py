@@ -0,0 +1,483 @@
+import hashlib
+import json
+import os
+import re
+import secrets
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import click
+from flask import Blueprint, Flask, current_app, jsonify, request
+
+from .admission import admission, client_key, rate_limited
+from .upload import ALLOWED_EXTENSIONS, build_timestamp_name, ensure_dir
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: sin lock entre procesos
+    fcntl = None
+
+# Subidas reanudables de fotos (protocolo al estilo tus):
+#   POST   /api/uploads              {filename, size}  → 201 {id, offset: 0, size}
+#   HEAD   /api/uploads/<id>         → Upload-Offset (cuántos bytes ya están en disco)
+#   PATCH  /api/uploads/<id>         Upload-Offset: n + bytes del trozo → 204 Upload-Offset: n + len
+#   DELETE /api/uploads/<id>         → 204 (descarta la subida)
+# Con la subida completa, crear_aviso recibe el id en 'fotos_ids[]' en lugar del archivo.
+# El estado vive en disco (UPLOAD_SESSIONS_DIR), así que cualquier worker puede atender cada trozo.
+# Cada cliente (IP) tiene un tope de sesiones abiertas y de bytes declarados: clientes/<hash>/<id>
+# marca sus sesiones, así crear una no recorre la carpeta completa. Las vencidas las borra
+# `flask purgar-subidas` (cron); get() también descarta la sesión vencida que le pidan.
+uploads_bp = Blueprint("uploads", __name__, url_prefix="/api/uploads")
+
+ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+COPY_BUFSIZE = 64 * 1024
+
+# Firmas de archivo aceptadas por extensión (se verifican al completar la subida)
+MAGIC = {
+    ".jpg": b"\xff\xd8\xff",
+    ".jpeg": b"\xff\xd8\xff",
+    ".png": b"\x89PNG\r\n\x1a\n",
+}
+
+
+class UploadStore:
+    """
+    Sesiones de subida en disco: <id>.json (metadatos) y <id>.part (bytes recibidos); mientras
+    crear_aviso la usa, el .json pasa a <id>.claimed. El offset de una sesión es el tamaño de su .part.
+      - directory: str — Carpeta de sesiones (se crea si no existe).
+      - max_size: int — Tamaño máximo de una foto (bytes).
+      - ttl: float — Segundos tras los que una sesión sin completar se descarta.
+      - max_sessions: int — Sesiones abiertas por cliente.
+      - max_bytes: int — Suma de tamaños declarados de las sesiones abiertas de un cliente.
+    """
+
+    def __init__(self, directory: str, max_size: int, ttl: float,
+                 max_sessions: int, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        ensure_dir(directory)
+
+    def _paths(self, upload_id: str):
+        return (os.path.join(self.directory, f"{upload_id}.json"),
+                os.path.join(self.directory, f"{upload_id}.part"))
+
+    def _client_dir(self, client: str) -> str:
+        return os.path.join(self.directory, "clientes", hashlib.sha1(client.encode("utf-8")).hexdigest()[:16])
+
+    def _open_sessions(self, client_dir: str) -> Dict[str, int]:
+        """
+        Sesiones abiertas (o reclamadas por un crear_aviso en curso) de un cliente; borra las marcas
+        de sesiones que ya no existen o vencieron.
+          - client_dir: str
+        ->
+          - dict — {upload_id: tamaño declarado}
+        """
+        cutoff = time.time() - self.ttl
+        open_: Dict[str, int] = {}
+        try:
+            names = os.listdir(client_dir)
+        except FileNotFoundError:
+            return open_
+        for upload_id in names:
+            marker = os.path.join(client_dir, upload_id)
+            meta_path, _ = self._paths(upload_id)
+            try:
+                with open(marker, "r", encoding="utf-8") as fh:
+                    size, created = json.load(fh)
+                alive = created >= cutoff and (
+                    os.path.exists(meta_path) or os.path.exists(self._claimed_path(upload_id)))
+            except (OSError, ValueError):
+                alive = False
+            if alive:
+                open_[upload_id] = size
+            else:
+                try:
+                    os.remove(marker)
+                except FileNotFoundError:
+                    pass
+        return open_
+
+    def create(self, filename: str, size: int, client: str = "-") -> Dict[str, Any]:
+        """
+        Abre una sesión de subida.
+          - filename: str — Nombre original (define la extensión).
+          - size: int — Tamaño total declarado en bytes.
+          - client: str — Clave del cliente (ver admission.client_key) para los topes por cliente.
+        ->
+          - dict — Metadatos {id, filename, ext, size, created}. Lanza ValueError si no es válida
+                   o TooManyUploads si el cliente llegó a su tope.
+        """
+        ext = os.path.splitext(filename or "")[1].lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            raise ValueError(f"Extensión no permitida: {ext}. Solo {', '.join(sorted(ALLOWED_EXTENSIONS))}.")
+        if not (0 < size <= self.max_size):
+            raise ValueError(f"Tamaño inválido (máx {self.max_size} bytes).")
+
+        client_dir = self._client_dir(client)
+        ensure_dir(client_dir)
+        # lock por cliente: dos POST simultáneos no pasan ambos el tope
+        with open(os.path.join(self.directory, "clientes", os.path.basename(client_dir) + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            open_ = self._open_sessions(client_dir)
+            if len(open_) >= self.max_sessions or sum(open_.values()) + size > self.max_bytes:
+                raise TooManyUploads()
+            meta = {
+                "id": secrets.token_urlsafe(18),
+                "filename": filename,
+                "ext": ext,
+                "size": size,
+                "created": time.time(),
+            }
+            meta_path, part_path = self._paths(meta["id"])
+            open(part_path, "wb").close()
+            with open(meta_path, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            with open(os.path.join(client_dir, meta["id"]), "w", encoding="utf-8") as fh:
+                json.dump([size, meta["created"]], fh)
+        return meta
+
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Metadatos + offset actual de una sesión.
+          - upload_id: str
+        ->
+          - dict | None — {..., "offset": int, "complete": bool} o None si no existe / expiró.
+        """
+        if not ID_RE.match(upload_id or ""):
+            return None
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            offset = os.path.getsize(part_path)
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta["created"] > self.ttl:
+            self.delete(upload_id)
+            return None
+        meta["offset"] = offset
+        meta["complete"] = offset == meta["size"]
+        return meta
+
+    @contextmanager
+    def _locked(self, part_path: str) -> Iterator[Any]:
+        """
+        Abre el .part con lock exclusivo (dos PATCH simultáneos a la misma sesión no se intercalan).
+          - part_path: str
+        ->
+          - Iterator[file]
+        """
+        with open(part_path, "r+b") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            yield fh
+
+    def append(self, upload_id: str, offset: int, stream, length: Optional[int]) -> int:
+        """
+        Escribe un trozo en la posición `offset` leyendo el stream por bloques (sin bufferear el archivo).
+          - upload_id: str
+          - offset: int — Debe coincidir con el offset actual.
+          - stream: file-like — Cuerpo del request.
+          - length: int | None — Content-Length del trozo.
+        ->
+          - int — Nuevo offset. Lanza KeyError (no existe), OffsetMismatch (offset distinto)
+                  o ValueError (excede el tamaño declarado / contenido inválido).
+        """
+        meta = self.get(upload_id)
+        if meta is None:
+            raise KeyError(upload_id)
+        _, part_path = self._paths(upload_id)
+        with self._locked(part_path) as fh:
+            current = os.fstat(fh.fileno()).st_size
+            if offset != current:
+                raise OffsetMismatch(current)
+            remaining = meta["size"] - current
+            if length is not None and length > remaining:
+                raise ValueError("El trozo excede el tamaño declarado.")
+            fh.seek(current)
+            written = 0
+            while True:
+                buf = stream.read(min(COPY_BUFSIZE, remaining - written + 1))
+                if not buf:
+                    break
+                written += len(buf)
+                if written > remaining:
+                    fh.truncate(current)
+                    raise ValueError("El trozo excede el tamaño declarado.")
+                fh.write(buf)
+            fh.flush()
+            new_offset = current + written
+
+            if new_offset == meta["size"]:
+                fh.seek(0)
+                head = fh.read(len(MAGIC[meta["ext"]]))
+                if head != MAGIC[meta["ext"]]:
+                    fh.truncate(0)
+                    raise ValueError("El archivo no es una imagen válida.")
+        return new_offset
+
+    def _claimed_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.claimed")
+
+    def finalize(self, upload_id: str, upload_folder: str, tipo: str,
+                 edad: Optional[int], unidad: Optional[str]) -> str:
+        """
+        Mueve una subida completa a la carpeta de fotos con el nombre final.
+        La sesión queda reclamada (<id>.claimed) hasta release() (aviso guardado) o restore() (rollback).
+          - upload_id: str
+          - upload_folder: str — Carpeta destino (UPLOAD_FOLDER).
+          - tipo, edad, unidad — Para el nombre final (ver upload.build_timestamp_name).
+        ->
+          - str — Nombre de archivo guardado. Lanza KeyError si la subida no existe, no está completa
+                  o ya la reclamó otra request.
+        """
+        if not ID_RE.match(upload_id or ""):
+            raise KeyError(upload_id)
+        meta_path, part_path = self._paths(upload_id)
+        claimed_path = self._claimed_path(upload_id)
+        # reclamo atómico: de dos finalize simultáneos del mismo id (doble envío) sólo uno renombra el .json
+        try:
+            os.rename(meta_path, claimed_path)
+        except FileNotFoundError:
+            raise KeyError(upload_id) from None
+        os.utime(claimed_path)  # purge_expired cuenta la antigüedad del reclamo, no de la sesión
+        try:
+            with open(claimed_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            complete = os.path.getsize(part_path) == meta["size"] and time.time() - meta["created"] <= self.ttl
+        except (OSError, ValueError, KeyError):
+            self.delete(upload_id)
+            raise KeyError(upload_id) from None
+        if not complete:
+            os.rename(claimed_path, meta_path)
+            raise KeyError(upload_id)
+
+        ensure_dir(upload_folder)
+        final_name = build_timestamp_name(meta["filename"], tipo, edad, unidad)
+        # os.replace es atómico en el mismo filesystem; si la carpeta de sesiones está en otro, se copia
+        try:
+            shutil.move(part_path, os.path.join(upload_folder, final_name))
+        except FileNotFoundError:
+            self.delete(upload_id)
+            raise KeyError(upload_id) from None
+        return final_name
+
+    def release(self, upload_id: str) -> None:
+        """
+        Cierra una sesión finalizada (el aviso que la usa ya se guardó).
+          - upload_id: str
+        ->
+          - None
+        """
+        try:
+            os.remove(self._claimed_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    def restore(self, upload_id: str, upload_folder: str, final_name: str) -> None:
+        """
+        Deshace finalize(): devuelve el archivo a la sesión y la reabre, para que el cliente pueda
+        reintentar con el mismo id (el aviso que la usaba no se guardó).
+          - upload_id: str
+          - upload_folder: str — Carpeta donde finalize dejó el archivo.
+          - final_name: str — Nombre devuelto por finalize.
+        ->
+          - None
+        """
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            shutil.move(os.path.join(upload_folder, final_name), part_path)
+            os.rename(self._claimed_path(upload_id), meta_path)
+        except FileNotFoundError:
+            self.delete(upload_id)
+
+    def delete(self, upload_id: str) -> None:
+        """
+        Descarta una sesión (ignora si ya no existe).
+          - upload_id: str
+        ->
+          - None
+        """
+        for path in (*self._paths(upload_id), self._claimed_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def purge_expired(self) -> int:
+        """
+        Borra sesiones más antiguas que `ttl` y las marcas por cliente que quedaron huérfanas
+        (recorre toda la carpeta: lo llama `flask purgar-subidas`, no los requests).
+          - (None)
+        ->
+          - int — Sesiones borradas.
+        """
+        cutoff = time.time() - self.ttl
+        n = 0
+        for name in os.listdir(self.directory):
+            # .claimed: finalize sin release/restore (el proceso murió a mitad de crear_aviso)
+            upload_id, ext = os.path.splitext(name)
+            if ext not in (".json", ".claimed"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    self.delete(upload_id)
+                    n += 1
+            except OSError:
+                pass
+        clients_root = os.path.join(self.directory, "clientes")
+        if os.path.isdir(clients_root):
+            for name in os.listdir(clients_root):
+                client_dir = os.path.join(clients_root, name)
+                if os.path.isdir(client_dir):
+                    self._open_sessions(client_dir)
+        return n
+
+
+class TooManyUploads(Exception):
+    """El cliente ya tiene UPLOAD_MAX_SESSIONS_PER_CLIENT sesiones o UPLOAD_MAX_BYTES_PER_CLIENT bytes abiertos."""
+
+
+class OffsetMismatch(Exception):
+    """El cliente envió un trozo para un offset distinto del que hay en disco."""
+
+    def __init__(self, current: int) -> None:
+        super().__init__(current)
+        self.current = current
+
+
+def get_upload_store() -> UploadStore:
+    """
+    Store de sesiones de la app actual (creado por init_uploads).
+      - (None)
+    ->
+      - UploadStore
+    """
+    return current_app.extensions["uploads"]
+
+
+def _status_headers(meta: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "Upload-Offset": str(meta["offset"]),
+        "Upload-Length": str(meta["size"]),
+        "Cache-Control": "no-store",
+    }
+
+
+@uploads_bp.post("")
+@rate_limited("post")
+def crear_subida():
+    """
+    Abre una sesión de subida para una foto.
+      - Body JSON: {"filename": str, "size": int}
+    ->
+      - JSON 201 {"id", "offset", "size", "chunk_size"}, 400 o 429 (tope de subidas abiertas del cliente).
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        size = int(payload.get("size"))
+        meta = get_upload_store().create(str(payload.get("filename") or ""), size, client_key())
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e) or "Parámetros inválidos"}), 400
+    except TooManyUploads:
+        return jsonify({"error": "Demasiadas subidas abiertas; termine o descarte alguna."}), 429
+
+    res = jsonify({
+        "id": meta["id"],
+        "offset": 0,
+        "size": meta["size"],
+        "chunk_size": current_app.config["UPLOAD_CHUNK_SIZE"],
+    })
+    res.status_code = 201
+    res.headers["Location"] = f"{uploads_bp.url_prefix}/{meta['id']}"
+    return res
+
+
+@uploads_bp.route("/<upload_id>", methods=["HEAD", "GET"])
+def estado_subida(upload_id: str):
+    """
+    Offset actual de una subida (para reanudar tras un corte).
+      - upload_id: str
+    ->
+      - JSON {"id", "offset", "size", "complete"} + headers Upload-Offset / Upload-Length, o 404.
+    """
+    meta = get_upload_store().get(upload_id)
+    if meta is None:
+        return jsonify({"error": "Subida no encontrada"}), 404
+    return (
+        jsonify({"id": meta["id"], "offset": meta["offset"], "size": meta["size"], "complete": meta["complete"]}),
+        200,
+        _status_headers(meta),
+    )
+
+
+@uploads_bp.patch("/<upload_id>")
+@admission("write")
+def subir_trozo(upload_id: str):
+    """
+    Agrega un trozo a la subida.
+      - Header Upload-Offset: int — Offset donde empieza el trozo (debe ser el actual).
+      - Body: bytes crudos (application/offset+octet-stream u application/octet-stream).
+    ->
+      - 204 con Upload-Offset nuevo; 409 si el offset no calza (incluye el actual); 404; 400/413.
+    """
+    store = get_upload_store()
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return jsonify({"error": "Header Upload-Offset inválido"}), 400
+
+    try:
+        new_offset = store.append(upload_id, offset, request.stream, request.content_length)
+    except KeyError:
+        return jsonify({"error": "Subida no encontrada"}), 404
+    except OffsetMismatch as e:
+        return jsonify({"error": "Offset no coincide", "offset": e.current}), 409, {"Upload-Offset": str(e.current)}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 413
+
+    return "", 204, {"Upload-Offset": str(new_offset), "Cache-Control": "no-store"}
+
+
+@uploads_bp.delete("/<upload_id>")
+def borrar_subida(upload_id: str):
+    """
+    Descarta una subida (el usuario quitó la foto del formulario).
+      - upload_id: str
+    ->
+      - 204
+    """
+    if ID_RE.match(upload_id):
+        get_upload_store().delete(upload_id)
+    return "", 204
+
+
+def init_uploads(app: Flask) -> None:
+    """
+    Registra la API de subidas reanudables, crea su store (UPLOAD_SESSIONS_DIR, UPLOAD_*) y el
+    comando `flask purgar-subidas` (pensado para cron).
+      - app: Flask — Aplicación.
+    ->
+      - None
+    """
+    directory = app.config["UPLOAD_SESSIONS_DIR"] or os.path.join(app.instance_path, "uploads-partial")
+    app.extensions["uploads"] = UploadStore(
+        directory,
+        app.config["UPLOAD_MAX_FILE_SIZE"],
+        app.config["UPLOAD_SESSION_TTL"],
+        app.config["UPLOAD_MAX_SESSIONS_PER_CLIENT"],
+        app.config["UPLOAD_MAX_BYTES_PER_CLIENT"],
+    )
+    app.register_blueprint(uploads_bp)
+
+    @app.cli.command("purgar-subidas")
+    def purgar_subidas():
+        n = app.extensions["uploads"].purge_expired()
+        click.echo(f"{n} subidas vencidas borradas.")
@@ -0,0 +1,131 @@
+import json
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from datetime import datetime
+
+from .models import AvisoAdopcion, Comuna, Region, Comentario
+
+# Formato requerido por el frontend para mostrar/guardar fechas
+FMT = "%Y-%m-%d %H:%M"
+
+# Las fotos subidas (ruta 'static/uploads') se sirven por la ruta dedicada de photos.py
+UPLOADS_RUTA = "static/uploads"
+PHOTO_URL_PREFIX = "/fotos"
+
+
+def fmt(dt: datetime | None) -> str | None:
+    """
+    Formatea datetime a '%Y-%m-%d %H:%M'.
+      - dt: datetime | None — Fecha/hora a formatear.
+    ->
+      - str | None — Cadena formateada o None si dt es None.
+    """
+    if dt is None:
+        return None
+    return dt.strftime(FMT)
+
+
+def build_photo_url(ruta_archivo: str, nombre_archivo: str) -> str:
+    """
+    Normaliza la ruta+nombre de archivo a una URL servible ('/fotos/...' para uploads, '/static/...' si no).
+      - ruta_archivo: str — Carpeta guardada en BD (p. ej. 'static/uploads' o '/static/uploads').
+      - nombre_archivo: str — Nombre del archivo.
+    ->
+      - str — URL relativa o cadena vacía si faltan datos.
+    """
+    ruta = (ruta_archivo or "").strip()
+    nombre = (nombre_archivo or "").strip()
+    if not ruta or not nombre:
+        return ""
+    if ruta.strip("/") == UPLOADS_RUTA:
+        return f"{PHOTO_URL_PREFIX}/{nombre}"
+    base = ruta if ruta.startswith("/") else f"/{ruta}"
+    if not base.endswith("/"):
+        base = f"{base}/"
+    return f"{base}{nombre}"
+
+
+def _fotos(aviso) -> List[str]:
+    fotos = [build_photo_url(f.ruta_archivo, f.nombre_archivo) for f in aviso.fotos]
+    return [p for p in fotos if p]
+
+
+# Campos de un aviso serializado, en el orden de la respuesta completa.
+# Cada uno: función (aviso, comuna, región) → valor. Sólo se accede a lo que el campo necesita,
+# así un SELECT podado (queries.aviso_load_options) no dispara cargas perezosas.
+AVISO_FIELDS: Dict[str, Callable[[Any, Any, Any], Any]] = {
+    "id": lambda a, c, r: a.id,
+    "region": lambda a, c, r: r.nombre if r else None,
+    "comuna": lambda a, c, r: c.nombre if c else None,
+    "sector": lambda a, c, r: a.sector,
+    "contacto_nombre": lambda a, c, r: a.nombre,
+    "contacto_email": lambda a, c, r: a.email,
+    "contacto_celular": lambda a, c, r: a.celular,
+    "contactar_por": lambda a, c, r: [{"via": x.nombre, "id": x.identificador} for x in a.contactos],
+    "tipo": lambda a, c, r: a.tipo,  # 'gato' | 'perro'
+    "cantidad": lambda a, c, r: a.cantidad,
+    "edad": lambda a, c, r: a.edad,
+    "edad_unidad": lambda a, c, r: a.unidad_medida,  # 'a' | 'm'
+    "fecha_disponible": lambda a, c, r: fmt(a.fecha_entrega),
+    "creado_en": lambda a, c, r: fmt(a.fecha_ingreso),
+    "descripcion": lambda a, c, r: a.descripcion,
+    "fotos": lambda a, c, r: _fotos(a),
+}
+
+# Preset ?view=card: lo que muestran las tarjetas de la portada (Card.js, variante "home")
+CARD_FIELDS = frozenset({"id", "creado_en", "comuna", "sector", "tipo", "cantidad", "edad", "edad_unidad", "fotos"})
+
+
+def serialize_row(row: Tuple[AvisoAdopcion, Comuna, Region],
+                  fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Serializa un join (Aviso, Comuna, Región) al dict esperado por el front.
+      - row: tuple(AvisoAdopcion, Comuna, Region) — Fila del SELECT con joins.
+      - fields: frozenset[str] | None — Campos a incluir (None = todos, ver AVISO_FIELDS).
+    ->
+      - dict[str, Any] — Objeto listo para JSON (keys: id, region, comuna, …).
+    """
+    aviso, comuna, region = row
+    if fields is None:
+        return {k: get(aviso, comuna, region) for k, get in AVISO_FIELDS.items()}
+    return {k: get(aviso, comuna, region) for k, get in AVISO_FIELDS.items() if k in fields}
+
+
+def project(item: Dict[str, Any], fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """
+    Poda un aviso ya serializado (p. ej. desde el feed en memoria) a los campos pedidos.
+      - item: dict — Aviso serializado completo.
+      - fields: frozenset[str] | None — Campos a conservar (None = todos).
+    ->
+      - dict
+    """
+    if fields is None:
+        return item
+    return {k: v for k, v in item.items() if k in fields}
+
+
+def to_json(obj: Any) -> str:
+    """
+    JSON compacto con el mismo formato que jsonify (claves ordenadas, ASCII): lo que se guarda en
+    aviso_proyeccion se puede enviar tal cual dentro de una respuesta.
+      - obj: Any — Valor serializable.
+    ->
+      - str
+    """
+    return json.dumps(obj, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+
+
+def serialize_comentario(c: Comentario) -> Dict[str, Any]:
+    """
+    Serializa un comentario al dict esperado por el front.
+      - c: Comentario | ComentarioArchivo — Fila ORM.
+    ->
+      - dict[str, Any] — {id, aviso_id, nombre, texto, fecha}.
+    """
+    return {
+        "id": c.id,
+        "aviso_id": c.aviso_id,
+        "nombre": c.nombre,
+        "texto": c.texto,
+        # usamos el mismo formato que el frontend ya consume (Card.#fmt soporta "YYYY-MM-DD HH:MM")
+        "fecha": fmt(c.fecha),
+    }
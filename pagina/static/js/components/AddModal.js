@@ -633,11 +633,48 @@ class AddModal {
         return ok;
     }
 
+    /** Subidas ya hechas por archivo: un reintento del envío no vuelve a subir las fotos. */
+    #uploads = new WeakMap();
+
+    /**
+     * Sube las fotos por trozos (reanudables) y retorna sus ids de subida, en el mismo orden.
+     * @param {File[]} files
+     * @returns {Promise<string[]>}
+     */
+    async #uploadPhotos(files) {
+        const ids = [];
+        for (const f of files) {
+            const prev = this.#uploads.get(f);
+            if (prev?.done) {
+                ids.push(prev.id);
+                continue;
+            }
+            const id = await window.API.uploadResumable(f, {
+                uploadId: prev?.id,
+                onStart: (uploadId) => this.#uploads.set(f, {id: uploadId, done: false}),
+            });
+            this.#uploads.set(f, {id, done: true});
+            ids.push(id);
+        }
+        return ids;
+    }
+
+    /**
+     * Archivos de foto elegidos en el formulario.
+     * @returns {File[]}
+     */
+    #collectFiles() {
+        const photosContainer = this.refs.photosList || this.refs.photosWrap || null;
+        const photoInputs = photosContainer ? Array.from(photosContainer.querySelectorAll('input[type="file"]')) : [];
+        return photoInputs.flatMap(i => Array.from(i.files ?? []));
+    }
+
     /**
      * Recolecta datos desde el formulario y los mapea a FormData.
+     * @param {string[] | null} [uploadIds] - Ids de fotos ya subidas por trozos (si no, se adjuntan los archivos).
      * @returns {FormData}
      */
-    #collectFormData() {
+    #collectFormData(uploadIds = null) {
         // contactos
         const socialItems = Array.from(this.refs.socialList.querySelectorAll(".social-item"))
             .map(item => ({
@@ -646,11 +683,6 @@ class AddModal {
             }))
             .filter(x => x.nombre && x.identificador);
 
-        // fotos
-        const photosContainer = this.refs.photosList || this.refs.photosWrap || null;
-        const photoInputs = photosContainer ? Array.from(photosContainer.querySelectorAll('input[type="file"]')) : [];
-        const files = photoInputs.flatMap(i => Array.from(i.files ?? []));
-
         // mapear UI -> API
         const tipo = this.refs.tipo.value.toLowerCase();                // 'gato'|'perro'
         const unidad = this.refs.unidadEdad.value === "meses" ? "m" : "a";
@@ -675,9 +707,15 @@ class AddModal {
             fd.append("contactos[identificador][]", c.identificador);
         }
 
-        // fotos[]
-        for (const f of files) {
-            fd.append("fotos[]", f, f.name);
+        // fotos: ids de subidas reanudables o, si no hay, los archivos en el mismo POST
+        if (uploadIds) {
+            for (const id of uploadIds) {
+                fd.append("fotos_ids[]", id);
+            }
+        } else {
+            for (const f of this.#collectFiles()) {
+                fd.append("fotos[]", f, f.name);
+            }
         }
 
         return fd;
@@ -708,11 +746,16 @@ class AddModal {
         const cleanup = () => confirmBox.remove();
 
         yes.addEventListener("click", async () => {
-            const fd = this.#collectFormData();
-
             yes.disabled = true;
             no.disabled = true;
             try {
+                let uploadIds = null;
+                if (window.API?.uploadResumable) {
+                    yes.textContent = "Subiendo fotos…";
+                    uploadIds = await this.#uploadPhotos(this.#collectFiles());
+                    yes.textContent = "Sí, estoy seguro";
+                }
+                const fd = this.#collectFormData(uploadIds);
                 const res = await fetch("/api/avisos", {method: "POST", body: fd});
                 const json = await res.json().catch(() => ({}));
                 if (!res.ok) {
@@ -733,7 +776,8 @@ class AddModal {
                 `;
             } catch (err) {
                 console.error(err);
-                alert("Error de red al crear el aviso.");
+                yes.textContent = "Sí, estoy seguro";
+                alert(err?.message ? `Error al crear el aviso: ${err.message}` : "Error de red al crear el aviso.");
                 yes.disabled = false;
                 no.disabled = false;
             }
@@ -92,6 +92,16 @@
         return res.json();
     }
 
+    /**
+     * Cuenta la visita cuando el aviso vino embebido en la página: las visitas sólo se cuentan
+     * en GET /api/avisos/<id> (la respuesta se descarta).
+     * @param {number} id
+     */
+    function countView(id) {
+        fetch(`/api/avisos/${id}?fields=id`, {headers: {Accept: "application/json"}, keepalive: true})
+            .catch(function () {});
+    }
+
     /**
      * Construye el bloque de comentarios (listado + formulario).
      * @returns {HTMLElement}
@@ -177,8 +187,9 @@
         if (!listEl) return;
         listEl.innerHTML = '<p class="loading">Cargando comentarios…</p>';
         try {
-            // orden más recientes primero
-            const resp = await window.API.getComments(avisoId, { limit: 20, order: "desc" });
+            // orden más recientes primero (la primera carga viene embebida en la página)
+            const resp = window.API.takeInitial("comentarios") ??
+                await window.API.getComments(avisoId, { limit: 20, order: "desc" });
             // backend devuelve {items,total,offset,limit,order}
             renderComments(listEl, resp && resp.items ? resp.items : []);
         } catch (e) {
@@ -264,7 +275,9 @@
 
         mount.innerHTML = `<div class="loading" aria-live="polite">Cargando aviso…</div>`;
 
-        fetchAviso(avisoId)
+        const initial = window.API.takeInitial("aviso");
+        if (initial) countView(avisoId);
+        (initial ? Promise.resolve(initial) : fetchAviso(avisoId))
             .then(function (aviso) {
                 mount.innerHTML = window.Card.render(aviso, "detail");
                 const lightboxRoot = document.getElementById("photo-lightbox");
@@ -14,7 +14,7 @@
         async #load() {
             this.ads = [];
             try {
-                const {data} = await window.API.getLatestAds(5);
+                const {data} = window.API.takeInitial("latest") ?? await window.API.getLatestAds(5, "card");
                 const list = Array.isArray(data) ? (data) : [];
                 const toTs = (v) => {
                     const s = v?.creado_en ?? v?.fecha_disponible ?? null;
@@ -60,7 +60,9 @@
          * @param {AbortSignal} signal
          * @returns {Promise<>}
          */        async fetchPage(page, signal) {
-            const {data, page: p, size, total_pages, total_items} = await window.API.getAdsPage(page, 5);
+            const initial = window.API.takeInitial("page");
+            const {data, page: p, size, total_pages, total_items} =
+                initial && initial.page === page ? initial : await window.API.getAdsPage(page, 5);
             return {data, page: p, size, total_pages, total_items};
         }
 
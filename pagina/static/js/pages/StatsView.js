@@ -29,6 +29,18 @@
 
             const currentYear = new Date().getFullYear();
 
+            // Un solo request para los tres gráficos; cada tab toma su parte de la misma respuesta.
+            let dashboard = null;
+            const part = (key) => () => {
+                if (!dashboard) {
+                    dashboard = window.API.getStatsDashboard({year: currentYear}).catch((e) => {
+                        dashboard = null; // permitir reintentar al cambiar de tab
+                        throw e;
+                    });
+                }
+                return dashboard.then((d) => d[key]);
+            };
+
             const charts = new window.StatisticsCharts({
                 mount: chartsMount,
                 initialId: "line",
@@ -38,7 +50,7 @@
                         id: "line",
                         label: "Línea (por día)",
                         type: "line",
-                        fetcher: () => window.API.getStatsDaily(), // backend: últimos 30 días por defecto
+                        fetcher: part("daily"), // backend: últimos 30 días por defecto
                         options: {
                             responsive: true,
                             maintainAspectRatio: false,
@@ -65,7 +77,7 @@
                         id: "pie",
                         label: "Torta (por tipo)",
                         type: "pie",
-                        fetcher: () => window.API.getStatsByType(),
+                        fetcher: part("by_type"),
                         options: {
                             responsive: true,
                             maintainAspectRatio: false,
@@ -79,7 +91,7 @@
                         id: "bars",
                         label: "Barras (por mes)",
                         type: "bar",
-                        fetcher: () => window.API.getStatsMonthly(currentYear),
+                        fetcher: part("monthly"),
                         options: {
                             responsive: true,
                             maintainAspectRatio: false,
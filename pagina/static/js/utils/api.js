@@ -5,6 +5,32 @@
      */
     const API_BASE = window.API_BASE ?? "/api";
 
+    /**
+     * Datos de la primera carga embebidos por el servidor en <script id="initial-data">.
+     * @type {Record<string, any> | null}
+     */
+    let initialData = null;
+
+    /**
+     * Entrega (una sola vez) los datos embebidos bajo `key`; luego retorna null
+     * para que las recargas posteriores vayan a la API.
+     * @param {string} key - "latest" | "page" | "aviso" | "comentarios"
+     * @returns {any | null}
+     */
+    function takeInitial(key) {
+        if (initialData === null) {
+            const el = document.getElementById("initial-data");
+            try {
+                initialData = el ? JSON.parse(el.textContent || "{}") : {};
+            } catch (e) {
+                console.error(e);
+                initialData = {};
+            }
+        }
+        const value = initialData[key] ?? null;
+        delete initialData[key];
+        return value;
+    }
 
     /**
      * Hace GET y parsea JSON.
@@ -21,11 +47,13 @@
     /**
      * Obtiene los últimos avisos.
      * @param {number} [limit=5] - Límite [1..10]
+     * @param {string} [view] - Preset de campos ("card" = sólo lo que muestra la tarjeta)
      * @returns {Promise<LatestResponse>}
      */
-    async function getLatestAds(limit = 5) {
+    async function getLatestAds(limit = 5, view) {
         const u = new URL(`${API_BASE}/avisos/latest`, window.location.origin);
         u.searchParams.set("limit", String(limit));
+        if (view) u.searchParams.set("view", view);
         return fetchJSON(u.toString());
     }
 
@@ -85,6 +113,19 @@
         return fetchJSON(u.toString());
     }
 
+    /**
+     * Estadísticas de la página en un solo request: serie diaria, totales por tipo y barras mensuales.
+     * @param {{ from?: string, to?: string, year?: number }} [opts]
+     * @returns {Promise<{ daily: ChartPayload, by_type: ChartPayload, monthly: ChartPayload }>}
+     */
+    async function getStatsDashboard(opts = {}) {
+        const u = new URL(`${API_BASE}/stats/dashboard`, window.location.origin);
+        if (opts.from) u.searchParams.set("from", opts.from);
+        if (opts.to) u.searchParams.set("to", opts.to);
+        if (opts.year) u.searchParams.set("year", String(opts.year));
+        return fetchJSON(u.toString());
+    }
+
     /**
      * Obtiene los comentarios de un aviso (paginados).
      * @param {number|string} avisoId - ID del aviso.
@@ -122,7 +163,71 @@
     }
 
 
+    /**
+     * Sube un archivo por trozos a /api/uploads, reanudando desde el offset del servidor ante errores de red.
+     * Si se pasa `uploadId` (subida previa interrumpida) se continúa esa sesión.
+     * @param {File} file
+     * @param {{ uploadId?: string, retries?: number, onStart?: (id: string) => void,
+     *           onProgress?: (sent: number, total: number) => void }} [opts]
+     * @returns {Promise<string>} id de la subida completa (para "fotos_ids[]")
+     */
+    async function uploadResumable(file, opts = {}) {
+        const retries = opts.retries ?? 5;
+        let id = opts.uploadId ?? null;
+        let chunkSize = 256 * 1024;
+        let offset = 0;
+
+        if (id) {
+            const res = await fetch(`${API_BASE}/uploads/${id}`, {method: "HEAD"});
+            if (res.ok) offset = Number(res.headers.get("Upload-Offset") || 0);
+            else id = null; // expiró: empezar de nuevo
+        }
+        if (!id) {
+            const res = await fetch(`${API_BASE}/uploads`, {
+                method: "POST",
+                headers: {"Content-Type": "application/json", "Accept": "application/json"},
+                body: JSON.stringify({filename: file.name, size: file.size}),
+            });
+            const json = await res.json().catch(() => ({}));
+            if (!res.ok) throw new Error(json.error || `Error ${res.status} al iniciar la subida`);
+            id = json.id;
+            chunkSize = json.chunk_size || chunkSize;
+        }
+        opts.onStart?.(id);
+
+        let failures = 0;
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + chunkSize);
+            try {
+                const res = await fetch(`${API_BASE}/uploads/${id}`, {
+                    method: "PATCH",
+                    headers: {"Content-Type": "application/offset+octet-stream", "Upload-Offset": String(offset)},
+                    body: chunk,
+                });
+                if (res.status === 409 || res.ok) {
+                    offset = Number(res.headers.get("Upload-Offset") || offset);
+                    failures = 0;
+                    opts.onProgress?.(offset, file.size);
+                    continue;
+                }
+                if (res.status !== 503) {
+                    const json = await res.json().catch(() => ({}));
+                    throw new Error(json.error || `Error ${res.status} al subir ${file.name}`);
+                }
+            } catch (e) {
+                if (!(e instanceof TypeError)) throw e; // TypeError = error de red → reintentar
+            }
+            if (++failures > retries) throw new Error(`No se pudo subir ${file.name}`);
+            await new Promise((r) => setTimeout(r, 500 * 2 ** failures));
+            // preguntar al servidor cuánto alcanzó a llegar
+            const head = await fetch(`${API_BASE}/uploads/${id}`, {method: "HEAD"}).catch(() => null);
+            if (head?.ok) offset = Number(head.headers.get("Upload-Offset") || offset);
+        }
+        return id;
+    }
+
     window.API = {
+        takeInitial,
         fetchJSON,
         getLatestAds,
         getAdsPage,
@@ -130,7 +235,9 @@
         getStatsDaily,
         getStatsByType,
         getStatsMonthly,
+        getStatsDashboard,
         getComments,
         postComment,
+        uploadResumable,
     };
 })();
@@ -0,0 +1,276 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from datetime import datetime, timedelta, date
+
+from sqlalchemy import select, func, union_all, Integer, Select, Subquery
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from .cache import cached
+from .db import get_session
+from .models import AvisoAdopcion, AvisoAdopcionArchivo
+
+# Statements y payloads (formato Chart.js) de las estadísticas, y su versión cacheada (namespace
+# "stats", invalidado por crear_aviso). Compartidos por los handlers WSGI (api.py) y ASGI (asgi.py).
+# Las estadísticas cuentan avisos vigentes y archivados (ver archive.py).
+
+TIPO_COLORS = {"gato": "#2196F3", "perro": "#FF9800"}
+
+
+class month_of(FunctionElement):
+    """
+    Mes (1-12) de una columna DATETIME, portable entre dialectos (MySQL: MONTH(), SQLite: strftime).
+    DATE() ya existe en ambos, así que el bucket diario sigue usando func.date.
+      - col: ColumnElement — Columna de fecha.
+    ->
+      - ColumnElement[int]
+    """
+    type = Integer()
+    inherit_cache = True
+    name = "month_of"
+
+
+@compiles(month_of)
+def _month_of_default(element, compiler, **kw):
+    return f"MONTH({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(month_of, "sqlite")
+def _month_of_sqlite(element, compiler, **kw):
+    return f"CAST(strftime('%m', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
+def avisos_todos(where: Optional[Callable[[Any], Any]] = None) -> Subquery:
+    """
+    UNION ALL de (id, fecha_ingreso, tipo) de aviso_adopcion y aviso_adopcion_archivo.
+    El filtro se aplica dentro de cada rama para que use los índices de cada tabla.
+      - where: Callable[[modelo], condición] | None — Filtro a aplicar en ambas ramas.
+    ->
+      - Subquery — Columnas: id, fecha_ingreso, tipo.
+    """
+    branches = []
+    for model in (AvisoAdopcion, AvisoAdopcionArchivo):
+        q = select(model.id, model.fecha_ingreso, model.tipo)
+        if where is not None:
+            q = q.where(where(model))
+        branches.append(q)
+    return union_all(*branches).subquery("avisos_todos")
+
+
+def daily_stmt(from_d: date, to_d: date) -> Select:
+    """
+    Conteo de avisos agrupado por día dentro de [from_d, to_d].
+      - from_d: date — Inicio (inclusive).
+      - to_d: date — Fin (inclusive).
+    ->
+      - Select — Filas (dia, count).
+    """
+    start = datetime.combine(from_d, datetime.min.time())
+    end = datetime.combine(to_d, datetime.max.time())
+    t = avisos_todos(lambda m: m.fecha_ingreso.between(start, end))
+    return (
+        select(func.date(t.c.fecha_ingreso).label("dia"),
+               func.count(t.c.id))
+        .group_by("dia")
+        .order_by("dia")
+    )
+
+
+def by_type_stmt() -> Select:
+    """
+    Conteo total de avisos por tipo de mascota.
+      - (None)
+    ->
+      - Select — Filas (tipo, count).
+    """
+    t = avisos_todos()
+    return (
+        select(t.c.tipo, func.count(t.c.id))
+        .group_by(t.c.tipo)
+    )
+
+
+def monthly_stmt(year: int) -> Select:
+    """
+    Conteo de avisos por (mes, tipo) para un año.
+      - year: int — Año YYYY.
+    ->
+      - Select — Filas (mes, tipo, count).
+    """
+    # rango en vez de YEAR(col) = year para que el filtro use el índice
+    start = datetime(year, 1, 1)
+    end = datetime(year + 1, 1, 1)
+    t = avisos_todos(lambda m: (m.fecha_ingreso >= start) & (m.fecha_ingreso < end))
+    return (
+        select(month_of(t.c.fecha_ingreso).label("mes"),
+               t.c.tipo,
+               func.count(t.c.id))
+        .group_by("mes", t.c.tipo)
+        .order_by("mes")
+    )
+
+
+def dashboard_stmt(from_d: date, to_d: date, year: int) -> Select:
+    """
+    Conteo de avisos por (día, tipo) en una sola pasada sobre [from_d, to_d] ∪ año `year`: de aquí
+    salen la serie diaria y la mensual del dashboard (la torta por tipo es el total histórico, ver
+    cached_dashboard).
+      - from_d: date — Inicio de la serie diaria (inclusive).
+      - to_d: date — Fin de la serie diaria (inclusive).
+      - year: int — Año de la serie mensual.
+    ->
+      - Select — Filas (dia, tipo, count).
+    """
+    start = datetime.combine(from_d, datetime.min.time())
+    end = datetime.combine(to_d, datetime.max.time())
+    year_start, year_end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    # dos rangos sobre el índice de fecha_ingreso; una fila en ambos se cuenta una vez
+    t = avisos_todos(lambda m: m.fecha_ingreso.between(start, end)
+                     | ((m.fecha_ingreso >= year_start) & (m.fecha_ingreso < year_end)))
+    return (
+        select(func.date(t.c.fecha_ingreso).label("dia"),
+               t.c.tipo,
+               func.count(t.c.id))
+        .group_by("dia", t.c.tipo)
+    )
+
+
+def _day_key(v: Any) -> str:
+    """
+    Normaliza el valor de func.date(...) (date o str según driver) a 'YYYY-MM-DD'.
+      - v: date | datetime | str
+    ->
+      - str
+    """
+    if isinstance(v, (date, datetime)):
+        return v.strftime("%Y-%m-%d")
+    return str(v)[:10]
+
+
+def daily_payload(rows: Iterable, from_d: date, to_d: date) -> Dict[str, Any]:
+    """
+    Arma la serie diaria (rellena días sin avisos con 0).
+      - rows: Iterable[(dia, count)] — Resultado de daily_stmt().
+      - from_d: date — Inicio del rango.
+      - to_d: date — Fin del rango.
+    ->
+      - dict — {"labels": [YYYY-MM-DD, ...], "datasets": [{"label", "data"}]}
+    """
+    counts = {_day_key(r[0]): int(r[1]) for r in rows}
+    labels: List[str] = []
+    data: List[int] = []
+    cur = from_d
+    while cur <= to_d:
+        key = cur.strftime("%Y-%m-%d")
+        labels.append(key)
+        data.append(counts.get(key, 0))
+        cur += timedelta(days=1)
+
+    return {
+        "labels": labels,
+        "datasets": [{"label": "Avisos por día", "data": data}]
+    }
+
+
+def by_type_payload(rows: Iterable) -> Dict[str, Any]:
+    """
+    Arma la torta de totales por tipo.
+      - rows: Iterable[(tipo, count)] — Resultado de by_type_stmt().
+    ->
+      - dict — {"labels": ["Gato","Perro"], "datasets": [{"label", "data", "backgroundColor"}]}
+    """
+    totals = {t: int(c) for (t, c) in rows}
+    labels = ["Gato", "Perro"]
+    data = [totals.get("gato", 0), totals.get("perro", 0)]
+    colors = [TIPO_COLORS["gato"], TIPO_COLORS["perro"]]
+    return {
+        "labels": labels,
+        "datasets": [{"label": "Total por tipo", "data": data, "backgroundColor": colors, }]
+    }
+
+
+def monthly_payload(rows: Iterable, year: int) -> Dict[str, Any]:
+    """
+    Arma las barras mensuales (gatos y perros) de un año.
+      - rows: Iterable[(mes, tipo, count)] — Resultado de monthly_stmt().
+      - year: int — Año YYYY.
+    ->
+      - dict — {"labels": ["YYYY-01",...], "datasets": [{"label": "Gatos", ...}, {"label": "Perros", ...}]}
+    """
+    gatos = [0] * 12
+    perros = [0] * 12
+    for mes, tipo, cnt in rows:
+        mes = int(mes)
+        if 1 <= mes <= 12:
+            if tipo == "gato":
+                gatos[mes - 1] = int(cnt)
+            elif tipo == "perro":
+                perros[mes - 1] = int(cnt)
+
+    labels = [f"{year}-{m:02d}" for m in range(1, 13)]
+    return {
+        "labels": labels,
+        "datasets": [
+            {"label": "Gatos", "data": gatos, "backgroundColor": TIPO_COLORS["gato"]},
+            {"label": "Perros", "data": perros, "backgroundColor": TIPO_COLORS["perro"]}
+        ]
+    }
+
+
+def dashboard_payload(rows: Iterable, by_type: Dict[str, Any], from_d: date, to_d: date,
+                      year: int) -> Dict[str, Any]:
+    """
+    Arma las series diaria y mensual desde las filas de dashboard_stmt() y les suma la torta por tipo.
+      - rows: Iterable[(dia, tipo, count)] — Resultado de dashboard_stmt().
+      - by_type: dict — Payload de by_type_payload().
+      - from_d: date — Inicio de la serie diaria.
+      - to_d: date — Fin de la serie diaria.
+      - year: int — Año de la serie mensual.
+    ->
+      - dict — {"daily": ..., "by_type": ..., "monthly": ...} (mismo formato que cada endpoint).
+    """
+    from_key, to_key, year_key = from_d.strftime("%Y-%m-%d"), to_d.strftime("%Y-%m-%d"), f"{year:04d}"
+    daily: Dict[str, int] = {}
+    monthly: Dict[tuple, int] = {}
+    for dia, tipo, cnt in rows:
+        key = _day_key(dia)
+        cnt = int(cnt)
+        if from_key <= key <= to_key:
+            daily[key] = daily.get(key, 0) + cnt
+        if key[:4] == year_key:
+            mk = (int(key[5:7]), tipo)
+            monthly[mk] = monthly.get(mk, 0) + cnt
+
+    return {
+        "daily": daily_payload(daily.items(), from_d, to_d),
+        "by_type": by_type,
+        "monthly": monthly_payload(((m, t, c) for (m, t), c in monthly.items()), year),
+    }
+
+
+# --- Payloads cacheados (cache compartido entre workers, ver cache.py) ---
+
+@cached("stats", ttl=300)
+def cached_daily(from_d: date, to_d: date) -> Dict[str, Any]:
+    with get_session() as s:
+        return daily_payload(s.execute(daily_stmt(from_d, to_d)).all(), from_d, to_d)
+
+
+@cached("stats", ttl=300)
+def cached_by_type() -> Dict[str, Any]:
+    with get_session() as s:
+        return by_type_payload(s.execute(by_type_stmt()).all())
+
+
+@cached("stats", ttl=300)
+def cached_dashboard(from_d: date, to_d: date, year: int) -> Dict[str, Any]:
+    # la torta es el total histórico: se toma la misma entrada cacheada de /stats/by-type (un
+    # COUNT por tipo) en vez de agrupar por día toda la historia
+    by_type = cached_by_type()
+    with get_session() as s:
+        return dashboard_payload(s.execute(dashboard_stmt(from_d, to_d, year)).all(), by_type, from_d, to_d, year)
+
+
+@cached("stats", ttl=300)
+def cached_monthly(year: int) -> Dict[str, Any]:
+    with get_session() as s:
+        return monthly_payload(s.execute(monthly_stmt(year)).all(), year)
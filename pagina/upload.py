@@ -1,5 +1,6 @@
 import os
 import re
+import secrets
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 from werkzeug.utils import secure_filename
@@ -23,7 +24,8 @@ def ensure_dir(path: str) -> None:
 
 def build_timestamp_name(original_filename: str, tipo: str, edad: Optional[int], unidad: Optional[str]) -> str:
     """
-    Genera nombre de archivo con timestamp y metadatos (p.ej. 20250919-150245-gato-3m.jpg).
+    Genera nombre de archivo con timestamp, metadatos y un sufijo aleatorio (p.ej. 20250919-150245-gato-3m-1a2b3c4d.jpg).
+    El sufijo evita que fotos subidas en el mismo segundo se pisen; así cada URL de foto es inmutable.
       - original_filename: str — Nombre original.
       - tipo: str — Tipo de mascota.
       - edad: Optional[int] — Edad numérica para sufijo (o None).
@@ -46,7 +48,7 @@ def build_timestamp_name(original_filename: str, tipo: str, edad: Optional[int],
             f"Solo se aceptan: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
         )
 
-    return f"{ts}-{tipo_norm}-{sufijo}{ext}"
+    return f"{ts}-{tipo_norm}-{sufijo}-{secrets.token_hex(4)}{ext}"
 
 
 def save_uploaded_file(file_storage, upload_folder: str, tipo: str, edad: Optional[int], unidad: Optional[str]) -> str:
@@ -142,12 +144,13 @@ def unidad_label(unidad: Optional[str]) -> Optional[str]:
     return None
 
 
-def validate_aviso(form, files, s) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+def validate_aviso(form, files, s, uploads=None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
     """
     Valida y normaliza datos de un aviso desde form/files.
       - form: werkzeug.datastructures.ImmutableMultiDict — Campos del formulario.
       - files: werkzeug.datastructures.MultiDict — Archivos subidos.
       - s: sqlalchemy.orm.Session — Sesión/connection para consultas.
+      - uploads: UploadStore | None — Subidas reanudables referenciadas en 'fotos_ids[]' (ver resumable.py).
     ->
       - Tuple[Optional[Dict[str, Any]], List[str]] —
           (data normalizada lista para persistir o None, lista de errores).
@@ -237,9 +240,20 @@ def validate_aviso(form, files, s) -> Tuple[Optional[Dict[str, Any]], List[str]]
     # --- fotos ---
     fotos_files = files.getlist("fotos[]")
     fotos_files = [f for f in fotos_files if f and getattr(f, "filename", "")]
-    if len(fotos_files) < 1:
+    # fotos ya subidas por trozos: sólo se referencia el id de la subida
+    fotos_uploads: List[str] = [u.strip() for u in form.getlist("fotos_ids[]") if u and u.strip()]
+    if fotos_uploads:
+        if uploads is None:
+            errs.append("Subidas por id no disponibles.")
+        else:
+            for upload_id in fotos_uploads:
+                meta = uploads.get(upload_id)
+                if meta is None or not meta["complete"]:
+                    errs.append(f"Foto {upload_id}: subida no encontrada o incompleta.")
+    total_fotos = len(fotos_files) + len(fotos_uploads)
+    if total_fotos < 1:
         errs.append("Debes subir al menos 1 foto.")
-    if len(fotos_files) > 5:
+    if total_fotos > 5:
         errs.append("Máximo 5 fotos.")
 
     # Validar extensión de cada archivo
@@ -266,5 +280,6 @@ def validate_aviso(form, files, s) -> Tuple[Optional[Dict[str, Any]], List[str]]
         "descripcion": descripcion,
         "contactos": contactos,  # [{via:'X'|'whatsapp'|..., id:str}]
         "fotos_files": fotos_files,
+        "fotos_uploads": fotos_uploads,  # ids de subidas completas (resumable.py)
     }
     return data, []
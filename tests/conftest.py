@@ -0,0 +1,67 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Las pruebas corren sobre SQLite (DB_BACKEND=sqlite) en un directorio temporal: Config lee el
+# entorno al importarse, así que se fija antes de importar pagina.
+_TMP = tempfile.mkdtemp(prefix="tarea-tests-")
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(_TMP, "tarea2.sqlite3")
+os.environ.pop("BUS_BACKEND", None)
+
+from pagina import create_app  # noqa: E402
+from pagina.config import Config  # noqa: E402
+
+N_AVISOS = 30
+
+
+@pytest.fixture(scope="session")
+def app():
+    Config.SHARED_CACHE_PATH = os.path.join(_TMP, "shared_cache.sqlite3")
+    Config.LATEST_FEED_STAMP = os.path.join(_TMP, "latest_feed.stamp")
+    Config.UPLOAD_SESSIONS_DIR = os.path.join(_TMP, "uploads-partial")
+    Config.UPLOAD_FOLDER = os.path.join(_TMP, "uploads")
+    Config.RATE_LIMIT_POST = (100.0, 1000)  # todas las pruebas escriben desde la misma IP
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+    app = create_app()
+    app.config["TESTING"] = True
+    result = app.test_cli_runner().invoke(args=["init-db", "--avisos", str(N_AVISOS)])
+    assert result.exit_code == 0, result.output
+    return app
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def asgi(app):
+    from pagina.asgi import create_asgi_app
+
+    return create_asgi_app()
+
+
+@pytest.fixture(scope="session")
+def async_app(asgi):
+    return asgi.async_app
+
+
+@pytest.fixture()
+def async_get(async_app):
+    """
+    GET a la app Quart (lecturas async) en un event loop propio; el pool async se cierra al final
+    (after_serving), así cada llamada no arrastra conexiones de un loop anterior.
+    """
+
+    def get(path):
+        async def run():
+            async with async_app.test_app() as test_app:
+                r = await test_app.test_client().get(path)
+                return r.status_code, await r.get_json()
+
+        return asyncio.run(run())
+
+    return get
@@ -0,0 +1,52 @@
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import update
+
+from pagina.archive import archive_expired
+from pagina.bus import publish
+from pagina.db import get_session
+from pagina.models import AvisoAdopcion
+
+
+def _archive(aviso_id: int) -> None:
+    # sólo este aviso queda con fecha_entrega anterior al corte
+    with get_session() as s:
+        s.execute(update(AvisoAdopcion).where(AvisoAdopcion.id == aviso_id)
+                  .values(fecha_entrega=datetime(1999, 1, 1)))
+    assert archive_expired(datetime(2000, 1, 1), 100) == 1
+    publish("avisos", "stats", "comentarios")
+
+
+def test_archived_aviso_keeps_detail_and_comments(client, async_get):
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    r = client.post(f"/api/avisos/{aviso_id}/comentarios", json={"nombre": "Ana", "texto": "¿Sigue disponible?"})
+    assert r.status_code == 201
+    before = client.get(f"/api/avisos/{aviso_id}/comentarios").get_json()
+    assert before["total"] >= 1
+
+    _archive(aviso_id)
+
+    detail = client.get(f"/api/avisos/{aviso_id}")
+    assert detail.status_code == 200 and detail.get_json()["archivado"] is True
+    assert client.get(f"/api/avisos/{aviso_id}/comentarios").get_json() == before
+    status, body = async_get(f"/api/avisos/{aviso_id}/comentarios")
+    assert status == 200 and body == before
+
+    page = client.get(f"/list/{aviso_id}")
+    assert page.status_code == 200
+    embedded = re.search(r'<script id="initial-data" type="application/json">(.*?)</script>',
+                         page.get_data(as_text=True)).group(1)
+    data = json.loads(embedded)
+    assert data["aviso"]["archivado"] is True
+    assert data["comentarios"]["total"] == before["total"]
+
+    # en el archivo no se comenta
+    r = client.post(f"/api/avisos/{aviso_id}/comentarios", json={"nombre": "Ana", "texto": "Hola de nuevo"})
+    assert r.status_code == 404
+
+
+def test_unknown_aviso_comments_404(client, async_get):
+    assert client.get("/api/avisos/999999/comentarios").status_code == 404
+    assert async_get("/api/avisos/999999/comentarios")[0] == 404
@@ -0,0 +1,34 @@
+from pagina.metrics import metrics
+
+
+def _hits(ns):
+    return metrics.snapshot()["counters"].get(f"cache.{ns}.hit", 0)
+
+
+def test_async_reads_share_flask_cache(client, async_get):
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    for path, ns in (("/api/avisos?size=4&page=2", "avisos"),
+                     (f"/api/avisos/{aviso_id}/comentarios?limit=5", "comentarios")):
+        expected = client.get(path).get_json()
+        hits = _hits(ns)
+        status, body = async_get(path)
+        # la app Quart lee la entrada que dejó Flask
+        assert status == 200 and body == expected
+        assert _hits(ns) == hits + 1
+
+
+def test_async_comments_follow_invalidation(client, async_get):
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    before = async_get(f"/api/avisos/{aviso_id}/comentarios")[1]
+    r = client.post(f"/api/avisos/{aviso_id}/comentarios", json={"nombre": "Ana", "texto": "Comentario nuevo"})
+    assert r.status_code == 201
+    after = async_get(f"/api/avisos/{aviso_id}/comentarios")[1]
+    assert after["total"] == before["total"] + 1
+
+
+def test_async_catalog_matches_flask(client, async_get):
+    regiones = client.get("/api/regiones").get_json()
+    assert async_get("/api/regiones") == (200, regiones)
+    region_id = regiones["data"][0]["id"]
+    comunas = client.get(f"/api/regiones/{region_id}/comunas").get_json()
+    assert async_get(f"/api/regiones/{region_id}/comunas") == (200, comunas)
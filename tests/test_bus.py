@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import select
+
+from pagina import bus
+from pagina.db import get_session
+from pagina.models import Invalidacion
+
+
+@pytest.fixture()
+def received():
+    got = []
+
+    def collect(namespaces, remote):
+        if remote:
+            got.append(namespaces)
+
+    bus.subscribe(collect)
+    yield got
+    bus._subscribers.remove(collect)
+
+
+def test_udp_heartbeat_detects_lost_last_message(received):
+    b = bus.UdpMulticastBus("239.255.50.2", 0, heartbeat=5.0)
+    b._on_message("otro", 1, frozenset({"avisos"}), None)
+    b._on_message("otro", 1, frozenset(), None)  # latido sin pérdidas
+    assert received == [frozenset({"avisos"})]
+
+    # se perdió el mensaje 2 (el último): el latido lo delata
+    b._on_message("otro", 2, frozenset(), None)
+    assert received[-1] == bus.ALL_NAMESPACES
+
+
+def test_udp_gap_between_messages(received):
+    b = bus.UdpMulticastBus("239.255.50.2", 0)
+    b._on_message("otro", 1, frozenset({"stats"}), None)
+    b._on_message("otro", 3, frozenset({"stats"}), None)
+    assert received == [frozenset({"stats"}), bus.ALL_NAMESPACES]
+
+
+def test_db_bus_ids_follow_sequence(app, received):
+    reader = bus.DbLogBus(poll_interval=1.0, retention=3600)
+    writer = bus.DbLogBus(poll_interval=1.0, retention=3600)
+    reader._setup()
+    reader._poll()  # toma el último id
+
+    writer.send(frozenset({"avisos"}))
+    writer.send(frozenset({"comentarios"}))
+    with get_session() as s:
+        ids = s.scalars(select(Invalidacion.id).order_by(Invalidacion.id)).all()
+    assert ids[-2:] == [ids[-2], ids[-2] + 1]
+
+    reader._poll()
+    assert received == [frozenset({"avisos", "comentarios"})]
@@ -0,0 +1,81 @@
+import io
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from pagina.cache import get_cache
+from pagina.changes import purge_changes
+from pagina.db import get_session
+from pagina.models import CambioSeq, Comuna
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 200
+
+
+def _head() -> str:
+    # token al día (el que tendría un espejo que ya leyó todo el log)
+    with get_session() as s:
+        seq = s.get(CambioSeq, 1)
+        return str(seq.ultimo if seq else 0)
+
+
+def _comment(client, aviso_id, texto):
+    r = client.post(f"/api/avisos/{aviso_id}/comentarios", json={"nombre": "Ana", "texto": texto})
+    assert r.status_code == 201
+
+
+def test_changes_since_token(client):
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    since = _head()
+    assert client.get(f"/api/avisos/changes?since={since}").get_json() == {
+        "changes": [], "next": since, "has_more": False,
+    }
+
+    _comment(client, aviso_id, "Primer comentario")
+    _comment(client, aviso_id, "Segundo comentario")
+    body = client.get(f"/api/avisos/changes?since={since}&limit=1").get_json()
+    assert body["has_more"] is True and len(body["changes"]) == 1
+    first = body["changes"][0]
+    assert first["entity"] == "comentario" and first["op"] == "create" and first["aviso_id"] == aviso_id
+    assert first["data"]["texto"] == "Primer comentario"
+
+    rest = client.get(f"/api/avisos/changes?since={body['next']}").get_json()
+    assert [c["data"]["texto"] for c in rest["changes"]] == ["Segundo comentario"]
+    assert rest["has_more"] is False and int(rest["next"]) > int(body["next"])
+
+
+def test_changes_invalid_and_gone_tokens(client):
+    assert client.get("/api/avisos/changes?since=-1").status_code == 400
+    assert client.get("/api/avisos/changes?since=x").status_code == 400
+    head = int(_head())
+    # un token adelantado (de otra base) tampoco es válido
+    assert client.get(f"/api/avisos/changes?since={head + 1000}").status_code == 410
+
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    _comment(client, aviso_id, "Antes de purgar")
+    with get_session() as s:
+        assert purge_changes(s, datetime.now() + timedelta(seconds=1)) > 0
+        s.commit()
+    assert client.get(f"/api/avisos/changes?since={head}").status_code == 410
+    assert client.get("/api/avisos/changes").status_code == 410
+    assert client.get(f"/api/avisos/changes?since={_head()}").status_code == 200
+
+
+def test_new_aviso_invalidates_cached_reads(client):
+    assert get_cache() is not None
+    by_type = client.get("/api/stats/by-type").get_json()["datasets"][0]["data"]
+    total = client.get("/api/avisos?size=1").get_json()["total_items"]
+    assert client.get("/api/stats/by-type").get_json()["datasets"][0]["data"] == by_type  # servido del cache
+
+    with get_session() as s:
+        comuna_id = s.scalar(select(Comuna.id).limit(1))
+    r = client.post("/api/avisos", data={
+        "comuna_id": str(comuna_id), "nombre": "Ana Pérez", "email": "ana@example.com",
+        "tipo": "perro", "cantidad": "1", "edad": "3", "unidad_medida": "a",
+        "fecha_entrega": "2030-01-01T10:00", "fotos[]": (io.BytesIO(PNG), "foto.png"),
+    }, content_type="multipart/form-data")
+    assert r.status_code == 201, r.get_json()
+
+    assert client.get("/api/stats/by-type").get_json()["datasets"][0]["data"] == [by_type[0], by_type[1] + 1]
+    assert client.get("/api/avisos?size=1").get_json()["total_items"] == total + 1
+    latest = client.get("/api/avisos/latest?limit=1").get_json()["data"]
+    assert latest[0]["id"] == r.get_json()["id"]
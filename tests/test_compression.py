@@ -0,0 +1,52 @@
+import asyncio
+import gzip
+import os
+import subprocess
+import sys
+
+
+def test_static_css_is_compressed_and_revalidated(app, client):
+    r = client.get("/static/css/components.css", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "gzip"
+    with open(os.path.join(app.static_folder, "css", "components.css"), "rb") as fh:
+        assert gzip.decompress(r.data) == fh.read()
+    etag = r.headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get("/static/css/components.css", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def test_static_css_identity(client):
+    r = client.get("/static/css/components.css", headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    assert "Content-Encoding" not in r.headers
+
+
+def test_async_json_is_compressed(async_app):
+    async def run():
+        async with async_app.test_app() as test_app:
+            r = await test_app.test_client().get("/api/avisos?size=20", headers={"Accept-Encoding": "gzip"})
+            return r.headers, await r.get_data()
+
+    headers, body = asyncio.run(run())
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body).startswith(b'{"data"')
+
+
+def test_wsgi_app_without_quart(tmp_path):
+    # gunicorn (WSGI) no necesita quart: sólo asgi.py lo importa de verdad
+    code = (
+        "import sys; sys.modules['quart'] = None\n"
+        "from pagina import create_app\n"
+        "from pagina.config import Config\n"
+        f"Config.SHARED_CACHE_PATH = {str(tmp_path / 'cache.sqlite3')!r}\n"
+        f"Config.UPLOAD_SESSIONS_DIR = {str(tmp_path / 'uploads-partial')!r}\n"
+        "create_app()\n"
+    )
+    env = {**os.environ, "DB_BACKEND": "sqlite", "SQLITE_PATH": str(tmp_path / "db.sqlite3")}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), env={**env, "PYTHONPATH": root},
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture()
+def metrics_token(app):
+    app.config["METRICS_TOKEN"] = "secreto"
+    yield "secreto"
+    app.config["METRICS_TOKEN"] = None
+
+
+def test_metrics_hidden_without_token(app, client):
+    assert app.config["METRICS_TOKEN"] is None
+    assert client.get("/api/metrics").status_code == 404
+
+
+def test_metrics_require_admin_token(client, metrics_token):
+    assert client.get("/api/metrics").status_code == 403
+    assert client.get("/api/metrics", headers={"X-Admin-Token": "otro"}).status_code == 403
+    r = client.get("/api/metrics", headers={"X-Admin-Token": metrics_token})
+    assert r.status_code == 200 and "counters" in r.get_json()
+
+
+def test_profiler_keeps_its_own_token(app, client, metrics_token):
+    # sin PROFILER_ADMIN_TOKEN las rutas del profiler no existen, aunque haya token de métricas
+    assert app.config["PROFILER_ADMIN_TOKEN"] is None
+    assert client.get("/admin/profiler", headers={"X-Admin-Token": metrics_token}).status_code == 404
@@ -0,0 +1,43 @@
+from pagina import popular
+
+
+def test_detail_view_counted_once(client):
+    aviso_id = client.get("/api/avisos?size=1").get_json()["data"][0]["id"]
+    before = popular._counter.pending()
+
+    # la página embebe los datos sin contar; la vista JS cuenta con GET /api/avisos/<id>?fields=id
+    assert client.get(f"/list/{aviso_id}").status_code == 200
+    assert popular._counter.pending() == before
+    assert client.get(f"/api/avisos/{aviso_id}?fields=id").status_code == 200
+    assert popular._counter.pending() == before + 1
+
+
+def test_ranking_computed_once_per_interval(app, client, monkeypatch):
+    # dos workers (dos rankings) con el mismo cache compartido: sólo el primero puntúa en la BD
+    sessions = []
+    get_session = popular.get_session
+    monkeypatch.setattr(popular, "get_session", lambda: sessions.append(1) or get_session())
+    cfg = app.config
+    first, second = (popular.PopularRanking(cfg["POPULAR_TOP_N"], cfg["POPULAR_COMMENT_WEIGHT"],
+                                            cfg["POPULAR_HALF_LIFE_HOURS"], 60.0) for _ in range(2))
+    first.refresh()
+    second.refresh()
+    assert len(sessions) <= 1
+    assert second.items == first.items and second.computed_at is not None
+    assert client.get("/api/avisos?order=popular&size=5").status_code == 200
+
+
+def test_flusher_survives_unexpected_errors(monkeypatch, caplog):
+    flusher = popular._flusher
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise KeyError("buffer")
+
+    monkeypatch.setattr(flusher.counter, "flush", broken)
+    flusher.tick()
+    flusher.tick()
+    # el error se registra y la vuelta siguiente vuelve a intentar
+    assert len(calls) == 2
+    assert "volcado de visitas" in caplog.text
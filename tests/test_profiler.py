@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from pagina.profiler import SamplingProfiler
+
+
+def test_samples_running_task_endpoint():
+    prof = SamplingProfiler(0.01, 64, 100)
+
+    async def busy():
+        prof.enter_task("async_api.listar_avisos")
+        # el loop queda ocupado en esta task mientras otro thread muestrea
+        sampler = threading.Thread(target=prof.sample)
+        sampler.start()
+        sampler.join()
+        prof.exit_task()
+
+    async def idle():
+        await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(busy(), idle())
+
+    asyncio.run(main())
+    stacks = prof.collapsed("async_api.listar_avisos")
+    assert sum(stacks.values()) == 1
+    assert any("test_profiler.py:busy" in k for k in stacks)
+    assert not prof._tasks
+
+
+def test_async_requests_share_flask_profiler(asgi, async_get):
+    prof = asgi.wsgi_app.wsgi_application.extensions["profiler"]
+    seen = []
+    enter = prof.enter_task
+    prof.enter_task = lambda endpoint: seen.append(endpoint) or enter(endpoint)
+    try:
+        assert async_get("/api/avisos?size=1")[0] == 200
+    finally:
+        del prof.enter_task
+    assert seen == ["async_api.listar_avisos"]
+    assert not prof._tasks
@@ -0,0 +1,40 @@
+from pagina.initdb import REGION_COMUNA_SQL, parse_inserts
+from pagina.proximity import DEFAULT_COORDS_PATH, ProximityIndex, load_coords
+
+
+def test_every_comuna_has_coordinates():
+    coords = load_coords(DEFAULT_COORDS_PATH)
+    comunas = {row["id"]: row["nombre"] for table, row in parse_inserts(REGION_COMUNA_SQL) if table == "comuna"}
+    missing = {cid: nombre for cid, nombre in comunas.items() if cid not in coords}
+    assert not missing, f"comunas sin fila en {DEFAULT_COORDS_PATH}: {missing}"
+    assert set(coords) <= set(comunas)
+
+
+def test_within_orders_by_distance():
+    coords = load_coords(DEFAULT_COORDS_PATH)
+    index = ProximityIndex(coords, 50)
+    near = index.within(130208, 10)  # Santiago
+    assert near[0] == (130208, 0.0)
+    assert len(near) > 5
+    dists = [d for _, d in near]
+    assert dists == sorted(dists) and dists[-1] <= 10
+
+
+def test_near_rejects_unknown_comuna(client):
+    r = client.get("/api/avisos?near_comuna_id=99999&radius_km=10")
+    assert r.status_code == 400
+
+
+def test_near_lists_known_comuna(client):
+    r = client.get("/api/avisos?near_comuna_id=130208&radius_km=10")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["near_comuna_id"] == 130208
+    assert all(a["distancia_km"] <= 10 for a in body["data"])
+
+
+def test_near_rejects_unknown_comuna_async(async_get):
+    status, _ = async_get("/api/avisos?near_comuna_id=99999&radius_km=10")
+    assert status == 400
+    status, body = async_get("/api/avisos?near_comuna_id=130208&radius_km=10")
+    assert status == 200 and body["near_comuna_id"] == 130208
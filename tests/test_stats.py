@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import pytest
+
+from pagina.admission import ConcurrencyLimiter
+from pagina.stats import dashboard_stmt
+
+
+@pytest.mark.parametrize("year", ["0", "9999", "-5", "x"])
+@pytest.mark.parametrize("endpoint", ["monthly", "heatmap", "dashboard"])
+def test_rejects_year_out_of_range(client, endpoint, year):
+    r = client.get(f"/api/stats/{endpoint}?year={year}")
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("endpoint", ["monthly", "heatmap", "dashboard"])
+def test_accepts_edge_years(client, endpoint):
+    for year in (1, 9998):
+        assert client.get(f"/api/stats/{endpoint}?year={year}").status_code == 200
+
+
+def test_async_stats_match_flask(client, async_get):
+    for path in ("/api/stats/by-type", "/api/stats/monthly?year=2024",
+                 "/api/stats/daily?from=2024-01-01&to=2024-01-31", "/api/stats/dashboard?year=2024"):
+        status, body = async_get(path)
+        assert status == 200
+        assert body == client.get(path).get_json()
+    assert async_get("/api/stats/monthly?year=9999")[0] == 400
+
+
+@pytest.fixture()
+def saturated_stats(asgi):
+    limiters = asgi.async_app.extensions["admission"]["limiters"]
+    original = limiters["stats"]
+    limiters["stats"] = ConcurrencyLimiter("stats", 0, 0, 0.0)
+    yield asgi
+    limiters["stats"] = original
+
+
+def test_stats_admission_on_both_apps(async_get, saturated_stats):
+    # el limitador lo comparten la app Quart y la Flask del mismo proceso
+    flask_app = saturated_stats.wsgi_app.wsgi_application
+    assert flask_app.extensions["admission"] is saturated_stats.async_app.extensions["admission"]
+    r = flask_app.test_client().get("/api/stats/by-type")
+    assert r.status_code == 503 and r.headers["Retry-After"]
+    status, _ = async_get("/api/stats/by-type")
+    assert status == 503
+
+
+def test_dashboard_matches_endpoints(client):
+    # init-db reparte los avisos en el último año: la serie diaria y la mensual no quedan en cero
+    today = date.today()
+    since = today - timedelta(days=120)
+    year = today.year - 1 if today.month < 6 else today.year
+    dash = client.get(f"/api/stats/dashboard?from={since}&to={today}&year={year}").get_json()
+    daily = client.get(f"/api/stats/daily?from={since}&to={today}").get_json()
+    monthly = client.get(f"/api/stats/monthly?year={year}").get_json()
+    assert sum(daily["datasets"][0]["data"]) > 0 and sum(monthly["datasets"][0]["data"]) > 0
+    assert dash["daily"] == daily and dash["monthly"] == monthly
+    assert dash["by_type"] == client.get("/api/stats/by-type").get_json()
+
+
+def test_dashboard_scans_only_requested_ranges():
+    sql = str(dashboard_stmt(date(2024, 1, 1), date(2024, 1, 31), 2023).compile())
+    # ambas ramas del UNION ALL filtran por fecha_ingreso
+    assert sql.count("WHERE") == 2 and sql.count("fecha_ingreso BETWEEN") == 2
@@ -0,0 +1,115 @@
+import os
+
+from sqlalchemy import select
+
+from pagina.db import get_session
+from pagina.models import Comuna
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 200
+
+
+def _form(**extra):
+    with get_session() as s:
+        comuna_id = s.scalar(select(Comuna.id).limit(1))
+    return {
+        "comuna_id": str(comuna_id), "nombre": "Ana Pérez", "email": "ana@example.com",
+        "tipo": "gato", "cantidad": "1", "edad": "2", "unidad_medida": "m",
+        "fecha_entrega": "2030-01-01T10:00", **extra,
+    }
+
+
+def _open(client, size=len(PNG)):
+    r = client.post("/api/uploads", json={"filename": "foto.png", "size": size})
+    assert r.status_code == 201
+    return r.get_json()["id"]
+
+
+def _patch(client, upload_id, offset, chunk):
+    return client.patch(f"/api/uploads/{upload_id}", data=chunk, headers={
+        "Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream",
+    })
+
+
+def test_resume_after_offset_mismatch(client):
+    upload_id = _open(client)
+    assert _patch(client, upload_id, 0, PNG[:100]).headers["Upload-Offset"] == "100"
+
+    # el cliente perdió la respuesta y reintenta desde 0: 409 con el offset real
+    r = _patch(client, upload_id, 0, PNG[:100])
+    assert r.status_code == 409 and r.get_json()["offset"] == 100
+    assert client.head(f"/api/uploads/{upload_id}").headers["Upload-Offset"] == "100"
+
+    r = _patch(client, upload_id, 100, PNG[100:])
+    assert r.status_code == 204 and r.headers["Upload-Offset"] == str(len(PNG))
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["complete"] is True
+
+
+def test_chunk_over_declared_size(client):
+    upload_id = _open(client, size=10)
+    assert _patch(client, upload_id, 0, PNG[:20]).status_code == 413
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["offset"] == 0
+
+
+def test_invalid_image_is_discarded(client):
+    upload_id = _open(client, size=20)
+    assert _patch(client, upload_id, 0, b"x" * 20).status_code == 413
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["offset"] == 0
+
+
+def test_finalize_into_aviso(app, client):
+    upload_id = _open(client)
+    _patch(client, upload_id, 0, PNG)
+    r = client.post("/api/avisos", data=_form(**{"fotos_ids[]": upload_id}))
+    assert r.status_code == 201, r.get_json()
+    fotos = r.get_json()["fotos"]
+    assert len(fotos) == 1
+    with open(os.path.join(app.config["UPLOAD_FOLDER"], os.path.basename(fotos[0])), "rb") as fh:
+        assert fh.read() == PNG
+
+    # la sesión quedó cerrada: el mismo id no sirve para otro aviso
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+    r = client.post("/api/avisos", data=_form(**{"fotos_ids[]": upload_id}))
+    assert r.status_code == 400
+
+
+def test_incomplete_upload_rejected(client):
+    upload_id = _open(client)
+    _patch(client, upload_id, 0, PNG[:50])
+    r = client.post("/api/avisos", data=_form(**{"fotos_ids[]": upload_id}))
+    assert r.status_code == 400
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["offset"] == 50
+
+
+def test_open_sessions_capped_per_client(app, client):
+    store = app.extensions["uploads"]
+    caps = store.max_sessions, store.max_bytes
+    store.max_sessions, store.max_bytes = 2, 10 * len(PNG)
+    try:
+        # otra IP para no contar las sesiones de las pruebas anteriores
+        other = {"REMOTE_ADDR": "10.0.0.9"}
+        open_ = [client.post("/api/uploads", json={"filename": "f.png", "size": len(PNG)}, environ_base=other)
+                 for _ in range(3)]
+        assert [r.status_code for r in open_] == [201, 201, 429]
+
+        # descartar una libera el cupo
+        client.delete(f"/api/uploads/{open_[0].get_json()['id']}")
+        r = client.post("/api/uploads", json={"filename": "f.png", "size": len(PNG)}, environ_base=other)
+        assert r.status_code == 201
+        r = client.post("/api/uploads", json={"filename": "f.png", "size": len(PNG)},
+                        environ_base={"REMOTE_ADDR": "10.0.0.10"})
+        assert r.status_code == 201
+    finally:
+        store.max_sessions, store.max_bytes = caps
+
+
+def test_purge_command_removes_expired(app, client):
+    upload_id = _open(client)
+    store = app.extensions["uploads"]
+    ttl = store.ttl
+    store.ttl = -1
+    try:
+        result = app.test_cli_runner().invoke(args=["purgar-subidas"])
+    finally:
+        store.ttl = ttl
+    assert result.exit_code == 0 and "subidas vencidas borradas" in result.output
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
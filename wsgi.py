@@ -0,0 +1,12 @@
+import time
+
+_T0 = time.perf_counter()
+
+from pagina import create_app  # noqa: E402
+from pagina.prefork import preload, report_startup  # noqa: E402
+
+# Servidor pre-fork de producción (la app se crea y precarga una vez en el master), p. ej.:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()
+preload(app)
+report_startup(app, _T0)